@@ -1,35 +1,110 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
-import pandas as pd
-from model import VentilatorModel
+from batching import BatchedModel, MicroBatcher
+from columnar import MIME_TYPE as COLUMNAR_MIME_TYPE, encode_predictions
+from config import Config
+from ventilator.drift import DriftMonitor
+from ventilator.model import VentilatorModel
+from registry import ModelRegistry
+from uploads import UploadManager, UploadError
+from ventilator.utils import inspect_csv, REQUIRED_COLUMNS
+from workpool import WorkPool, PoolBusy, PoolTimeout
+from concurrent.futures import TimeoutError as FutureTimeout
 import io
+import jobs
+import os
 import sys
+import threading
+import uuid
 from datetime import datetime
 
+# pandas, numpy y sklearn se importan dentro de cada endpoint que los necesita,
+# así el servidor arranca y responde /api/status sin pagar ese costo.
+
 app = Flask(__name__)
 CORS(app)
 
-# Variable global para el modelo
-model = VentilatorModel()  # Sin parámetros
-model_trained = False
+# Modelo suelto de versiones anteriores al registro (se importa al cargarlo)
+LEGACY_MODEL_PATH = 'model.pkl'
+
+# Registro de modelos versionados: varias versiones pueden estar cargadas a la
+# vez y cada petición elige cuál usar con ?version=v3 o ?split=v3:90,v4:10
+registry = ModelRegistry(Config.MODEL_FOLDER, Config.MODEL_MEMORY_BUDGET, Config.MODEL_MMAP)
+
+# Subidas por partes para archivos que no caben en una sola petición. El
+# parseo se hace en este proceso mientras llegan las partes, también con
+# pool de procesos: el DataFrame ya parseado viaja al worker (ver spool_input).
+uploads = UploadManager(Config.UPLOAD_FOLDER, Config.UPLOAD_PART_SIZE, Config.UPLOAD_TIMEOUT,
+                        ttl=Config.UPLOAD_TTL, ingest_workers=Config.UPLOAD_INGEST_WORKERS)
+
+# Pool de procesos para las predicciones (SERVING_WORKERS > 0, ver get_pool)
+# y micro-batching de las predicciones chicas (ver get_batcher)
+pool = None
+batcher = None
+_serving_lock = threading.Lock()
+
+# Tráfico de predicción acumulado por versión para /api/drift
+drift_monitor = DriftMonitor()
+
+def preflight(file, require_pressure=False):
+    """
+    Validación rápida del CSV subido (encabezado + muestras), antes de
+    parsearlo completo. Retorna (reporte, respuesta de error o None).
+    """
+    report = inspect_csv(file.stream, require_pressure=require_pressure)
+    if not report['valid']:
+        print(f"❌ CSV rechazado: {'; '.join(report['errors'])}")
+        return report, (jsonify({'error': 'Invalid CSV', 'details': report['errors']}), 400)
+    print(f"✓ CSV válido (~{report['estimated_rows']:,} filas, layout: {report['layout']})")
+    return report, None
+
+def read_input(require_pressure=False):
+    """
+    Leer el CSV de la petición: archivo multipart ('file') o un upload por
+    partes ya completo ('upload_id').
+    Retorna (df, presorted, respuesta de error o None).
+    """
+    from ventilator.ingest import read_csv
+
+    upload_id = request.values.get('upload_id')
+    if upload_id:
+        try:
+            df = uploads.dataframe(upload_id)
+        except UploadError as e:
+            return None, False, (jsonify({'error': str(e)}), e.status_code)
+        required = list(REQUIRED_COLUMNS) + (['pressure'] if require_pressure else [])
+        missing = [c for c in required if c not in df.columns]
+        if missing:
+            return None, False, (jsonify({'error': 'Invalid CSV', 'details': [f'Faltan columnas: {", ".join(missing)}']}), 400)
+        # Sin reporte de layout: build_features confirma el orden con una pasada O(n)
+        return df, True, None
+
+    file = request.files['file']
+    report, error = preflight(file, require_pressure)
+    if error:
+        return None, False, error
+    # gzip / zstd se descomprimen en streaming mientras pandas parsea
+    return read_csv(file.stream), report['layout']['presorted'], None
+
+def has_input():
+    return 'file' in request.files or bool(request.values.get('upload_id'))
 
 @app.route('/api/train', methods=['POST'])
 def train():
-    """Entrenar modelo con CSV cargado"""
-    global model, model_trained
+    """Entrenar modelo con CSV cargado y registrarlo como nueva versión"""
     
-    if 'file' not in request.files:
+    if not has_input():
         return jsonify({'error': 'No file uploaded'}), 400
     
-    file = request.files['file']
-    
     try:
         print("\n" + "="*80)
         print("RECIBIENDO ARCHIVO DE ENTRENAMIENTO")
         print("="*80)
         
-        # Leer CSV
-        df = pd.read_csv(file)
+        # Leer CSV (archivo o upload por partes)
+        df, presorted, error = read_input(require_pressure=True)
+        if error:
+            return error
         
         print(f"\n📁 Dataset cargado: {len(df)} registros totales")
         print(f"📊 Columnas: {list(df.columns)}")
@@ -62,14 +137,16 @@ def train():
         # Forzar flush para ver output inmediatamente
         sys.stdout.flush()
         
-        # Entrenar
-        mae = model.train(df)
+        # Entrenar un modelo nuevo ('fast' o 'accurate'), opcionalmente uno por par (R, C)
+        specialize = request.form.get('specialize', 'false').lower() in ('1', 'true', 'yes')
+        model = VentilatorModel(request.form.get('model_type', 'fast'), specialize=specialize)
+        mae = model.train(df, presorted=presorted, lean=Config.LEAN_FEATURES)
         
-        # Guardar
+        # Registrar como nueva versión y servirla por defecto
         print("\n💾 Guardando modelo...")
-        model.save('model.pkl')
-        
-        model_trained = True
+        version = registry.register(model, model.training_info)
+        registry.set_default(version)
+        registry.get(version)
         
         print("\n" + "="*80)
         print("✅ ENTRENAMIENTO COMPLETADO EXITOSAMENTE")
@@ -79,6 +156,7 @@ def train():
         
         return jsonify({
             'message': 'Training completed successfully',
+            'version': version,
             'mae': float(mae),
             'samples': len(df),
             'breaths': int(unique_breaths)
@@ -91,66 +169,242 @@ def train():
         sys.stdout.flush()
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/predict', methods=['POST'])
-def predict():
-    """Hacer predicciones en test data"""
-    global model, model_trained
-    
-    if not model_trained:
+@app.route('/api/update', methods=['POST'])
+def update():
+    """
+    Actualizar una versión con ciclos nuevos sin reentrenar desde cero
+    (ver VentilatorModel.update) y registrar el resultado como nueva versión.
+    ?version=v3 elige la versión base (por defecto, la versión por defecto);
+    n_trees fija cuántos árboles / etapas se agregan.
+    """
+    if not has_input():
+        return jsonify({'error': 'No file uploaded'}), 400
+
+    version = request.values.get('version') or registry.default_version
+    if version is None:
         return jsonify({'error': 'Model not trained'}), 400
+
+    try:
+        n_trees = request.values.get('n_trees', type=int)
+        validation_split = request.values.get('validation_split', 0.2, type=float)
+
+        df, presorted, error = read_input(require_pressure=True)
+        if error:
+            return error
+        print(f"\n📁 Datos nuevos: {len(df)} registros, {df['breath_id'].nunique()} ciclos")
+
+        model = registry.load_full(version)
+        summary = model.update(df, validation_split, presorted, n_trees)
+
+        new_version = registry.register(model, dict(model.training_info, updated_from=version))
+        registry.set_default(new_version)
+        registry.get(new_version)
+        sys.stdout.flush()
+
+        return jsonify(dict(summary, message='Model updated successfully',
+                            version=new_version, updated_from=version))
+
+    except KeyError as e:
+        return jsonify({'error': e.args[0]}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"\n❌ ERROR EN ACTUALIZACIÓN: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.stdout.flush()
+        return jsonify({'error': str(e)}), 500
+
+def spool_input():
+    """
+    Preparar la entrada de la petición para un proceso del pool: el archivo
+    multipart se valida y se guarda en disco; de un upload por partes se
+    pasa el DataFrame que ya se parseó mientras llegaban las partes
+    (serializarlo cuesta mucho menos que volver a parsear el CSV).
+    Retorna (source, presorted, respuesta de error o None).
+    """
+    if request.values.get('upload_id'):
+        df, presorted, error = read_input()
+        return (None if error else {'frame': df}), presorted, error
+
+    file = request.files['file']
+    report, error = preflight(file)
+    if error:
+        return None, False, error
+    path = os.path.join(Config.UPLOAD_FOLDER, f'job_{uuid.uuid4().hex}.csv')
+    file.save(path)
+    return {'path': path}, report['layout']['presorted'], None
+
+def discard_source(source):
+    if 'path' in source:
+        try:
+            os.remove(source['path'])
+        except OSError:
+            pass
+
+def get_pool():
+    """Pool de procesos para las predicciones (se crea al primer uso)"""
+    global pool
+    with _serving_lock:
+        if pool is None:
+            pool = WorkPool(
+                Config.SERVING_WORKERS, Config.SERVING_QUEUE, Config.SERVING_TIMEOUT,
+                initializer=jobs._init_worker,
+                initargs=(Config.MODEL_FOLDER, Config.MODEL_MEMORY_BUDGET, Config.MODEL_MMAP)
+            )
+    return pool
+
+def predict_batch(key, df, presorted):
+    """Predecir un lote del micro-batcher (en el pool si está activo)"""
+    version, lean = key
+    if Config.SERVING_WORKERS:
+        return get_pool().run(jobs.predict_frame, version, df, presorted, lean)
+    return registry.get(version).predict(df, presorted=presorted, return_order=True, lean=lean)
+
+def get_batcher():
+    global batcher
+    with _serving_lock:
+        if batcher is None:
+            batcher = MicroBatcher(
+                predict_batch,
+                window=Config.BATCH_WINDOW_MS / 1000,
+                max_breaths=Config.BATCH_MAX_BREATHS,
+                concurrency=max(1, Config.SERVING_WORKERS)
+            )
+    return batcher
+
+def use_batching(kind):
+    """Sólo /api/predict con un archivo chico en la misma petición"""
+    return (kind == 'score' and Config.BATCH_WINDOW_MS > 0 and 'file' in request.files
+            and not request.values.get('upload_id')
+            and (request.content_length or 0) <= Config.BATCH_MAX_BYTES)
+
+def record_traffic(version, result):
+    """Sumar el sketch de drift del trabajo (si trae uno) al monitor"""
+    sketch = result.pop('sketch', None)
+    if sketch is not None:
+        drift_monitor.record(version, sketch)
+    return result
+
+def run_prediction(kind, options, untrained_message='Model not trained'):
+    """
+    Ejecutar un trabajo de jobs.py para la petición actual: en el pool de
+    procesos si SERVING_WORKERS > 0, si no en este mismo hilo.
+    Retorna (versión, resultado, respuesta de error o None).
+    """
+    try:
+        version = registry.resolve(
+            request.values.get('version'),
+            request.values.get('split')
+        )
+    except KeyError as e:
+        return None, None, (jsonify({'error': e.args[0]}), 404)
+    except ValueError as e:
+        return None, None, (jsonify({'error': str(e)}), 400)
     
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file uploaded'}), 400
+    if version is None:
+        return None, None, (jsonify({'error': untrained_message}), 400)
     
-    file = request.files['file']
+    if not has_input():
+        return None, None, (jsonify({'error': 'No file uploaded'}), 400)
+    
+    options = dict(options, lean=Config.LEAN_FEATURES, drift=Config.DRIFT_MONITORING)
+    
+    if use_batching(kind):
+        df, presorted, error = read_input()
+        if error:
+            return None, None, error
+        model = BatchedModel(get_batcher(), version, Config.SERVING_TIMEOUT, registry.get(version).baseline)
+        try:
+            return version, record_traffic(version, jobs.score(model, df, presorted, **options)), None
+        except PoolBusy as e:
+            return None, None, (jsonify({'error': str(e)}), 503, {'Retry-After': '5'})
+        except (PoolTimeout, FutureTimeout):
+            return None, None, (jsonify({'error': 'La predicción no terminó a tiempo'}), 504)
     
+    if not Config.SERVING_WORKERS:
+        model = registry.get(version)
+        df, presorted, error = read_input()
+        if error:
+            return None, None, error
+        print(f"\n📁 Test dataset: {len(df)} registros")
+        return version, record_traffic(version, jobs.JOBS[kind](model, df, presorted, **options)), None
+    
+    source, presorted, error = spool_input()
+    if error:
+        return None, None, error
+    try:
+        result = get_pool().run(jobs.run_job, kind, version, source, presorted, options)
+    except PoolBusy as e:
+        discard_source(source)
+        print(f"⏳ {e}")
+        return None, None, (jsonify({'error': str(e)}), 503, {'Retry-After': '5'})
+    except PoolTimeout as e:
+        # Si el trabajo seguía en la cola no va a borrar su archivo
+        discard_source(source)
+        print(f"⌛ {e}")
+        return None, None, (jsonify({'error': str(e)}), 504)
+    return version, record_traffic(version, result), None
+
+@app.route('/api/predict', methods=['POST'])
+def predict():
+    """
+    Hacer predicciones en test data
+
+    Con Accept: application/vnd.ventilator.predictions responde todas las
+    predicciones (id, pressure) en formato binario columnar (ver columnar.py);
+    si no, JSON con las primeras 100. breath_start y max_breaths paginan por
+    ciclos: la respuesta indica next_breath_start para pedir la siguiente.
+    """
     try:
         print("\n" + "="*80)
         print("REALIZANDO PREDICCIONES")
         print("="*80)
         
-        # Leer CSV
-        df_test = pd.read_csv(file)
-        
-        print(f"\n📁 Test dataset: {len(df_test)} registros")
-        
-        # IMPORTANTE: Para hacer el submit a Kaggle, comenta la siguiente línea
-        # para usar TODOS los datos del test
-        # df_test = df_test.head(50000)  # <-- COMENTA ESTA LÍNEA para Kaggle
-        
-        unique_breaths = df_test['breath_id'].nunique()
-        print(f"🫁 Ciclos en test: {unique_breaths}")
+        # IMPORTANTE: Para hacer el submit a Kaggle usa /api/predict_and_download
+        # o el scoring por lotes (predict.py) con TODOS los datos del test
         
-        sys.stdout.flush()
-        
-        # Predecir
-        predictions = model.predict(df_test)
-        
-        # Preparar respuesta completa
-        results = []
-        for i, (idx, row) in enumerate(df_test.iterrows()):
-            results.append({
-                'id': int(row['id']),
-                'breath_id': int(row['breath_id']),
-                'pressure': float(predictions[i])
-            })
-        
-        # Calcular MAE simulado (comparar con fórmula física)
-        simulated_pressures = df_test.apply(
-            lambda row: row['R'] * row['u_in'] * 0.1 + (1/row['C']) * row['time_step'] * 0.5,
-            axis=1
-        )
-        mae = abs(predictions - simulated_pressures).mean()
-        
-        print(f"\n✅ Predicciones completadas")
-        print(f"📊 MAE estimado: {mae:.4f}")
+        version, result, error = run_prediction('score', {
+            'breath_start': request.values.get('breath_start', type=int),
+            'max_breaths': request.values.get('max_breaths', type=int)
+        })
+        if error:
+            return error
+        
+        page = result['page']
+        if result['predictions'] is None:
+            return jsonify({'error': 'No hay ciclos desde breath_start', **page}), 404
+        
+        ids, predictions = result['ids'], result['predictions']
+        
+        columnar = request.accept_mimetypes.best_match(
+            ['application/json', COLUMNAR_MIME_TYPE]
+        ) == COLUMNAR_MIME_TYPE
+        if columnar:
+            payload = encode_predictions(ids, predictions, dict(page, model_version=version))
+            print(f"\n✅ {len(ids):,} predicciones en formato columnar ({len(payload) / 1024 / 1024:.1f} MB)")
+            sys.stdout.flush()
+            return Response(payload, mimetype=COLUMNAR_MIME_TYPE)
+        
+        # Preparar respuesta (solo las primeras 100)
+        results = [
+            {'id': int(i), 'breath_id': int(b), 'pressure': float(p)}
+            for i, b, p in zip(ids[:100], result['breath_ids'][:100], predictions[:100])
+        ]
+        
+        print(f"\n✅ Predicciones completadas (modelo {version})")
+        print(f"📊 MAE estimado: {result['estimated_mae']:.4f}")
         sys.stdout.flush()
         
         return jsonify({
-            'predictions': results[:100],  # Solo primeros 100 en response
-            'total_predictions': len(results),
-            'total_breaths': int(unique_breaths),
-            'estimated_mae': float(mae)
+            'model_version': version,
+            'predictions': results,  # Solo primeros 100 en response
+            'total_predictions': len(predictions),
+            'total_breaths': page['total_breaths'],
+            'breath_start': page['breath_start'],
+            'breath_end': page['breath_end'],
+            'next_breath_start': page['next_breath_start'],
+            'estimated_mae': result['estimated_mae']
         })
     
     except Exception as e:
@@ -167,114 +421,27 @@ def predict_and_download():
     Formato: id, pressure (solo estas 2 columnas)
     Genera predicciones sintéticas para los IDs faltantes
     """
-    global model, model_trained
-    
-    if not model_trained:
-        return jsonify({'error': 'Model not trained. Please train the model first.'}), 400
-    
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file uploaded'}), 400
-    
-    file = request.files['file']
-    
     try:
         print("\n" + "="*80)
         print("GENERANDO ARCHIVO PARA KAGGLE SUBMISSION")
         print("="*80)
         
-        # Leer CSV completo
-        print("\n📁 Leyendo archivo test.csv...")
-        df_test = pd.read_csv(file)
-        
-        print(f"✓ Archivo cargado: {len(df_test)} registros")
-        print(f"🫁 Ciclos: {df_test['breath_id'].nunique()}")
-        
-        sys.stdout.flush()
-        
-        # Predecir solo los datos cargados
-        print("\n🔮 Generando predicciones para los datos cargados...")
-        predictions = model.predict(df_test)
-        
-        # Crear diccionario con las predicciones reales
-        real_predictions = {}
-        for i, row in df_test.iterrows():
-            real_predictions[int(row['id'])] = predictions[i]
-        
-        print(f"✓ {len(real_predictions)} predicciones reales generadas")
-        
-        # Obtener el rango completo de IDs esperados
-        # Kaggle espera IDs desde el primer ID hasta 4024000 aproximadamente
-        min_id = int(df_test['id'].min())
-        max_id = int(df_test['id'].max())
-        
-        print(f"\n📊 Rango de IDs: {min_id} - {max_id}")
-        print(f"⚠️  Generando predicciones sintéticas para IDs faltantes...")
-        
-        # Calcular estadísticas de las predicciones reales para generar sintéticas similares
-        pred_mean = predictions.mean()
-        pred_std = predictions.std()
-        pred_min = predictions.min()
-        pred_max = predictions.max()
-        
-        print(f"📈 Estadísticas de predicciones reales:")
-        print(f"   Media: {pred_mean:.2f} cmH₂O")
-        print(f"   Std: {pred_std:.2f}")
-        print(f"   Min: {pred_min:.2f}, Max: {pred_max:.2f}")
-        
-        # Generar todas las predicciones (reales + sintéticas)
-        all_ids = []
-        all_pressures = []
-        
-        # Iterar por TODOS los IDs posibles
-        synthetic_count = 0
-        for id_val in range(min_id, max_id + 1):
-            all_ids.append(id_val)
-            
-            if id_val in real_predictions:
-                # Usar predicción real
-                all_pressures.append(real_predictions[id_val])
-            else:
-                # Generar predicción sintética usando distribución normal
-                synthetic_pressure = np.random.normal(pred_mean, pred_std)
-                # Limitar al rango observado
-                synthetic_pressure = np.clip(synthetic_pressure, pred_min, pred_max)
-                all_pressures.append(synthetic_pressure)
-                synthetic_count += 1
-        
-        print(f"\n✓ Predicciones sintéticas generadas: {synthetic_count:,}")
-        print(f"✓ Total de predicciones: {len(all_ids):,}")
-        
-        # Crear DataFrame con TODOS los IDs
-        submission_df = pd.DataFrame({
-            'id': all_ids,
-            'pressure': all_pressures
-        })
-        
-        # Guardar en memoria como CSV
-        output = io.StringIO()
-        submission_df.to_csv(output, index=False)
-        output.seek(0)
-        
-        # Convertir a BytesIO para enviarlo
-        mem = io.BytesIO()
-        mem.write(output.getvalue().encode('utf-8'))
-        mem.seek(0)
+        version, result, error = run_prediction(
+            'submission', {}, 'Model not trained. Please train the model first.'
+        )
+        if error:
+            return error
         
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'submission_{timestamp}.csv'
+        filename = f'submission_{version}_{timestamp}.csv'
         
-        print(f"\n✅ Archivo generado: {filename}")
-        print(f"📊 Total filas: {len(submission_df):,}")
-        print(f"📊 IDs reales con predicciones ML: {len(real_predictions):,}")
-        print(f"📊 IDs sintéticos generados: {synthetic_count:,}")
-        print(f"📈 Rango final de presiones: [{submission_df['pressure'].min():.2f}, {submission_df['pressure'].max():.2f}]")
-        print(f"📊 Media final: {submission_df['pressure'].mean():.2f} cmH₂O")
+        print(f"\n✅ Archivo generado: {filename} (modelo {version})")
         print("="*80 + "\n")
         
         sys.stdout.flush()
         
         return send_file(
-            mem,
+            io.BytesIO(result['csv']),
             mimetype='text/csv',
             as_attachment=True,
             download_name=filename
@@ -289,26 +456,118 @@ def predict_and_download():
 
 @app.route('/api/load_model', methods=['GET'])
 def load_model():
-    """Cargar modelo pre-entrenado"""
-    global model, model_trained
-    
+    """
+    Cargar una versión del registro y dejarla como la versión por defecto
+    (?version=v2 permite volver a una versión anterior sin reentrenar).
+    Sin versión se usa la más reciente.
+    """
     try:
         print("\n📂 Cargando modelo guardado...")
-        model.load('model.pkl')
-        model_trained = True
-        print("✅ Modelo cargado exitosamente\n")
-        return jsonify({'message': 'Model loaded successfully'})
+        versions = registry.versions()
+        if not versions and os.path.exists(LEGACY_MODEL_PATH):
+            versions = [registry.import_file(LEGACY_MODEL_PATH, {'imported_from': LEGACY_MODEL_PATH})]
+        if not versions:
+            raise FileNotFoundError('el registro está vacío')
+        
+        version = request.args.get('version') or versions[-1]
+        model = registry.get(version)
+        registry.set_default(version)
+        print(f"✅ Modelo {version} cargado exitosamente\n")
+        return jsonify({
+            'message': 'Model loaded successfully',
+            'version': version,
+            'model_type': model.model_type
+        })
     except Exception as e:
         print(f"❌ Error al cargar modelo: {str(e)}\n")
         return jsonify({'error': 'No model found: ' + str(e)}), 404
 
+@app.route('/api/uploads', methods=['POST'])
+def create_upload():
+    """Iniciar una subida por partes (JSON opcional: filename, size, sha256)"""
+    data = request.get_json(silent=True) or {}
+    upload = uploads.create(data.get('filename'), data.get('size'), data.get('sha256'))
+    print(f"📤 Upload {upload.upload_id} creado ({data.get('filename')})")
+    return jsonify({
+        'upload_id': upload.upload_id,
+        'part_size': uploads.max_part_size
+    }), 201
+
+@app.route('/api/uploads/<upload_id>/parts/<int:index>', methods=['PUT'])
+def upload_part(upload_id, index):
+    """Recibir una parte (cuerpo binario, header X-Content-SHA256 opcional)"""
+    try:
+        part = uploads.put_part(upload_id, index, request.stream,
+                                request.headers.get('X-Content-SHA256'))
+        return jsonify(part)
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status_code
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def upload_status(upload_id):
+    """Partes recibidas hasta ahora (para retomar una subida interrumpida)"""
+    try:
+        return jsonify(uploads.status(upload_id))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status_code
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def complete_upload(upload_id):
+    """Cerrar la subida (JSON: total_parts, sha256 opcional del archivo completo)"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data.get('total_parts'), int):
+        return jsonify({'error': 'total_parts es requerido'}), 400
+    try:
+        return jsonify(uploads.complete(upload_id, data['total_parts'], data.get('sha256')))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status_code
+
 @app.route('/api/status', methods=['GET'])
 def status():
     """Check si el servidor está funcionando"""
+    default = registry.default_version
     return jsonify({
         'status': 'running',
-        'model_trained': model_trained,
-        'model_type': model.model_type if hasattr(model, 'model_type') else 'unknown'
+        'model_trained': default is not None,
+        'model_type': registry.metadata(default)['model_type'] if default else 'unknown',
+        'default_version': default,
+        'loaded_models': registry.loaded(),
+        'memory_used_bytes': registry.memory_used(),
+        'memory_budget_bytes': registry.memory_budget,
+        'serving': pool.stats() if pool is not None else {'workers': Config.SERVING_WORKERS},
+        'batching': batcher.stats() if batcher is not None else {'window_ms': Config.BATCH_WINDOW_MS}
+    })
+
+@app.route('/api/drift', methods=['GET'])
+def drift_report():
+    """
+    Drift del tráfico de predicción respecto de los datos de entrenamiento
+    de una versión (ver ventilator/drift.py): PSI y desplazamiento de la media por
+    feature y por par (R, C), mezcla de pares y calidad de datos.
+    ?version=v3 (por defecto, la versión por defecto); ?reset=true empieza
+    una ventana nueva después de responder.
+    """
+    version = request.args.get('version') or registry.default_version
+    if version is None:
+        return jsonify({'error': 'Model not trained'}), 400
+    try:
+        model = registry.get(version)
+    except KeyError as e:
+        return jsonify({'error': e.args[0]}), 404
+    if model.baseline is None:
+        return jsonify({'error': f'La versión {version} no tiene estadísticas base '
+                                 '(se entrenó antes del monitoreo de drift)'}), 409
+
+    reset = request.args.get('reset', 'false').lower() in ('1', 'true', 'yes')
+    report = drift_monitor.report(version, model.baseline, reset)
+    return jsonify(dict(report, version=version, monitoring=Config.DRIFT_MONITORING))
+
+@app.route('/api/models', methods=['GET'])
+def list_models():
+    """Listar las versiones registradas con sus metadatos"""
+    return jsonify({
+        'default_version': registry.default_version,
+        'models': [registry.metadata(v) for v in registry.versions()]
     })
 
 if __name__ == '__main__':
@@ -318,10 +577,23 @@ if __name__ == '__main__':
     print("\n📍 API disponible en: http://localhost:5000")
     print("\nEndpoints disponibles:")
     print("  POST /api/train                - Entrenar modelo")
+    print("  POST /api/update               - Actualizar un modelo con datos nuevos (?version=)")
     print("  POST /api/predict              - Hacer predicciones")
     print("  POST /api/predict_and_download - Generar CSV para Kaggle")
-    print("  GET  /api/load_model           - Cargar modelo guardado")
+    print("  GET  /api/load_model           - Cargar modelo guardado (?version=)")
+    print("  GET  /api/models               - Versiones registradas")
     print("  GET  /api/status               - Estado del servidor")
+    print("  GET  /api/drift                - Drift del tráfico vs entrenamiento (?version=)")
+    print("  POST /api/uploads              - Subida por partes (archivos grandes)")
+    print("\n  Las predicciones aceptan ?version=v3 o ?split=v3:90,v4:10")
+    print("  /api/predict con Accept: application/vnd.ventilator.predictions responde")
+    print("  todas las predicciones en binario (paginar con breath_start / max_breaths)")
+    print("  /api/train y /api/predict aceptan upload_id en lugar de file")
+    if Config.SERVING_WORKERS:
+        print(f"\n  Predicciones en {Config.SERVING_WORKERS} procesos (cola {Config.SERVING_QUEUE}, "
+              f"timeout {Config.SERVING_TIMEOUT} s)")
     print("\n" + "="*80 + "\n")
     
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    # threaded: cada petición en su hilo; las predicciones esperan al pool
+    # sin bloquear /api/status ni /api/load_model
+    app.run(debug=True, port=5000, threaded=True)
\ No newline at end of file
@@ -0,0 +1,172 @@
+import queue
+import threading
+import time
+
+# Micro-batching de peticiones de predicción chicas
+#
+# Cada petición entrega sus ciclos al scheduler y espera. El scheduler junta
+# lo que llegue durante `window` segundos (o hasta `max_breaths` ciclos), arma
+# un único DataFrame, hace una sola pasada de features + predict y le
+# devuelve a cada petición sus predicciones. Mientras un lote se predice, los
+# que llegan se acumulan para el siguiente: con más carga, lotes más grandes.
+#
+# Los breath_id se renumeran por petición antes de juntar, así dos clientes
+# que usan el mismo breath_id no se mezclan.
+
+# Columnas que necesita build_features
+INPUT_COLUMNS = ['breath_id', 'R', 'C', 'time_step', 'u_in', 'u_out']
+
+
+class _Request:
+    def __init__(self, key, df, presorted):
+        import pandas as pd
+        from concurrent.futures import Future
+
+        self.key = key
+        self.presorted = presorted
+        # Se factoriza en el hilo de la petición, no en el del scheduler
+        self.codes, uniques = pd.factorize(df['breath_id'])
+        self.n_breaths = len(uniques)
+        self.df = df
+        self.future = Future()
+
+
+class MicroBatcher:
+    def __init__(self, predict, window=0.002, max_breaths=2000, concurrency=1):
+        """
+        predict(key, df, presorted) -> (predicciones, order), como
+        VentilatorModel.predict(..., return_order=True). key agrupa las
+        peticiones que pueden ir en el mismo lote (p. ej. la versión del modelo).
+        concurrency: lotes que pueden estar prediciéndose a la vez.
+        """
+        self._predict = predict
+        self.window = window
+        self.max_breaths = max_breaths
+        self.concurrency = concurrency
+        self._queue = queue.Queue()
+        self._slots = threading.Semaphore(concurrency)
+        self._thread = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+
+    def submit(self, key, df, presorted=False):
+        """Encolar un DataFrame; retorna un Future con (predicciones, order)"""
+        request = _Request(key, df, presorted)
+        self._ensure_thread()
+        self._queue.put(request)
+        return request.future
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(self.concurrency, thread_name_prefix='micro-batch')
+                self._thread = threading.Thread(target=self._run, daemon=True, name='micro-batcher')
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            # Esperar un lugar libre antes de armar el lote: mientras tanto
+            # las peticiones se siguen acumulando en la cola
+            self._slots.acquire()
+            batch = [self._queue.get()]
+            breaths = batch[0].n_breaths
+            deadline = time.perf_counter() + self.window
+
+            while breaths < self.max_breaths:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                breaths += request.n_breaths
+
+            groups = {}
+            for request in batch:
+                groups.setdefault(request.key, []).append(request)
+            self._executor.submit(self._flush_groups, list(groups.items()))
+
+    def _flush_groups(self, groups):
+        try:
+            for key, requests in groups:
+                self._flush(key, requests)
+        finally:
+            self._slots.release()
+
+    def _flush(self, key, requests):
+        import numpy as np
+        import pandas as pd
+
+        try:
+            if len(requests) == 1:
+                request = requests[0]
+                result = self._predict(key, request.df, request.presorted)
+            else:
+                # Un breath_id único por (petición, ciclo), en orden creciente:
+                # el orden de las features deja cada petición en su propio bloque
+                frames = []
+                offset = 0
+                for request in requests:
+                    frame = request.df[INPUT_COLUMNS].copy()
+                    frame['breath_id'] = request.codes + offset
+                    offset += request.n_breaths
+                    frames.append(frame)
+                combined = pd.concat(frames, ignore_index=True)
+                result = self._predict(key, combined, all(r.presorted for r in requests))
+        except Exception as e:
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        with self._lock:
+            self.batches += 1
+            self.requests += len(requests)
+
+        if len(requests) == 1:
+            requests[0].future.set_result(result)
+            return
+
+        predictions, order = result
+        start = 0
+        for request in requests:
+            end = start + len(request.df)
+            request.future.set_result((
+                np.asarray(predictions[start:end]),
+                np.asarray(order[start:end]) - start
+            ))
+            start = end
+
+    def stats(self):
+        with self._lock:
+            return {
+                'window_ms': self.window * 1000,
+                'max_breaths': self.max_breaths,
+                'batches': self.batches,
+                'requests': self.requests,
+                'queued': self._queue.qsize(),
+            }
+
+
+class BatchedModel:
+    """
+    Se usa como un VentilatorModel en jobs.score(): predict() pasa por el
+    micro-batcher en lugar de llamar al modelo directamente.
+    """
+
+    def __init__(self, batcher, version, timeout=None, baseline=None):
+        self.batcher = batcher
+        self.version = version
+        self.timeout = timeout
+        self.baseline = baseline  # estadísticas base de la versión (ver ventilator/drift.py)
+
+    def predict(self, df, presorted=False, return_order=False, lean=False):
+        future = self.batcher.submit((self.version, lean), df, presorted)
+        predictions, order = future.result(self.timeout)
+        if return_order:
+            return predictions, order
+        return predictions
@@ -0,0 +1,115 @@
+"""
+Prueba de carga del micro-batching: muchas predicciones chicas concurrentes
+
+Levanta el servidor dos veces (sin micro-batching, BATCH_WINDOW_MS=0, y con
+la ventana pedida) y, para cada nivel de concurrencia, N clientes envían en
+bucle CSVs de pocos ciclos a /api/predict. Reporta throughput (peticiones y
+ciclos por segundo) y latencias p50 / p99.
+
+Uso:
+    python benchmarks/bench_batching.py --file test.csv \\
+        [--concurrency 1 4 16 32] [--breaths 5] [--window-ms 2] [--duration 10]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_test import multipart, request, spawn_server  # noqa: E402
+
+
+def small_requests(path, breaths, count):
+    """Partir el CSV en `count` cuerpos multipart de `breaths` ciclos cada uno"""
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    ids = df['breath_id'].unique()
+    bodies = []
+    for i in range(count):
+        chosen = ids[(i * breaths) % len(ids):][:breaths]
+        text = df[df['breath_id'].isin(chosen)].to_csv(index=False).encode('utf-8')
+        bodies.append(multipart({}, 'file', 'small.csv', text))
+    return bodies
+
+
+def client(base, bodies, stop, latencies, errors):
+    i = 0
+    while not stop.is_set():
+        body, content_type = bodies[i % len(bodies)]
+        status, seconds, _ = request(f'{base}/api/predict', body, content_type)
+        if status == 200:
+            latencies.append(seconds)
+        else:
+            errors.append(status)
+        i += 1
+
+
+def run_level(base, bodies, concurrency, duration):
+    latencies, errors = [], []
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=client, args=(base, bodies[i::concurrency] or bodies, stop, latencies, errors),
+                         daemon=True)
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / elapsed,
+        'p50': latencies[len(latencies) // 2] if latencies else float('nan'),
+        'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else float('nan'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput y latencia con y sin micro-batching')
+    parser.add_argument('--file', required=True, help='CSV de test del que se toman los ciclos')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 32])
+    parser.add_argument('--breaths', type=int, default=5, help='Ciclos por petición')
+    parser.add_argument('--window-ms', type=float, default=2)
+    parser.add_argument('--max-breaths', type=int, default=2000)
+    parser.add_argument('--duration', type=float, default=10, help='Segundos por nivel')
+    parser.add_argument('--workers', type=int, default=0, help='SERVING_WORKERS del servidor')
+    args = parser.parse_args()
+
+    bodies = small_requests(args.file, args.breaths, 64)
+
+    modes = [('sin batching', 0), (f'ventana {args.window_ms:g} ms', args.window_ms)]
+    results = {}
+    for name, window in modes:
+        process, base = spawn_server(args.workers, 1024, 120, {
+            'BATCH_WINDOW_MS': str(window),
+            'BATCH_MAX_BREATHS': str(args.max_breaths),
+        })
+        try:
+            request(f'{base}/api/predict', *bodies[0])  # calentar (carga del modelo)
+            for concurrency in args.concurrency:
+                results[(name, concurrency)] = run_level(base, bodies, concurrency, args.duration)
+        finally:
+            process.terminate()
+            process.wait()
+
+    print(f"\n📊 /api/predict con {args.breaths} ciclos por petición ({args.duration:g} s por nivel)\n")
+    print(f"  {'modo':<16} {'clientes':>8} {'pet/s':>8} {'ciclos/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errores':>8}")
+    for name, _ in modes:
+        for concurrency in args.concurrency:
+            r = results[(name, concurrency)]
+            print(f"  {name:<16} {concurrency:>8} {r['rps']:>8.1f} {r['rps'] * args.breaths:>9.0f} "
+                  f"{r['p50'] * 1000:>9.1f} {r['p99'] * 1000:>9.1f} {r['errors']:>8}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Costo del monitoreo de drift por petición
+
+Para varios tamaños de petición (en ciclos) mide, con la mejor de --repeat
+corridas, el predict del modelo servido y el sketch de drift de la misma
+entrada (ver ventilator/drift.py), y reporta el sobrecosto relativo. También mide el
+merge en el monitor, el tamaño del sketch y el tiempo de compare().
+
+Si la versión no tiene estadísticas base (entrenada antes del monitoreo),
+se calculan desde --train.
+
+Uso:
+    MODEL_FOLDER=models python benchmarks/bench_drift.py --file test.csv \\
+        [--version v3] [--train train.csv] [--breaths 10 100 1000 0] [--repeat 5]
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+
+def best_time(func, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sobrecosto del monitoreo de drift')
+    parser.add_argument('--file', required=True, help='CSV de entrada para las predicciones')
+    parser.add_argument('--version', help='Versión del registro (por defecto la versión por defecto)')
+    parser.add_argument('--train', help='CSV de entrenamiento si la versión no tiene estadísticas base')
+    parser.add_argument('--breaths', type=int, nargs='+', default=[10, 100, 1000, 0],
+                        help='Ciclos por petición (0 = el archivo completo)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    import pandas as pd
+    from config import Config
+    from ventilator.drift import DriftMonitor, DriftSketch, compare
+    from ventilator.ingest import read_csv
+    from registry import ModelRegistry
+
+    registry = ModelRegistry(Config.MODEL_FOLDER)
+    version = args.version or registry.default_version
+    if version is None:
+        raise SystemExit('❌ No hay modelos en el registro: entrena uno antes de medir')
+
+    sys.stdout = open(os.devnull, 'w')
+    model = registry.get(version)
+    sys.stdout = sys.__stdout__
+    baseline = model.baseline
+    if baseline is None:
+        if not args.train:
+            raise SystemExit(f'❌ {version} no tiene estadísticas base: pasa --train')
+        start = time.perf_counter()
+        baseline = DriftSketch.from_training(read_csv(args.train))
+        print(f"📐 Estadísticas base desde {args.train}: {baseline.rows:,} filas en "
+              f"{time.perf_counter() - start:.2f} s")
+
+    df = read_csv(args.file)
+    breath_ids = pd.unique(df['breath_id'])
+    monitor = DriftMonitor()
+
+    rows = []
+    for n_breaths in args.breaths:
+        part = df if not n_breaths else df[df['breath_id'].isin(breath_ids[:n_breaths])]
+        sys.stdout = open(os.devnull, 'w')
+        predict_s, (predictions, order) = best_time(lambda: model.predict(part, return_order=True), args.repeat)
+        sys.stdout = sys.__stdout__
+
+        def sketch():
+            s = baseline.empty_like()
+            s.observe(part, predictions, order)
+            return s
+
+        sketch_s, s = best_time(sketch, args.repeat)
+        merge_s, _ = best_time(lambda: monitor.record(version, s), args.repeat)
+        rows.append((part['breath_id'].nunique(), len(part), predict_s, sketch_s, merge_s))
+
+    compare_s, _ = best_time(lambda: compare(baseline, baseline), args.repeat)
+    size = len(pickle.dumps(baseline.empty_like()))
+
+    print(f"\n📊 Monitoreo de drift, modelo {version} ({model.model_type})\n")
+    print(f"  {'ciclos':>7} {'filas':>9} {'predict ms':>11} {'sketch ms':>10} {'merge ms':>9} {'sobrecosto':>11}")
+    for n_breaths, n_rows, predict_s, sketch_s, merge_s in rows:
+        overhead = (sketch_s + merge_s) / predict_s * 100
+        print(f"  {n_breaths:>7,} {n_rows:>9,} {predict_s * 1000:>11.2f} {sketch_s * 1000:>10.2f} "
+              f"{merge_s * 1000:>9.3f} {overhead:>10.1f}%")
+    print(f"\n  Sketch: {size / 1024:.1f} KB por petición (pickle, lo que viaja desde el pool), "
+          f"el mismo tamaño para cualquier cantidad de filas")
+    print(f"  compare() para /api/drift: {compare_s * 1000:.2f} ms\n")
+
+
+if __name__ == '__main__':
+    main()
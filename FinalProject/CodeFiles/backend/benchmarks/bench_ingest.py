@@ -0,0 +1,99 @@
+"""
+Benchmark de ingesta: CSV plano vs gzip vs zstd
+
+Para un CSV dado crea sus versiones comprimidas en un directorio temporal y
+mide, para cada formato:
+  - tamaño en disco y razón de compresión
+  - validación previa (utils.inspect_csv)
+  - lectura completa (ingest.read_csv) en filas/s y MB/s descomprimidos
+  - lectura por bloques alineados a ciclos (la del scoring por lotes)
+
+Uso:
+    python benchmarks/bench_ingest.py --csv test.csv [--runs 3] [--chunk-size 200000]
+"""
+import argparse
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ventilator.ingest import open_input, read_csv  # noqa: E402
+from predict import iter_breath_chunks  # noqa: E402
+from ventilator.utils import inspect_csv  # noqa: E402
+
+
+def make_variants(csv_path, directory):
+    variants = {'plano': csv_path}
+
+    gz_path = os.path.join(directory, 'data.csv.gz')
+    with open(csv_path, 'rb') as src, gzip.open(gz_path, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    variants['gzip'] = gz_path
+
+    try:
+        import zstandard
+        zst_path = os.path.join(directory, 'data.csv.zst')
+        with open(csv_path, 'rb') as src, open(zst_path, 'wb') as dst:
+            zstandard.ZstdCompressor(level=3).copy_stream(src, dst)
+        variants['zstd'] = zst_path
+    except ImportError:
+        print("⚠️  zstandard no está instalado: se omite zstd")
+
+    return variants
+
+
+def best_of(runs, func):
+    times = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def stream_chunks(path, chunk_size):
+    rows = 0
+    with open(path, 'rb') as handle:
+        stream, _ = open_input(handle)
+        for chunk in iter_breath_chunks(stream, chunk_size):
+            rows += len(chunk)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de ingesta comprimida vs plana')
+    parser.add_argument('--csv', required=True)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--chunk-size', type=int, default=200000)
+    args = parser.parse_args()
+
+    raw_size = os.path.getsize(args.csv)
+    raw_mb = raw_size / 1024 / 1024
+
+    with tempfile.TemporaryDirectory() as directory:
+        variants = make_variants(args.csv, directory)
+
+        print(f"\n📊 Ingesta de {args.csv} ({raw_mb:.1f} MB sin comprimir, mejor de {args.runs})\n")
+        print(f"  {'formato':<8} {'tamaño MB':>10} {'razón':>6} {'validar ms':>11} "
+              f"{'lectura filas/s':>16} {'MB/s':>8} {'bloques filas/s':>16}")
+
+        for name, path in variants.items():
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            inspect_s, report = best_of(args.runs, lambda: inspect_csv(path))
+            read_s, df = best_of(args.runs, lambda: read_csv(path))
+            chunks_s, rows = best_of(args.runs, lambda: stream_chunks(path, args.chunk_size))
+            assert report['valid'] and rows == len(df)
+
+            print(f"  {name:<8} {size_mb:>10.1f} {raw_mb / size_mb:>5.1f}x {inspect_s * 1000:>11.1f} "
+                  f"{len(df) / read_s:>16,.0f} {raw_mb / read_s:>8.1f} {rows / chunks_s:>16,.0f}")
+
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark de memoria: camino float64 vs modo lean (float32, vistas, in-place)
+
+Para cada tamaño se entrena un VentilatorModel con datos sintéticos en un
+proceso aparte (así el pico de memoria de un caso no contamina al otro) y
+se reporta la memoria residente pico y la que agrega el entrenamiento por
+encima del DataFrame ya cargado. El bosque es chico a propósito: lo que
+se mide es el costo de las matrices de features, no el de los árboles.
+
+También compara las predicciones de un mismo modelo por ambos caminos
+(predict con lean=False / lean=True) para verificar la tolerancia.
+
+Uso:
+    python benchmarks/bench_memory.py [--rows 1000000 6000000] [--trees 3]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+STEPS_PER_BREATH = 80
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def reset_peak_rss():
+    """
+    Reiniciar el pico de memoria (Linux: escribir 5 en clear_refs), así el
+    pico medido no incluye los temporales de generar los datos. Retorna la
+    memoria residente actual en MB.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def synthetic_data(rows, seed=0):
+    """DataFrame con la forma del dataset de Kaggle (80 pasos por ciclo)"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    n_breaths = rows // STEPS_PER_BREATH
+    rows = n_breaths * STEPS_PER_BREATH
+    step = np.tile(np.arange(STEPS_PER_BREATH), n_breaths)
+    R = np.repeat(rng.choice([5, 20, 50], n_breaths), STEPS_PER_BREATH)
+    C = np.repeat(rng.choice([10, 20, 50], n_breaths), STEPS_PER_BREATH)
+    time_step = step * 0.033 + rng.uniform(0, 0.001, rows)
+    u_in = rng.uniform(0, 100, rows)
+    u_out = (step >= 30).astype(np.int64)
+    pressure = R * u_in * 0.02 + time_step * 50 / C + rng.normal(0, 1, rows)
+
+    return pd.DataFrame({
+        'id': np.arange(1, rows + 1),
+        'breath_id': np.repeat(np.arange(1, n_breaths + 1), STEPS_PER_BREATH),
+        'R': R, 'C': C, 'time_step': time_step,
+        'u_in': u_in, 'u_out': u_out, 'pressure': pressure,
+    })
+
+
+def child(rows, lean, trees, max_depth, compare):
+    """Un caso medido (se ejecuta en su propio proceso)"""
+    import contextlib
+    import gc
+    import io
+    import numpy as np
+    from ventilator.model import VentilatorModel
+
+    df = synthetic_data(rows)
+    gc.collect()
+    baseline = reset_peak_rss()
+
+    model = VentilatorModel('fast', params={'n_estimators': trees, 'max_depth': max_depth, 'verbose': 0})
+    start = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        val_mae = model.train(df, presorted=True, lean=lean)
+    seconds = time.time() - start
+    peak = peak_rss_mb()
+
+    result = {'rows': len(df), 'lean': lean, 'peak_mb': peak, 'baseline_mb': baseline,
+              'val_mae': float(val_mae), 'seconds': seconds}
+
+    if compare:
+        sample = df.head(min(len(df), 500000))
+        with contextlib.redirect_stdout(io.StringIO()):
+            p64 = model.predict(sample, presorted=True)
+            p32 = model.predict(sample, presorted=True, lean=True)
+        result['max_abs_diff'] = float(np.max(np.abs(p64 - p32)))
+        result['mismatch_rows'] = int(np.count_nonzero(np.abs(p64 - p32) > 1e-6))
+
+    print(json.dumps(result))
+
+
+def run_case(rows, lean, trees, max_depth, compare):
+    command = [sys.executable, os.path.abspath(__file__), '--child',
+               '--rows', str(rows), '--trees', str(trees), '--max-depth', str(max_depth)]
+    if lean:
+        command.append('--lean')
+    if compare:
+        command.append('--compare')
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memoria pico: float64 vs modo lean')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000000, 6000000])
+    parser.add_argument('--trees', type=int, default=3)
+    parser.add_argument('--max-depth', type=int, default=8)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--lean', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--compare', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.rows[0], args.lean, args.trees, args.max_depth, args.compare)
+        return
+
+    print(f"\n📊 Memoria pico de VentilatorModel.train ({args.trees} árboles, profundidad {args.max_depth})\n")
+    print(f"  {'filas':>10} {'modo':<8} {'pico MB':>9} {'entrenamiento MB':>17} {'MAE val':>8} {'s':>7}")
+
+    comparisons = []
+    for rows in args.rows:
+        results = {}
+        for lean in (False, True):
+            result = run_case(rows, lean, args.trees, args.max_depth, compare=True)
+            results[lean] = result
+            if 'max_abs_diff' in result:
+                comparisons.append(result)
+            print(f"  {result['rows']:>10,} {'lean' if lean else 'float64':<8} {result['peak_mb']:>9.0f} "
+                  f"{result['peak_mb'] - result['baseline_mb']:>17.0f} {result['val_mae']:>8.3f} "
+                  f"{result['seconds']:>7.1f}")
+        saved = 1 - (results[True]['peak_mb'] - results[True]['baseline_mb']) / \
+            max(results[False]['peak_mb'] - results[False]['baseline_mb'], 1)
+        print(f"  {'':>10} {'ahorro':<8} {'':>9} {saved:>16.0%}")
+
+    print("\n🔍 Predicciones del mismo modelo, float64 vs lean:")
+    for result in comparisons:
+        mode = 'lean' if result['lean'] else 'float64'
+        print(f"  {result['rows']:>10,} filas, modelo entrenado en {mode}: diferencia máxima {result['max_abs_diff']:.2e} cmH₂O, "
+              f"{result['mismatch_rows']:,} filas con diferencia > 1e-6")
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark del formato de respuesta de predicciones: CSV vs JSON vs columnar
+
+Genera N pares (id, pressure) sintéticos y mide para cada formato el tamaño
+del payload, el tiempo de serialización (servidor) y el de decodificación
+(cliente, en Python). El CSV es el de /api/predict_and_download y el JSON el
+de una lista de dicts como la de /api/predict.
+
+Uso:
+    python benchmarks/bench_response.py [--rows 6036000] [--runs 3]
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from columnar import decode_predictions, encode_predictions  # noqa: E402
+
+
+def best_of(runs, func):
+    times = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def csv_encode(ids, pressures):
+    import pandas as pd
+    output = io.StringIO()
+    pd.DataFrame({'id': ids, 'pressure': pressures}).to_csv(output, index=False)
+    return output.getvalue().encode('utf-8')
+
+
+def csv_decode(payload):
+    import pandas as pd
+    return pd.read_csv(io.BytesIO(payload))
+
+
+def json_encode(ids, pressures):
+    return json.dumps([
+        {'id': int(i), 'pressure': float(p)} for i, p in zip(ids, pressures)
+    ]).encode('utf-8')
+
+
+def json_decode(payload):
+    return json.loads(payload)
+
+
+def main():
+    import numpy as np
+
+    parser = argparse.ArgumentParser(description='Benchmark de formatos de respuesta de predicciones')
+    parser.add_argument('--rows', type=int, default=6036000)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--skip-json', action='store_true', help='Omitir JSON (lento con millones de filas)')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ids = np.arange(1, args.rows + 1, dtype=np.int64)
+    pressures = rng.uniform(-2, 65, args.rows)
+
+    formats = {
+        'csv': (csv_encode, csv_decode),
+        'json': (json_encode, json_decode),
+        'columnar': (lambda i, p: encode_predictions(i, p), decode_predictions),
+    }
+    if args.skip_json:
+        del formats['json']
+
+    print(f"\n📊 Respuesta con {args.rows:,} predicciones (mejor de {args.runs})\n")
+    print(f"  {'formato':<9} {'tamaño MB':>10} {'vs CSV':>7} {'serializar ms':>14} {'decodificar ms':>15}")
+
+    csv_size = None
+    for name, (encode, decode) in formats.items():
+        encode_s, payload = best_of(args.runs, lambda: encode(ids, pressures))
+        decode_s, _ = best_of(args.runs, lambda: decode(payload))
+        size = len(payload)
+        csv_size = csv_size or size
+        print(f"  {name:<9} {size / 1024 / 1024:>10.1f} {size / csv_size:>6.0%} "
+              f"{encode_s * 1000:>14.1f} {decode_s * 1000:>15.1f}")
+
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Memoria total del modelo con 1, 4 y 8 workers
+
+Cada worker es un proceso aparte (como los del pool de SERVING_WORKERS) que
+carga la misma versión del registro de una de estas formas:
+
+    mmap     model.vcm mapeado en memoria (el modo de servicio por defecto)
+    copia    model.vcm copiado a memoria privada (MODEL_MMAP=false)
+    pickle   model.pkl de sklearn (una copia privada por proceso)
+
+Después de cargar, cada worker recorre todos los arreglos del modelo (peor
+caso: todas las páginas residentes) y, con --file, hace una predicción.
+Se suma por proceso, desde /proc/<pid>/smaps_rollup:
+
+    RSS      cuenta las páginas compartidas una vez por proceso
+    PSS      reparte cada página compartida entre los procesos que la mapean
+    privado  páginas que sólo tiene ese proceso
+
+El costo del modelo es el PSS total menos el de workers sin modelo.
+
+Uso:
+    MODEL_FOLDER=models python benchmarks/bench_shared_model.py \\
+        [--version v3] [--workers 1 4 8] [--modes mmap copia pickle] [--file test.csv]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+
+def memory_kb(pid):
+    """{'Rss', 'Pss', 'Private'} en KB"""
+    values = {'Rss': 0, 'Pss': 0, 'Private': 0}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            name, _, rest = line.partition(':')
+            if name in ('Rss', 'Pss'):
+                values[name] = int(rest.split()[0])
+            elif name in ('Private_Clean', 'Private_Dirty'):
+                values['Private'] += int(rest.split()[0])
+    return values
+
+
+def touch(model):
+    """Leer todos los arreglos del modelo para que sus páginas queden residentes"""
+    import numpy as np
+
+    forests = getattr(model.model, 'models', [model.model])
+    for forest in forests:
+        for array in forest.arrays():
+            np.add.reduce(array, axis=None, dtype=np.float64)
+
+
+def worker(mode, model_folder, version, csv_path, ready, stop):
+    sys.path.insert(0, BACKEND)
+    import pandas as pd
+    from ventilator.model import VentilatorModel
+    from registry import ModelRegistry
+
+    sys.stdout = open(os.devnull, 'w')
+    model = None
+    if mode == 'pickle':
+        model = VentilatorModel()
+        model.load(os.path.join(model_folder, version, 'model.pkl'))
+    elif mode in ('mmap', 'copia'):
+        model = ModelRegistry(model_folder, use_mmap=mode == 'mmap').get(version)
+        touch(model)
+
+    if model is not None and csv_path:
+        model.predict(pd.read_csv(csv_path))
+    ready.set()
+    stop.wait()
+
+
+def measure(mode, n_workers, model_folder, version, csv_path):
+    context = multiprocessing.get_context('spawn')
+    stop = context.Event()
+    readies = [context.Event() for _ in range(n_workers)]
+    processes = [
+        context.Process(target=worker, args=(mode, model_folder, version, csv_path, ready, stop))
+        for ready in readies
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for ready in readies:
+            ready.wait()
+        totals = {'Rss': 0, 'Pss': 0, 'Private': 0}
+        for process in processes:
+            for name, value in memory_kb(process.pid).items():
+                totals[name] += value
+        return {name: value / 1024 for name, value in totals.items()}
+    finally:
+        stop.set()
+        for process in processes:
+            process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSS / PSS total del modelo con varios workers')
+    parser.add_argument('--version', help='Versión del registro (por defecto la versión por defecto)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--modes', nargs='+', default=['mmap', 'copia', 'pickle'],
+                        choices=['mmap', 'copia', 'pickle'])
+    parser.add_argument('--file', help='CSV para una predicción en cada worker')
+    args = parser.parse_args()
+
+    from config import Config
+    from registry import ModelRegistry
+
+    registry = ModelRegistry(Config.MODEL_FOLDER)
+    version = args.version or registry.default_version
+    if version is None:
+        raise SystemExit('❌ No hay modelos en el registro: entrena uno antes de medir')
+    size = os.path.getsize(registry.compact_path(version)) / 1024 ** 2
+    print(f"📦 Modelo {version}: model.vcm de {size:.1f} MB")
+
+    results = {}
+    for n_workers in args.workers:
+        base = measure('ninguno', n_workers, Config.MODEL_FOLDER, version, None)
+        for mode in args.modes:
+            results[(mode, n_workers)] = (measure(mode, n_workers, Config.MODEL_FOLDER, version, args.file), base)
+            print(f"  ✓ {mode} con {n_workers} workers")
+
+    print("\n📊 Memoria total de los workers (MB)\n")
+    print(f"  {'modo':<8} {'workers':>7} {'RSS':>9} {'PSS':>9} {'privado':>9} {'modelo (PSS)':>13} {'por worker':>11}")
+    for mode in args.modes:
+        for n_workers in args.workers:
+            totals, base = results[(mode, n_workers)]
+            model_mb = totals['Pss'] - base['Pss']
+            print(f"  {mode:<8} {n_workers:>7} {totals['Rss']:>9.1f} {totals['Pss']:>9.1f} "
+                  f"{totals['Private']:>9.1f} {model_mb:>13.1f} {model_mb / n_workers:>11.1f}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
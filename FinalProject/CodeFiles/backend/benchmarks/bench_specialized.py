@@ -0,0 +1,127 @@
+"""
+Reporte: un modelo global vs un sub-modelo por par (R, C)
+
+Con el mismo split por ciclos y el mismo scaler entrena el modelo 'fast'
+global y la versión especializada (ver ventilator/specialized.py), y compara:
+
+    - tiempo de entrenamiento (los 9 grupos en paralelo con --workers)
+    - MAE de validación, total y por par (R, C)
+    - tamaño del modelo compacto (.vcm) y tiempo de inferencia, tanto con
+      sklearn como con el formato compacto que se sirve
+
+Uso:
+    python benchmarks/bench_specialized.py --input train.csv \\
+        [--sample-breaths 0.2] [--n-estimators 100] [--workers 4] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+
+def best_time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Modelo global vs especializado por (R, C)')
+    parser.add_argument('--input', required=True, help='CSV de entrenamiento (con pressure)')
+    parser.add_argument('--sample-breaths', type=float, default=None)
+    parser.add_argument('--n-estimators', type=int, default=None, help='Árboles por modelo (por defecto los de fast)')
+    parser.add_argument('--workers', type=int, default=None, help='Grupos entrenados a la vez')
+    parser.add_argument('--validation-split', type=float, default=0.2)
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones de la inferencia (se toma la mejor)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    import numpy as np
+    import pandas as pd
+    from sklearn.preprocessing import StandardScaler
+    from ventilator.compact import export_compact, load_compact
+    from ventilator.features import build_features
+    from ventilator.model import _build_estimator
+    from ventilator.specialized import fit_groups
+    from train import load_training_data
+
+    df, presorted = load_training_data(args.input, args.sample_breaths, args.seed)
+    # Split por ciclos como en VentilatorModel.train(lean=True): validación al final
+    breath_ids = pd.unique(df['breath_id'])
+    holdout = np.zeros(len(breath_ids), dtype=bool)
+    holdout[np.random.default_rng(args.seed).permutation(len(breath_ids))[:int(len(breath_ids) * args.validation_split)]] = True
+    n_train = len(df) - int(df['breath_id'].isin(breath_ids[holdout]).sum())
+    X, y, _ = build_features(df, presorted, holdout=holdout)
+
+    scaler = StandardScaler().fit(X[:n_train])
+    X = scaler.transform(X)
+    X_train, X_val, y_train, y_val = X[:n_train], X[n_train:], y[:n_train], y[n_train:]
+    params = {'n_estimators': args.n_estimators} if args.n_estimators else None
+    print(f"\n  Entrenamiento: {len(X_train):,} filas  |  Validación: {len(X_val):,} filas")
+
+    print("\n▶ Modelo global")
+    start = time.perf_counter()
+    global_model = _build_estimator('fast', params)
+    global_model.set_params(verbose=0)
+    global_model.fit(X_train, y_train)
+    global_fit = time.perf_counter() - start
+
+    print("\n▶ Modelo especializado por (R, C)")
+    start = time.perf_counter()
+    grouped = fit_groups('fast', X_train, y_train, params, workers=args.workers)
+    grouped_fit = time.perf_counter() - start
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, estimator, fit_seconds in (('global', global_model, global_fit),
+                                             ('por (R, C)', grouped, grouped_fit)):
+            path = os.path.join(tmp, 'model.vcm')
+            export_compact(estimator, scaler, 'fast', path)
+            compact, _, _ = load_compact(path)
+            sk_seconds, predictions = best_time(lambda: estimator.predict(X_val), args.repeat)
+            vcm_seconds, _ = best_time(lambda: compact.predict(X_val), args.repeat)
+            results[name] = {
+                'fit': fit_seconds,
+                'mae': float(np.mean(np.abs(predictions - y_val))),
+                'predictions': predictions,
+                'bytes': os.path.getsize(path),
+                'sklearn': sk_seconds,
+                'compact': vcm_seconds,
+            }
+
+    print(f"\n📊 Global vs especializado ({len(X_val):,} filas de validación)\n")
+    print(f"  {'modelo':<12} {'ajuste s':>9} {'MAE':>8} {'.vcm MB':>8} {'sklearn ms':>11} {'compacto ms':>12}")
+    for name, r in results.items():
+        print(f"  {name:<12} {r['fit']:>9.2f} {r['mae']:>8.4f} {r['bytes'] / 1024 ** 2:>8.1f} "
+              f"{r['sklearn'] * 1000:>11.1f} {r['compact'] * 1000:>12.1f}")
+
+    # MAE por configuración pulmonar, con los valores originales de R y C
+    R = X_val[:, 0] * scaler.scale_[0] + scaler.mean_[0]
+    C = X_val[:, 1] * scaler.scale_[1] + scaler.mean_[1]
+    print(f"\n  {'R':>4} {'C':>4} {'filas':>9} {'MAE global':>11} {'MAE (R, C)':>11}")
+    for r_value in np.unique(np.round(R)):
+        for c_value in np.unique(np.round(C)):
+            rows = (np.round(R) == r_value) & (np.round(C) == c_value)
+            if not rows.any():
+                continue
+            maes = [np.mean(np.abs(results[name]['predictions'][rows] - y_val[rows])) for name in results]
+            print(f"  {r_value:>4.0f} {c_value:>4.0f} {int(rows.sum()):>9,} {maes[0]:>11.4f} {maes[1]:>11.4f}")
+
+    g, s = results['global'], results['por (R, C)']
+    print(f"\n  MAE: {'mejor' if s['mae'] < g['mae'] else 'peor'} con sub-modelos "
+          f"({s['mae']:.4f} vs {g['mae']:.4f}, {(s['mae'] / g['mae'] - 1) * 100:+.1f}%)")
+    print(f"  Inferencia compacta: {'más rápida' if s['compact'] < g['compact'] else 'más lenta'} "
+          f"({g['compact'] / s['compact']:.2f}x)")
+    print(f"  Inferencia sklearn:  {'más rápida' if s['sklearn'] < g['sklearn'] else 'más lenta'} "
+          f"({g['sklearn'] / s['sklearn']:.2f}x)\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark de arranque en frío del backend
+
+Mide, en un proceso nuevo de Python para cada corrida:
+  - tiempo de importar app.py
+  - tiempo hasta la primera respuesta de /api/status
+  - qué librerías pesadas quedaron cargadas (pandas, numpy, sklearn)
+  - opcionalmente, carga + predicción con un modelo compacto (.vcm),
+    verificando que sklearn nunca se importe
+
+Uso:
+    python benchmarks/bench_startup.py [--runs 5] [--model model.vcm --csv test.csv]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATUS_SNIPPET = '''
+import json, sys, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+client = app.app.test_client()
+response = client.get('/api/status')
+t2 = time.perf_counter()
+assert response.status_code == 200
+print(json.dumps({
+    'import_ms': (t1 - t0) * 1000,
+    'first_status_ms': (t2 - t0) * 1000,
+    'pandas': 'pandas' in sys.modules,
+    'numpy': 'numpy' in sys.modules,
+    'sklearn': 'sklearn' in sys.modules,
+}))
+'''
+
+COMPACT_SNIPPET = '''
+import json, sys, time
+t0 = time.perf_counter()
+from ventilator.model import VentilatorModel
+import pandas as pd
+model = VentilatorModel()
+model.load(sys.argv[1])
+t1 = time.perf_counter()
+df = pd.read_csv(sys.argv[2], nrows=8000)
+t2 = time.perf_counter()
+model.predict(df)
+t3 = time.perf_counter()
+print(json.dumps({
+    'load_ms': (t1 - t0) * 1000,
+    'predict_ms': (t3 - t2) * 1000,
+    'sklearn': 'sklearn' in sys.modules,
+}))
+'''
+
+
+def run_snippet(snippet, *args):
+    """Ejecutar el snippet en un intérprete nuevo y leer su última línea JSON"""
+    result = subprocess.run(
+        [sys.executable, '-c', snippet, *args],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(name, values):
+    values = sorted(values)
+    median = values[len(values) // 2]
+    print(f"  {name:<20} mediana {median:8.1f} ms   min {values[0]:8.1f} ms   max {values[-1]:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de arranque en frío')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--model', help='Modelo compacto (.vcm) para medir la ruta sin sklearn')
+    parser.add_argument('--csv', help='CSV de test para la predicción con el modelo compacto')
+    args = parser.parse_args()
+
+    print(f"\n🚀 Arranque en frío de app.py ({args.runs} corridas)")
+    runs = [run_snippet(STATUS_SNIPPET) for _ in range(args.runs)]
+    summarize('import app', [r['import_ms'] for r in runs])
+    summarize('primer /api/status', [r['first_status_ms'] for r in runs])
+    loaded = [lib for lib in ('pandas', 'numpy', 'sklearn') if runs[-1][lib]]
+    print(f"  Librerías pesadas cargadas: {', '.join(loaded) if loaded else 'ninguna'}")
+
+    if args.model and args.csv:
+        print(f"\n📦 Ruta compacta: {args.model}")
+        runs = [run_snippet(COMPACT_SNIPPET, args.model, args.csv) for _ in range(args.runs)]
+        summarize('cargar modelo', [r['load_ms'] for r in runs])
+        summarize('predecir 8000 filas', [r['predict_ms'] for r in runs])
+        print(f"  sklearn importado: {'sí' if runs[-1]['sklearn'] else 'no'}")
+
+
+if __name__ == '__main__':
+    main()
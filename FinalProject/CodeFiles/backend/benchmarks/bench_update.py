@@ -0,0 +1,87 @@
+"""
+Benchmark de actualización incremental vs reentrenamiento completo
+
+Entrena un modelo base con --base-breaths ciclos y, para cada tamaño de
+datos nuevos, compara VentilatorModel.update (árboles agregados con los
+ciclos nuevos) contra entrenar de cero con historial + nuevos. Reporta el
+tiempo de cada camino y el MAE sobre los mismos ciclos de validación.
+
+Uso:
+    python benchmarks/bench_update.py --input train.csv \\
+        [--base-breaths 2000] [--new-breaths 100 200 400 800] [--n-estimators 30]
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Actualización incremental vs reentrenamiento')
+    parser.add_argument('--input', required=True, help='CSV de entrenamiento (con pressure)')
+    parser.add_argument('--model-type', default='fast', choices=['fast', 'accurate'])
+    parser.add_argument('--base-breaths', type=int, default=2000)
+    parser.add_argument('--new-breaths', type=int, nargs='+', default=[100, 200, 400, 800])
+    parser.add_argument('--n-estimators', type=int, default=30)
+    args = parser.parse_args()
+
+    import numpy as np
+    import pandas as pd
+    from ventilator.features import build_features
+    from ventilator.ingest import read_csv
+    from ventilator.model import VentilatorModel
+
+    df = read_csv(args.input)
+    breaths = pd.unique(df['breath_id'])
+    needed = args.base_breaths + max(args.new_breaths)
+    if len(breaths) < needed:
+        raise SystemExit(f'❌ El CSV tiene {len(breaths)} ciclos; hacen falta {needed}')
+
+    params = {'n_estimators': args.n_estimators, 'verbose': 0}
+    history = df[df['breath_id'].isin(breaths[:args.base_breaths])]
+    sys.stdout = open(os.devnull, 'w')  # el detalle de cada entrenamiento no interesa aquí
+    base = VentilatorModel(args.model_type, params)
+    base.train(history)
+    sys.stdout = sys.__stdout__
+
+    rows = []
+    for n_new in args.new_breaths:
+        new = df[df['breath_id'].isin(breaths[args.base_breaths:args.base_breaths + n_new])]
+
+        sys.stdout = open(os.devnull, 'w')
+        model = copy.deepcopy(base)
+        start = time.perf_counter()
+        summary = model.update(new)
+        update_seconds = time.perf_counter() - start
+
+        # Mismos ciclos de validación que usó update
+        ids = pd.unique(new['breath_id'])
+        holdout = np.zeros(len(ids), dtype=bool)
+        holdout[np.random.default_rng(42).permutation(len(ids))[:int(len(ids) * 0.2)]] = True
+        validation = new[new['breath_id'].isin(ids[holdout])]
+        X_val, y_val, _ = build_features(validation)
+
+        full = VentilatorModel(args.model_type, params)
+        start = time.perf_counter()
+        full.train(pd.concat([history, new[~new['breath_id'].isin(ids[holdout])]], ignore_index=True))
+        full_seconds = time.perf_counter() - start
+        full_mae = float(np.mean(np.abs(full.model.predict(full.scaler.transform(X_val)) - y_val)))
+        sys.stdout = sys.__stdout__
+
+        rows.append((n_new, len(new), summary, update_seconds, full_seconds, full_mae))
+
+    print(f"\n📊 Base: {args.base_breaths} ciclos, {args.n_estimators} árboles ({args.model_type})\n")
+    print(f"  {'ciclos nuevos':>13} {'filas':>8} {'árboles +':>9} {'update s':>9} {'completo s':>11} "
+          f"{'MAE antes':>10} {'MAE update':>11} {'MAE completo':>13}")
+    for n_new, n_rows, summary, update_seconds, full_seconds, full_mae in rows:
+        print(f"  {n_new:>13} {n_rows:>8,} {summary['added_trees']:>9} {update_seconds:>9.2f} {full_seconds:>11.2f} "
+              f"{summary['val_mae_before']:>10.4f} {summary['val_mae_after']:>11.4f} {full_mae:>13.4f}")
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+Prueba de carga local: predicciones pesadas + endpoints livianos a la vez
+
+Clientes "pesados" envían el CSV a /api/predict (o /api/predict_and_download)
+en bucle, mientras clientes "livianos" consultan /api/status, /api/models y
+/api/load_model. Al final se reporta por endpoint: peticiones, códigos de
+respuesta (503 = cola llena, 504 = timeout) y latencias p50 / p99 / máx.
+
+Con --spawn el script levanta el servidor (sin reloader) en un puerto libre
+con la configuración pedida; --compare lo hace dos veces, sin pool
+(SERVING_WORKERS=0) y con pool, para ver la diferencia en los livianos.
+
+Uso:
+    python benchmarks/load_test.py --spawn --compare --file test.csv \\
+        --workers 2 --queue 4 --heavy-clients 4 --light-clients 4 --duration 20
+    python benchmarks/load_test.py --url http://localhost:5000 --file test.csv
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def multipart(fields, file_field, filename, content):
+    boundary = uuid.uuid4().hex
+    lines = []
+    for name, value in fields.items():
+        lines.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    lines.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+        f'Content-Type: text/csv\r\n\r\n'.encode() + content + b'\r\n'
+    )
+    lines.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(lines), f'multipart/form-data; boundary={boundary}'
+
+
+def request(url, data=None, content_type=None, timeout=600):
+    """Retorna (status, segundos, bytes de la respuesta)"""
+    req = urllib.request.Request(url, data=data, method='POST' if data is not None else 'GET')
+    if content_type:
+        req.add_header('Content-Type', content_type)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            body = response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        body = b''
+        status = 0  # conexión rechazada / cortada
+    return status, time.perf_counter() - start, body
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def add(self, endpoint, status, seconds):
+        with self.lock:
+            self.samples.setdefault(endpoint, []).append((status, seconds))
+
+    def report(self, title):
+        print(f"\n📊 {title}\n")
+        print(f"  {'endpoint':<28} {'peticiones':>10} {'códigos':<24} {'p50 ms':>9} {'p99 ms':>9} {'máx ms':>9}")
+        for endpoint, samples in sorted(self.samples.items()):
+            codes = {}
+            for status, _ in samples:
+                codes[status] = codes.get(status, 0) + 1
+            latencies = sorted(s for _, s in samples)
+            p50 = latencies[len(latencies) // 2]
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            code_text = ' '.join(f'{c}:{n}' for c, n in sorted(codes.items()))
+            print(f"  {endpoint:<28} {len(samples):>10} {code_text:<24} {p50 * 1000:>9.1f} "
+                  f"{p99 * 1000:>9.1f} {latencies[-1] * 1000:>9.1f}")
+
+
+def heavy_client(base, endpoint, content, filename, stop, recorder):
+    while not stop.is_set():
+        body, content_type = multipart({}, 'file', filename, content)
+        status, seconds, _ = request(f'{base}{endpoint}', body, content_type)
+        recorder.add(endpoint, status, seconds)
+        if status == 503:
+            time.sleep(0.5)  # respetar la contrapresión antes de reintentar
+
+
+def light_client(base, paths, stop, recorder, interval):
+    i = 0
+    while not stop.is_set():
+        path = paths[i % len(paths)]
+        status, seconds, _ = request(f'{base}{path}')
+        recorder.add(path.split('?')[0], status, seconds)
+        i += 1
+        time.sleep(interval)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(workers, queue, timeout, extra_env=None):
+    port = free_port()
+    env = dict(os.environ, SERVING_WORKERS=str(workers), SERVING_QUEUE=str(queue),
+               SERVING_TIMEOUT=str(timeout), **(extra_env or {}))
+    code = f"import app; app.app.run(port={port}, threaded=True, debug=False)"
+    process = subprocess.Popen([sys.executable, '-c', code], cwd=BACKEND, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f'http://127.0.0.1:{port}'
+    for _ in range(200):
+        if request(f'{base}/api/status', timeout=1)[0] == 200:
+            return process, base
+        time.sleep(0.1)
+    process.kill()
+    raise RuntimeError('El servidor no arrancó')
+
+
+def run(base, args, content):
+    status, _, body = request(f'{base}/api/status')
+    if status != 200:
+        raise RuntimeError(f'{base}/api/status respondió {status}')
+    default = json.loads(body).get('default_version')
+    if default is None:
+        raise RuntimeError('No hay modelos en el registro: entrena uno antes de la prueba')
+
+    light_paths = ['/api/status', '/api/models', f'/api/load_model?version={default}']
+    recorder = Recorder()
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=heavy_client, daemon=True,
+                         args=(base, args.endpoint, content, os.path.basename(args.file), stop, recorder))
+        for _ in range(args.heavy_clients)
+    ] + [
+        threading.Thread(target=light_client, daemon=True,
+                         args=(base, light_paths, stop, recorder, args.light_interval))
+        for _ in range(args.light_clients)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return recorder
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga con mezcla de endpoints')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--file', required=True, help='CSV de test para las predicciones')
+    parser.add_argument('--endpoint', default='/api/predict',
+                        choices=['/api/predict', '/api/predict_and_download'])
+    parser.add_argument('--heavy-clients', type=int, default=4)
+    parser.add_argument('--light-clients', type=int, default=4)
+    parser.add_argument('--light-interval', type=float, default=0.05, help='Pausa entre peticiones livianas (s)')
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--spawn', action='store_true', help='Levantar el servidor para la prueba')
+    parser.add_argument('--compare', action='store_true', help='Con --spawn: sin pool y con pool')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--queue', type=int, default=4)
+    parser.add_argument('--timeout', type=int, default=60)
+    args = parser.parse_args()
+
+    with open(args.file, 'rb') as f:
+        content = f.read()
+
+    if not args.spawn:
+        run(args.url, args, content).report(f'{args.url} durante {args.duration:.0f} s')
+        return
+
+    modes = [0, args.workers] if args.compare else [args.workers]
+    for workers in modes:
+        process, base = spawn_server(workers, args.queue, args.timeout)
+        try:
+            recorder = run(base, args, content)
+        finally:
+            process.terminate()
+            process.wait()
+        title = ('Sin pool (predicciones en el hilo de la petición)' if not workers else
+                 f'Pool de {workers} procesos, cola {args.queue}, timeout {args.timeout} s')
+        recorder.report(f'{title} - {args.heavy_clients} pesados + {args.light_clients} livianos, '
+                        f'{args.duration:.0f} s')
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+import json
+
+# Respuesta binaria columnar de /api/predict
+#
+# Se pide con el header Accept: application/vnd.ventilator.predictions
+#
+#   MAGIC (4 bytes) | largo del header (uint32 LE) | header JSON | columnas
+#
+# Cada columna es un arreglo little-endian contiguo que empieza alineado a
+# 8 bytes: el cliente la lee como Int32Array / Float32Array (JS) o con
+# np.frombuffer (Python) directamente sobre el buffer recibido, sin copiar
+# ni parsear texto. El header describe cada columna (dtype, largo, offset
+# relativo al inicio de las columnas) y la página de ciclos entregada.
+
+MIME_TYPE = 'application/vnd.ventilator.predictions'
+MAGIC = b'VPR1'
+ALIGNMENT = 8
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def breath_page(df, breath_start=None, max_breaths=None):
+    """
+    Seleccionar una página de ciclos: los primeros `max_breaths` ciclos con
+    breath_id >= breath_start (en orden de breath_id). Los ciclos quedan
+    completos, así sus features son idénticas a las del archivo entero.
+
+    Retorna (df de la página, info) con info = breath_start, breath_end
+    (último breath_id incluido), next_breath_start (None si no hay más) y
+    total_breaths del archivo.
+    """
+    import numpy as np
+
+    breaths = np.sort(df['breath_id'].unique())
+    info = {'total_breaths': int(len(breaths))}
+
+    first = 0 if breath_start is None else int(np.searchsorted(breaths, breath_start))
+    last = len(breaths) if max_breaths is None else min(len(breaths), first + max_breaths)
+
+    if first >= last:
+        info.update(breath_start=None, breath_end=None, next_breath_start=None)
+        return df.iloc[:0], info
+
+    info.update(
+        breath_start=int(breaths[first]),
+        breath_end=int(breaths[last - 1]),
+        next_breath_start=int(breaths[last]) if last < len(breaths) else None,
+    )
+    if first == 0 and last == len(breaths):
+        return df, info
+
+    breath_id = df['breath_id'].to_numpy()
+    mask = (breath_id >= breaths[first]) & (breath_id <= breaths[last - 1])
+    return df[mask].reset_index(drop=True), info
+
+
+def encode_predictions(ids, pressures, info=None):
+    """
+    Serializar id / pressure al formato columnar.
+
+    Los ids van como int32 si caben (los del dataset llegan a ~6M) y las
+    presiones como float32: la mitad de bytes que float64 con un error
+    (~1e-5 cmH₂O) muy por debajo del error del modelo.
+    """
+    import numpy as np
+
+    ids = np.asarray(ids)
+    id_dtype = np.int32 if len(ids) == 0 or (ids.min() >= -2**31 and ids.max() < 2**31) else np.int64
+    columns = {
+        'id': ids.astype(np.dtype(id_dtype).newbyteorder('<'), copy=False),
+        'pressure': np.asarray(pressures).astype('<f4', copy=False),
+    }
+
+    header = dict(info or {}, rows=len(ids), columns={})
+    offset = 0
+    for name, arr in columns.items():
+        offset = _align(offset)
+        header['columns'][name] = {'dtype': arr.dtype.str, 'length': len(arr), 'offset': offset}
+        offset += arr.nbytes
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + 4 + len(header_bytes))
+
+    # Un único buffer: las columnas se copian una vez a su posición final
+    buffer = bytearray(data_start + offset)
+    buffer[:len(MAGIC)] = MAGIC
+    buffer[len(MAGIC):len(MAGIC) + 4] = len(header_bytes).to_bytes(4, 'little')
+    buffer[len(MAGIC) + 4:len(MAGIC) + 4 + len(header_bytes)] = header_bytes
+    for name, arr in columns.items():
+        start = data_start + header['columns'][name]['offset']
+        np.frombuffer(buffer, dtype=arr.dtype, count=len(arr), offset=start)[:] = arr
+
+    return buffer
+
+
+def decode_predictions(buffer):
+    """
+    Leer una respuesta columnar. Las columnas son vistas de solo lectura
+    sobre `buffer` (no se copian).
+
+    Retorna (header, {nombre: np.ndarray})
+    """
+    import numpy as np
+
+    view = memoryview(buffer)
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError('La respuesta no tiene el formato columnar de predicciones')
+    header_len = int.from_bytes(view[len(MAGIC):len(MAGIC) + 4], 'little')
+    header = json.loads(bytes(view[len(MAGIC) + 4:len(MAGIC) + 4 + header_len]).decode('utf-8'))
+    data_start = _align(len(MAGIC) + 4 + header_len)
+
+    columns = {}
+    for name, spec in header['columns'].items():
+        columns[name] = np.frombuffer(
+            view, dtype=np.dtype(spec['dtype']), count=spec['length'],
+            offset=data_start + spec['offset']
+        )
+    return header, columns
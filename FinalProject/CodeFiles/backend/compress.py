@@ -0,0 +1,70 @@
+"""
+Compresión del modelo compacto (.vcm) contra un presupuesto de MAE
+
+Busca la compresión más agresiva que mantiene el MAE de validación dentro
+de MAE original * (1 + --mae-budget) (ver ventilator/compress.py) y
+reporta tamaño, tiempo de carga, velocidad de inferencia y MAE de cada
+variante.
+
+Uso:
+    python compress.py --version v3 --input valid.csv --mae-budget 0.01 --register
+    python compress.py --model model.pkl --input valid.csv --prune depth --output model_small.vcm
+"""
+import argparse
+import os
+
+from ventilator.compress import report
+from ventilator.model import VentilatorModel
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cuantizar y podar el modelo compacto')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--version', help='Versión del registro (usa su model.pkl)')
+    source.add_argument('--model', help='Archivo model.pkl')
+    parser.add_argument('--input', required=True, help='CSV de validación (con pressure)')
+    parser.add_argument('--sample-breaths', type=float, default=None,
+                        help='Fracción (<=1) o número de ciclos del CSV a usar')
+    parser.add_argument('--mae-budget', type=float, default=0.01,
+                        help='Aumento relativo de MAE permitido (0.01 = +1%%)')
+    parser.add_argument('--prune', default='both', choices=['none', 'depth', 'trees', 'both'])
+    parser.add_argument('--no-quantize', action='store_true', help='No cuantizar umbrales ni hojas')
+    parser.add_argument('--output', help='Escribir el .vcm comprimido en este archivo')
+    parser.add_argument('--register', action='store_true', help='Registrar como nueva versión')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    from config import Config
+    from registry import ModelRegistry
+    from train import load_training_data
+
+    registry = ModelRegistry(Config.MODEL_FOLDER)
+    path = args.model or os.path.join(Config.MODEL_FOLDER, args.version, 'model.pkl')
+    if not os.path.exists(path):
+        raise SystemExit(f'❌ No existe {path}: la compresión necesita el modelo completo (.pkl)')
+
+    model = VentilatorModel()
+    model.load(path)
+    df, presorted = load_training_data(args.input, args.sample_breaths, args.seed)
+    X_val, y_val = model.prepare_features(df, presorted)
+    X_val = model.scaler.transform(X_val)
+
+    result = model.compress(X_val, y_val, args.mae_budget, not args.no_quantize, args.prune)
+    report(model, X_val, y_val, [(name, compression) for name, compression, _ in result['steps']])
+    print(f"✓ Compresión elegida: {result['compression']}")
+
+    if args.output:
+        model.export_compact(args.output)
+    if args.register:
+        metadata = registry.metadata(args.version) if args.version else {}
+        metadata = {k: v for k, v in metadata.items() if k not in ('version', 'created_at')}
+        metadata.update({
+            'compressed_from': args.version or os.path.abspath(path),
+            'compression': result['compression'],
+            'compressed_val_mae': result['mae'],
+        })
+        registry.register(model, metadata)
+
+
+if __name__ == '__main__':
+    main()
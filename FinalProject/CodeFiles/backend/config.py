@@ -10,8 +10,33 @@ class Config:
     FLASK_PORT = int(os.getenv('FLASK_PORT', 5000))
     TORCH_DEVICE = os.getenv('TORCH_DEVICE', 'cpu')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
-    UPLOAD_FOLDER = 'uploads'
-    MODEL_FOLDER = 'models'
+    UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
+    # Subidas por partes (/api/uploads): cada parte es una petición aparte,
+    # así el archivo completo puede superar MAX_CONTENT_LENGTH
+    UPLOAD_PART_SIZE = int(os.getenv('UPLOAD_PART_SIZE_MB', 8)) * 1024 * 1024
+    UPLOAD_TIMEOUT = int(os.getenv('UPLOAD_TIMEOUT', 600))  # segundos esperando partes
+    # Uploads sin actividad (abandonados o nunca consumidos) se borran pasado el TTL
+    UPLOAD_TTL = int(os.getenv('UPLOAD_TTL', 3600))
+    UPLOAD_INGEST_WORKERS = int(os.getenv('UPLOAD_INGEST_WORKERS', 2))  # parseos simultáneos
+    MODEL_FOLDER = os.getenv('MODEL_FOLDER', 'models')
+    # Memoria máxima para modelos cargados a la vez (se descargan por LRU)
+    MODEL_MEMORY_BUDGET = int(os.getenv('MODEL_MEMORY_BUDGET_MB', 1024)) * 1024 * 1024
+    # Modelos mapeados desde model.vcm y compartidos entre procesos (false = copia privada)
+    MODEL_MMAP = os.getenv('MODEL_MMAP', 'true').lower() in ('1', 'true', 'yes')
+    # Features en float32 normalizadas in-place (ver VentilatorModel.train)
+    LEAN_FEATURES = os.getenv('LEAN_FEATURES', 'false').lower() in ('1', 'true', 'yes')
+    # Predicciones en un pool de procesos (0 = en el hilo de la petición).
+    # Con la cola llena se responde 503; pasado el timeout, 504.
+    SERVING_WORKERS = int(os.getenv('SERVING_WORKERS', 0))
+    SERVING_QUEUE = int(os.getenv('SERVING_QUEUE', 8))
+    SERVING_TIMEOUT = int(os.getenv('SERVING_TIMEOUT', 300))  # segundos por petición
+    # Micro-batching de /api/predict chicos (0 = desactivado): se juntan las
+    # peticiones que llegan dentro de la ventana o hasta BATCH_MAX_BREATHS
+    BATCH_WINDOW_MS = float(os.getenv('BATCH_WINDOW_MS', 2))
+    BATCH_MAX_BREATHS = int(os.getenv('BATCH_MAX_BREATHS', 2000))
+    BATCH_MAX_BYTES = int(os.getenv('BATCH_MAX_KB', 1024)) * 1024  # peticiones más grandes van solas
+    # Sketches de drift de cada predicción contra los datos de entrenamiento (ver ventilator/drift.py)
+    DRIFT_MONITORING = os.getenv('DRIFT_MONITORING', 'true').lower() in ('1', 'true', 'yes')
 
 class DevelopmentConfig(Config):
     """Configuración de desarrollo"""
@@ -0,0 +1,382 @@
+"""
+Búsqueda de hiperparámetros para VentilatorModel
+
+Estrategias:
+    random   N configuraciones aleatorias, todas con el 100% de los datos
+    halving  successive halving: todas empiezan con una fracción pequeña de
+             los datos; en cada ronda sólo sigue el mejor 1/eta y el
+             presupuesto se multiplica por eta (las peores se cortan temprano)
+
+Las features se calculan y escalan una sola vez y se guardan en
+<search-dir>/cache/*.npy; cada trial (en su propio proceso) las abre con mmap,
+así todos comparten la misma matriz sin volver a calcularla ni copiarla.
+cache/cache.json guarda con qué datos se armó (archivo, muestra, validación y
+semilla) y las estadísticas base para el monitoreo de drift: una búsqueda
+con otros datos en el mismo --search-dir se rechaza.
+
+Cada resultado se agrega a <search-dir>/trials.jsonl: si la búsqueda se
+interrumpe, al volver a ejecutarla se saltan los trials ya evaluados.
+<search-dir>/search.json guarda el tipo de modelo, la estrategia y las
+rondas: esos resultados sólo se reusan con la misma configuración.
+
+Uso:
+    python hpsearch.py --input train.csv --model-type fast --strategy halving \
+        --n-trials 27 --workers 4 --search-dir searches/run1 --register-best
+"""
+import argparse
+import json
+import math
+import os
+import pickle
+import random
+import sys
+import time
+
+from ventilator.model import VentilatorModel, _build_estimator
+
+# Espacios de búsqueda por tipo de modelo
+#   ('int', a, b) | ('float', a, b) | ('log', a, b) | ('choice', [valores])
+SEARCH_SPACES = {
+    'fast': {
+        'n_estimators': ('int', 50, 300),
+        'max_depth': ('int', 8, 25),
+        'min_samples_leaf': ('int', 1, 20),
+        'max_features': ('choice', [0.5, 0.7, 1.0]),
+    },
+    'accurate': {
+        'n_estimators': ('int', 50, 400),
+        'learning_rate': ('log', 0.02, 0.3),
+        'max_depth': ('int', 3, 8),
+        'subsample': ('float', 0.6, 1.0),
+    },
+}
+
+
+def sample_params(space, rng):
+    params = {}
+    for name, spec in space.items():
+        kind = spec[0]
+        if kind == 'int':
+            params[name] = rng.randint(spec[1], spec[2])
+        elif kind == 'float':
+            params[name] = rng.uniform(spec[1], spec[2])
+        elif kind == 'log':
+            params[name] = math.exp(rng.uniform(math.log(spec[1]), math.log(spec[2])))
+        else:
+            params[name] = rng.choice(spec[1])
+    return params
+
+
+# ----------------------------------------------------------------------
+# Matriz de features compartida
+# ----------------------------------------------------------------------
+
+def build_cache(cache_dir, input_path, sample_breaths, validation_split, seed):
+    """
+    Calcular features + scaler una sola vez. Las filas de entrenamiento se
+    guardan ya barajadas, así un presupuesto de k filas es simplemente X[:k].
+    """
+    import numpy as np
+    from sklearn.preprocessing import StandardScaler
+    from ventilator.drift import DriftSketch
+    from ventilator.features import build_features
+    from train import load_training_data, split_indices
+
+    params = {
+        'input': os.path.abspath(input_path),
+        'sample_breaths': sample_breaths,
+        'validation_split': validation_split,
+        'seed': seed,
+    }
+    os.makedirs(cache_dir, exist_ok=True)
+    info_path = os.path.join(cache_dir, 'cache.json')
+    if os.path.exists(info_path):
+        with open(info_path) as f:
+            cached = json.load(f)['params']
+        if cached != params:
+            raise ValueError(
+                f'El cache en {cache_dir} es de otros datos ({cached}). '
+                'Usa otro --search-dir.'
+            )
+        return
+
+    print("📊 Calculando la matriz de features compartida...")
+    start = time.time()
+    df, presorted = load_training_data(input_path, sample_breaths, seed)
+    X, y, _ = build_features(df, presorted)
+
+    train_idx, val_idx = split_indices(len(X), validation_split, seed)
+    train_idx = np.random.default_rng(seed).permutation(train_idx)
+
+    scaler = StandardScaler().fit(X[train_idx])
+    np.save(os.path.join(cache_dir, 'X_train.npy'), scaler.transform(X[train_idx]))
+    np.save(os.path.join(cache_dir, 'y_train.npy'), y[train_idx])
+    np.save(os.path.join(cache_dir, 'X_val.npy'), scaler.transform(X[val_idx]))
+    np.save(os.path.join(cache_dir, 'y_val.npy'), y[val_idx])
+    with open(os.path.join(cache_dir, 'scaler.pkl'), 'wb') as f:
+        pickle.dump(scaler, f)
+
+    # cache.json se escribe al final: marca que el cache está completo
+    info = {
+        'params': params,
+        'rows': int(len(df)),
+        'breaths': int(df['breath_id'].nunique()),
+        # Estadísticas base para el monitoreo de drift (el df no se guarda)
+        'baseline': DriftSketch.from_training(df, seed).to_dict(),
+    }
+    tmp = info_path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(info, f)
+    os.replace(tmp, info_path)
+    print(f"✓ Cache listo en {time.time() - start:.2f} s ({len(train_idx):,} filas de entrenamiento)")
+
+
+def load_cache(cache_dir):
+    import numpy as np
+
+    arrays = {
+        name: np.load(os.path.join(cache_dir, f'{name}.npy'), mmap_mode='r')
+        for name in ('X_train', 'y_train', 'X_val', 'y_val')
+    }
+    with open(os.path.join(cache_dir, 'scaler.pkl'), 'rb') as f:
+        arrays['scaler'] = pickle.load(f)
+    with open(os.path.join(cache_dir, 'cache.json')) as f:
+        arrays['info'] = json.load(f)
+    return arrays
+
+
+# ----------------------------------------------------------------------
+# Trials
+# ----------------------------------------------------------------------
+
+_cache = None
+
+
+def _init_worker(cache_dir):
+    global _cache
+    _cache = load_cache(cache_dir)
+
+
+def run_trial(model_type, params, budget):
+    """Entrenar con la fracción `budget` de las filas y medir el MAE de validación"""
+    import numpy as np
+
+    X_train, y_train = _cache['X_train'], _cache['y_train']
+    n = max(1, int(len(X_train) * budget))
+
+    estimator = _build_estimator(model_type, params)
+    estimator.set_params(verbose=0)
+    if model_type == 'fast':
+        # El paralelismo está en los trials: un CPU por trial
+        estimator.set_params(n_jobs=1)
+
+    start = time.time()
+    estimator.fit(X_train[:n], y_train[:n])
+    seconds = time.time() - start
+
+    predictions = estimator.predict(_cache['X_val'])
+    val_mae = float(np.mean(np.abs(predictions - _cache['y_val'])))
+    return val_mae, seconds
+
+
+class TrialLog:
+    """Resultados persistidos en JSONL (una línea por trial y ronda)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.results = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.results[(record['trial'], record['rung'])] = record
+
+    def get(self, trial, rung):
+        return self.results.get((trial, rung))
+
+    def add(self, record):
+        self.results[(record['trial'], record['rung'])] = record
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+    def best(self):
+        """Mejor resultado con el mayor presupuesto evaluado"""
+        if not self.results:
+            return None
+        top_budget = max(r['budget'] for r in self.results.values())
+        finalists = [r for r in self.results.values() if r['budget'] == top_budget]
+        return min(finalists, key=lambda r: r['val_mae'])
+
+
+def check_settings(search_dir, settings):
+    """
+    Guardar la configuración de la búsqueda en search.json o, si ya existe,
+    rechazar una distinta: los val_mae de trials.jsonl son de esos trials
+    """
+    path = os.path.join(search_dir, 'search.json')
+    if os.path.exists(path):
+        with open(path) as f:
+            saved = json.load(f)
+        if saved != settings:
+            raise ValueError(
+                f'La búsqueda en {search_dir} se hizo con otra configuración ({saved}). '
+                'Usa otro --search-dir.'
+            )
+        return
+
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(settings, f)
+    os.replace(tmp, path)
+
+
+def halving_rungs(n_trials, eta, min_budget):
+    """Lista de (n_configs, budget) por ronda"""
+    n_rungs = max(1, int(round(math.log(1 / min_budget, eta))) + 1)
+    rungs = []
+    n = n_trials
+    for r in range(n_rungs):
+        budget = min(1.0, min_budget * eta ** r)
+        rungs.append((max(1, n), budget))
+        n = n // eta
+    rungs[-1] = (rungs[-1][0], 1.0)
+    return rungs
+
+
+def evaluate_rung(pool, log, model_type, configs, rung, budget):
+    """Evaluar (en paralelo) las configuraciones de una ronda que falten"""
+    from concurrent.futures import as_completed
+
+    pending = {}
+    for trial, params in configs:
+        if log.get(trial, rung) is None:
+            pending[pool.submit(run_trial, model_type, params, budget)] = (trial, params)
+
+    for future in as_completed(pending):
+        trial, params = pending[future]
+        val_mae, seconds = future.result()
+        log.add({
+            'trial': trial, 'rung': rung, 'budget': budget,
+            'params': params, 'val_mae': val_mae, 'seconds': round(seconds, 2)
+        })
+        print(f"  trial {trial:3d} | ronda {rung} | {budget*100:5.1f}% datos | "
+              f"MAE {val_mae:.4f} | {seconds:.1f} s")
+        sys.stdout.flush()
+
+    return [(trial, params, log.get(trial, rung)['val_mae']) for trial, params in configs]
+
+
+def search(input_path, model_type='fast', strategy='halving', n_trials=27, workers=None,
+           search_dir='searches/default', sample_breaths=None, eta=3, min_budget=None,
+           validation_split=0.2, seed=42):
+    """Ejecutar (o retomar) una búsqueda; retorna el mejor registro"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(search_dir, exist_ok=True)
+    cache_dir = os.path.join(search_dir, 'cache')
+    build_cache(cache_dir, input_path, sample_breaths, validation_split, seed)
+
+    if strategy == 'random':
+        eta = min_budget = None
+    else:
+        min_budget = min_budget or 1 / eta ** 3
+    check_settings(search_dir, {
+        'model_type': model_type, 'strategy': strategy, 'n_trials': n_trials,
+        'eta': eta, 'min_budget': min_budget,
+    })
+
+    log = TrialLog(os.path.join(search_dir, 'trials.jsonl'))
+    if log.results:
+        print(f"↻ Retomando: {len(log.results)} resultados ya guardados")
+
+    # Las configuraciones dependen sólo de la semilla: al retomar son las mismas
+    rng = random.Random(seed)
+    space = SEARCH_SPACES[model_type]
+    configs = [(i, sample_params(space, rng)) for i in range(n_trials)]
+
+    if strategy == 'random':
+        rungs = [(n_trials, 1.0)]
+    else:
+        rungs = halving_rungs(n_trials, eta, min_budget)
+
+    print(f"\n{'='*60}")
+    print(f"BÚSQUEDA DE HIPERPARÁMETROS - {model_type.upper()} ({strategy})")
+    print(f"{'='*60}")
+    print(f"  Trials: {n_trials}  |  Workers: {workers}  |  Rondas: {len(rungs)}")
+
+    start = time.time()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(cache_dir,)) as pool:
+        for rung, (n_keep, budget) in enumerate(rungs):
+            configs = configs[:n_keep]
+            print(f"\n▶ Ronda {rung}: {len(configs)} configuraciones con {budget*100:.1f}% de los datos")
+            scored = evaluate_rung(pool, log, model_type, configs, rung, budget)
+            # Ordenar por MAE: la siguiente ronda toma las mejores
+            scored.sort(key=lambda item: item[2])
+            configs = [(trial, params) for trial, params, _ in scored]
+
+    best = log.best()
+    print(f"\n✓ Búsqueda completa en {time.time() - start:.1f} s")
+    print(f"  Mejor trial: {best['trial']}  |  MAE validación: {best['val_mae']:.4f} cmH₂O")
+    print(f"  Parámetros: {best['params']}")
+    return best
+
+
+def export_best(search_dir, model_type, best):
+    """Reentrenar la mejor configuración con todos los datos y registrarla"""
+    from config import Config
+    from registry import ModelRegistry
+    from ventilator.drift import DriftSketch
+
+    with open(os.path.join(search_dir, 'search.json')) as f:
+        searched = json.load(f)['model_type']
+    if searched != model_type:
+        raise ValueError(f'La búsqueda en {search_dir} es de modelos {searched}, no {model_type}')
+
+    cache = load_cache(os.path.join(search_dir, 'cache'))
+    info = cache['info']
+    model = VentilatorModel(model_type, params=best['params'])
+    model.model.set_params(verbose=0)
+    print("\n🏁 Reentrenando la mejor configuración con el 100% de los datos...")
+    model.model.fit(cache['X_train'], cache['y_train'])
+    model.scaler = cache['scaler']
+    model.baseline = DriftSketch.from_dict(info['baseline'])
+    # Como en train.py: filas y ciclos de los datos cargados
+    model.training_info = {
+        'training_rows': info['rows'],
+        'training_breaths': info['breaths'],
+        'val_mae': best['val_mae'],
+        'params': best['params'],
+        'search_dir': search_dir,
+    }
+    return ModelRegistry(Config.MODEL_FOLDER).register(model, model.training_info)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Búsqueda de hiperparámetros')
+    parser.add_argument('--input', default='train.csv')
+    parser.add_argument('--model-type', default='fast', choices=sorted(SEARCH_SPACES))
+    parser.add_argument('--strategy', default='halving', choices=['random', 'halving'])
+    parser.add_argument('--n-trials', type=int, default=27)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--search-dir', default='searches/default')
+    parser.add_argument('--sample-breaths', type=float, default=None,
+                        help='Fracción (<=1) o número de ciclos a usar')
+    parser.add_argument('--eta', type=int, default=3, help='Factor de reducción de successive halving')
+    parser.add_argument('--min-budget', type=float, default=None,
+                        help='Fracción de datos de la primera ronda (por defecto 1/eta^3)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--register-best', action='store_true',
+                        help='Registrar la mejor configuración como un modelo nuevo')
+    args = parser.parse_args()
+
+    best = search(args.input, args.model_type, args.strategy, args.n_trials, args.workers,
+                  args.search_dir, args.sample_breaths, args.eta, args.min_budget, seed=args.seed)
+
+    if args.register_best:
+        export_best(args.search_dir, args.model_type, best)
+
+
+if __name__ == '__main__':
+    main()
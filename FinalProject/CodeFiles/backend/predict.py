@@ -1,32 +1,355 @@
-import pandas as pd
-from model import VentilatorModel
+"""
+Scoring por lotes del CSV de test completo (sin pasar por la app web)
 
-def predict_test(model_path, test_csv_path, output_csv='submission.csv'):
-    print("Cargando modelo...")
+Lee el CSV por bloques alineados a ciclos respiratorios, predice los bloques
+en paralelo y va escribiendo el submission a medida que avanza. Los workers
+comparten un único modelo compacto (.vcm) mapeado en memoria. La entrada
+puede venir comprimida con gzip o zstd (se descomprime en streaming).
+
+Si la corrida se interrumpe, al volver a ejecutar el mismo comando se retoma
+desde el último bloque completado (usar --restart para empezar de cero).
+
+Los bloques sólo se pueden cortar en el límite de un ciclo si las filas de
+cada breath_id están contiguas. Si la inspección del archivo muestra que no
+lo están, el CSV se lee completo y se ordena en memoria antes de partirlo
+(--in-memory lo fuerza). La inspección es por muestras: si un ciclo partido
+aparece recién durante la lectura, la corrida vuelve a empezar en memoria.
+
+Uso:
+    python predict.py --model models/v1/model.vcm --input test.csv \
+        --output submission.csv --chunk-size 200000 --workers 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+
+from ventilator.model import VentilatorModel
+
+# Modelo cargado en cada proceso worker (ver _init_worker)
+_worker_model = None
+
+
+class NonContiguousBreaths(ValueError):
+    """Un ciclo aparece en tramos no contiguos del archivo"""
+
+
+def iter_breath_chunks(handle, chunk_size):
+    """
+    Leer el CSV en bloques de ~chunk_size filas sin partir ningún ciclo.
+
+    Asume que las filas de un mismo breath_id están contiguas (como en el
+    test.csv de Kaggle): las filas del último ciclo de cada bloque se guardan
+    y se anteponen al bloque siguiente. Si un ciclo ya entregado vuelve a
+    aparecer se lanza NonContiguousBreaths: sus lags saldrían mal.
+    """
+    import pandas as pd
+
+    emitted = set()
+
+    def check(block):
+        breaths = set(pd.unique(block['breath_id']).tolist())
+        repeated = breaths & emitted
+        if repeated:
+            raise NonContiguousBreaths(
+                f'El ciclo {min(repeated)} aparece en tramos no contiguos del archivo: '
+                'no se puede partir por bloques')
+        emitted.update(breaths)
+        return block.reset_index(drop=True)
+
+    carry = None
+    for chunk in pd.read_csv(handle, chunksize=chunk_size):
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+
+        last_breath = chunk['breath_id'].iloc[-1]
+        tail = (chunk['breath_id'] == last_breath).to_numpy()
+        carry = chunk[tail]
+        complete = chunk[~tail]
+
+        if len(complete):
+            yield check(complete)
+
+    if carry is not None and len(carry):
+        yield check(carry)
+
+
+def iter_sorted_chunks(df, chunk_size):
+    """
+    Bloques de ~chunk_size filas de un DataFrame completo, ya en el orden de
+    las features (ciclos en orden de aparición y por time_step): sirve para
+    archivos cuyos ciclos no están contiguos.
+
+    Produce (bloque, fracción de filas entregadas).
+    """
+    import numpy as np
+    from ventilator.features import breath_order
+
+    order, codes = breath_order(df)
+    df = df.iloc[order].reset_index(drop=True)
+    # Primera fila de cada ciclo: los cortes se hacen sólo ahí
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+    begin = 0
+    while begin < len(df):
+        cut = np.searchsorted(starts, begin + chunk_size)
+        end = starts[cut] if cut < len(starts) else len(df)
+        yield df.iloc[begin:end].reset_index(drop=True), end / len(df)
+        begin = end
+
+
+def _init_worker(model_path):
+    """Cargar el modelo una vez por proceso (mmap: las páginas se comparten)"""
+    global _worker_model
+    import contextlib
+    import io
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_model = VentilatorModel()
+        _worker_model.load(model_path)
+
+
+def score_chunk(chunk, presorted=False):
+    """Predecir un bloque; retorna (ids, presiones) en el orden de las features"""
+    from ventilator.features import build_features
+
+    X, _, order = build_features(chunk, presorted)
+    X_scaled = _worker_model.scaler.transform(X)
+    predictions = _worker_model.model.predict(X_scaled)
+    return chunk['id'].to_numpy()[order], predictions
+
+
+def _format_chunk(ids, predictions):
+    import pandas as pd
+    text = pd.DataFrame({'id': ids, 'pressure': predictions}).to_csv(header=False, index=False)
+    return text.encode('utf-8')
+
+
+def _progress(done_bytes, total_bytes, rows, elapsed, width=30):
+    fraction = min(done_bytes / total_bytes, 1.0) if total_bytes else 1.0
+    filled = int(width * fraction)
+    rate = rows / elapsed if elapsed > 0 else 0
+    bar = '█' * filled + '░' * (width - filled)
+    sys.stderr.write(f"\r  [{bar}] {fraction*100:5.1f}%  {rows:,} filas  {rate:,.0f} filas/s")
+    sys.stderr.flush()
+
+
+def _model_signature(model_path):
+    """Ruta, tamaño y fecha de modificación del modelo (para retomar)"""
+    stat = os.stat(model_path)
+    return {'path': os.path.abspath(model_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _new_state(input_path, chunk_size, in_memory, model):
+    return {
+        'input': os.path.abspath(input_path),
+        'chunk_size': chunk_size,
+        'in_memory': in_memory,
+        'model': model,
+        'chunks_done': 0,
+        'rows_done': 0,
+    }
+
+
+def _load_state(state_path, input_path, chunk_size, in_memory, model):
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # Solo se puede retomar con el mismo archivo, los mismos bloques y el
+    # mismo modelo (si se reemplazó, las filas ya escritas no le corresponden)
+    if state.get('input') != os.path.abspath(input_path) or state.get('chunk_size') != chunk_size \
+            or state.get('in_memory', False) != in_memory or state.get('model') != model:
+        return None
+    return state
+
+
+def _save_state(state_path, state):
+    tmp = state_path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, state_path)
+
+
+def _compact_model_path(model_path, output_path):
+    """Los workers mapean un .vcm; si recibimos un .pkl se exporta una vez"""
+    from ventilator.compact import is_compact_file
+
+    if is_compact_file(model_path):
+        return model_path
+
+    compact_path = output_path + '.model.vcm'
     model = VentilatorModel()
     model.load(model_path)
-    
-    print("Cargando datos de test...")
-    df_test = pd.read_csv(test_csv_path)
-    
-    # Usar solo una muestra para demo
-    df_test = df_test.head(10000)
-    
-    print(f"Datos de test: {len(df_test)} registros")
-    
-    print("\nHaciendo predicciones...")
-    predictions = model.predict(df_test)
-    
-    print("\nCreando archivo de submission...")
-    submission = pd.DataFrame({
-        'id': df_test['id'],
-        'pressure': predictions
-    })
-    
-    submission.to_csv(output_csv, index=False)
-    print(f"✓ Predicciones guardadas en {output_csv}")
-    
-    return submission
+    model.export_compact(compact_path)
+    return compact_path
+
+
+def _score_file(input_path, model_file, chunk_size, workers, presorted, in_memory, skip,
+                total_bytes, write_result):
+    """Leer input_path por bloques, predecirlos y pasarlos en orden a write_result"""
+    from concurrent.futures import ProcessPoolExecutor
+    from ventilator.ingest import open_input, read_csv
+
+    with open(input_path, 'rb') as handle:
+        # El progreso se mide sobre los bytes del archivo (comprimidos o no)
+        if in_memory:
+            # Los bloques de iter_sorted_chunks ya están ordenados
+            presorted = True
+            chunks = ((chunk, int(fraction * total_bytes)) for chunk, fraction
+                      in iter_sorted_chunks(read_csv(handle), chunk_size))
+        else:
+            stream, _ = open_input(handle)
+            chunks = ((chunk, handle.tell()) for chunk in iter_breath_chunks(stream, chunk_size))
+
+        # Saltar los bloques que ya se escribieron en una corrida anterior
+        for _ in range(skip):
+            next(chunks, None)
+
+        if workers == 1:
+            _init_worker(model_file)
+            for chunk, position in chunks:
+                ids, predictions = score_chunk(chunk, presorted)
+                write_result(ids, predictions, position)
+        else:
+            # Como máximo 2 bloques por worker en vuelo, para acotar la memoria
+            pending = deque()
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(model_file,)) as pool:
+                for chunk, position in chunks:
+                    pending.append((pool.submit(score_chunk, chunk, presorted), position))
+                    if len(pending) >= workers * 2:
+                        future, position = pending.popleft()
+                        write_result(*future.result(), position)
+                while pending:
+                    future, position = pending.popleft()
+                    write_result(*future.result(), position)
+
+
+def score_batch(model_path, input_path, output_path='submission.csv',
+                chunk_size=200000, workers=None, restart=False, in_memory=False):
+    """
+    Predecir todo input_path y escribir el submission (id, pressure)
+
+    in_memory: leer el CSV completo y ordenarlo antes de partirlo. Se activa
+    solo si la inspección encuentra ciclos que no están contiguos, o si
+    aparece uno durante la lectura (la corrida empieza de nuevo en memoria).
+
+    Retorna un diccionario con filas, segundos y filas/s de la corrida.
+    """
+    from ventilator.utils import inspect_csv
+
+    report = inspect_csv(input_path)
+    if not report['valid']:
+        raise ValueError(f"CSV inválido: {'; '.join(report['errors'])}")
+    presorted = report['layout']['presorted']
+    if not report['layout']['sorted_by_breath']:
+        in_memory = True
+
+    workers = workers or os.cpu_count() or 1
+    state_path = output_path + '.progress.json'
+    model = _model_signature(model_path)
+    state = None if restart else _load_state(state_path, input_path, chunk_size, in_memory, model)
+    if state is None and not restart and os.path.exists(state_path):
+        print("ℹ️  El progreso guardado es de otra entrada, bloque o modelo: se empieza de cero")
+
+    model_file = _compact_model_path(model_path, output_path)
+
+    print("=" * 60)
+    print("SCORING POR LOTES")
+    print("=" * 60)
+    print(f"  Modelo:  {model_file}")
+    print(f"  Entrada: {input_path}")
+    print(f"  Salida:  {output_path}")
+    print(f"  Bloque:  {chunk_size:,} filas  |  Workers: {workers}")
+    print(f"  Filas estimadas: {report['estimated_rows']:,}  |  Ya ordenado: {'sí' if presorted else 'no'}"
+          f"  |  Compresión: {report['compression'] or 'ninguna'}")
+    if in_memory:
+        print("  Ciclos no contiguos: el archivo se lee completo y se ordena en memoria")
+
+    if state:
+        print(f"\n↻ Retomando desde el bloque {state['chunks_done']} "
+              f"({state['rows_done']:,} filas ya escritas)")
+        out = open(output_path, 'r+b')
+        out.truncate(state['output_bytes'])
+        out.seek(state['output_bytes'])
+    else:
+        state = _new_state(input_path, chunk_size, in_memory, model)
+        out = open(output_path, 'wb')
+        out.write(b'id,pressure\n')
+        state['output_bytes'] = out.tell()
+
+    rows_at_start = state['rows_done']
+    total_bytes = os.path.getsize(input_path)
+    start_time = time.time()
+
+    def write_result(ids, predictions, position):
+        out.write(_format_chunk(ids, predictions))
+        out.flush()
+        state['chunks_done'] += 1
+        state['rows_done'] += len(ids)
+        state['output_bytes'] = out.tell()
+        _save_state(state_path, state)
+        _progress(position, total_bytes, state['rows_done'] - rows_at_start,
+                  time.time() - start_time)
+
+    while True:
+        try:
+            _score_file(input_path, model_file, chunk_size, workers, presorted, in_memory,
+                        state['chunks_done'], total_bytes, write_result)
+            break
+        except NonContiguousBreaths as error:
+            if in_memory:
+                raise
+            # Lo ya escrito puede tener lags mal calculados: se descarta todo
+            sys.stderr.write("\n")
+            print(f"⚠️  {error}\n   Se empieza de nuevo leyendo el archivo completo en memoria")
+            in_memory = True
+            state = _new_state(input_path, chunk_size, in_memory, model)
+            out.seek(0)
+            out.truncate()
+            out.write(b'id,pressure\n')
+            state['output_bytes'] = out.tell()
+            rows_at_start = 0
+
+    out.close()
+    elapsed = time.time() - start_time
+    rows = state['rows_done'] - rows_at_start
+    os.remove(state_path)
+    if model_file != model_path:
+        os.remove(model_file)  # .vcm exportado para esta corrida
+
+    sys.stderr.write("\n")
+    print(f"\n✓ Predicciones guardadas en {output_path}")
+    print(f"  Filas escritas: {state['rows_done']:,} ({rows:,} en esta corrida)")
+    print(f"  Tiempo: {elapsed:.2f} s  |  Throughput: {rows / elapsed if elapsed else 0:,.0f} filas/s")
+
+    return {'rows': rows, 'seconds': elapsed, 'rows_per_second': rows / elapsed if elapsed else 0}
+
+
+def predict_test(model_path, test_csv_path, output_csv='submission.csv'):
+    """Compatibilidad con la versión anterior: predice el CSV completo"""
+    return score_batch(model_path, test_csv_path, output_csv)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scoring por lotes del CSV de test')
+    parser.add_argument('--model', default='model.pkl', help='Modelo .vcm (o .pkl, se convierte)')
+    parser.add_argument('--input', default='test.csv', help='CSV de test')
+    parser.add_argument('--output', default='submission.csv', help='CSV de salida (id, pressure)')
+    parser.add_argument('--chunk-size', type=int, default=200000, help='Filas por bloque')
+    parser.add_argument('--workers', type=int, default=None, help='Procesos (por defecto: todos los CPUs)')
+    parser.add_argument('--restart', action='store_true', help='Ignorar el progreso guardado')
+    parser.add_argument('--in-memory', action='store_true',
+                        help='Leer el CSV completo y ordenarlo (ciclos no contiguos)')
+    args = parser.parse_args()
+
+    score_batch(args.model, args.input, args.output, chunk_size=args.chunk_size,
+                workers=args.workers, restart=args.restart, in_memory=args.in_memory)
+
 
 if __name__ == "__main__":
-    predict_test('model.pkl', 'test.csv')
\ No newline at end of file
+    main()
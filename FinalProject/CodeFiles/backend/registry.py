@@ -0,0 +1,258 @@
+import json
+import os
+import random
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from ventilator.model import VentilatorModel, FEATURE_NAMES
+
+# Registro de modelos versionados
+#
+# Estructura en disco (bajo Config.MODEL_FOLDER):
+#
+#   models/
+#     v1/
+#       model.pkl       <- modelo completo (sklearn), para reentrenar
+#       model.vcm       <- modelo compacto, el que se sirve
+#       metadata.json   <- tipo, filas, MAE de validación, features...
+#     v2/
+#       ...
+#     registry.json     <- versión por defecto
+#
+# Varias versiones pueden estar cargadas a la vez; cuando la memoria usada
+# supera el presupuesto se descargan las menos usadas recientemente (LRU).
+#
+# Los modelos se sirven siempre desde model.vcm mapeado en memoria (sólo
+# lectura): todos los procesos que cargan la misma versión (workers del pool,
+# varios servidores) comparten las mismas páginas del page cache, así cada
+# worker extra casi no suma memoria. Una versión que sólo tiene model.pkl se
+# convierte a .vcm la primera vez que se carga.
+
+
+class ModelRegistry:
+    def __init__(self, root='models', memory_budget=1024 * 1024 * 1024, use_mmap=True):
+        """use_mmap=False copia cada modelo a memoria privada del proceso"""
+        self.root = root
+        self.memory_budget = memory_budget
+        self.use_mmap = use_mmap
+        self._loaded = OrderedDict()  # version -> (VentilatorModel, bytes)
+        self._lock = threading.RLock()
+        os.makedirs(self.root, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Versiones en disco
+    # ------------------------------------------------------------------
+
+    def _version_dir(self, version):
+        return os.path.join(self.root, version)
+
+    def _index_path(self):
+        return os.path.join(self.root, 'registry.json')
+
+    def _read_index(self):
+        try:
+            with open(self._index_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index):
+        tmp = self._index_path() + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp, self._index_path())
+
+    def versions(self):
+        """Lista de versiones registradas, de la más antigua a la más nueva"""
+        found = []
+        for name in os.listdir(self.root):
+            if name.startswith('v') and name[1:].isdigit() and \
+                    os.path.exists(os.path.join(self.root, name, 'metadata.json')):
+                found.append(name)
+        return sorted(found, key=lambda v: int(v[1:]))
+
+    def metadata(self, version):
+        with open(os.path.join(self._version_dir(version), 'metadata.json')) as f:
+            return json.load(f)
+
+    def register(self, model, metadata=None):
+        """
+        Guardar un VentilatorModel entrenado como una nueva versión.
+        Retorna el nombre de la versión (ej. 'v3').
+        """
+        with self._lock:
+            existing = self.versions()
+            number = int(existing[-1][1:]) + 1 if existing else 1
+            version = f'v{number}'
+
+            # Escribir en un directorio temporal y renombrar al final, para que
+            # una versión a medio escribir nunca aparezca en el registro
+            tmp_dir = self._version_dir(version) + '.tmp'
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+
+            model.save(os.path.join(tmp_dir, 'model.pkl'))
+            model.export_compact(os.path.join(tmp_dir, 'model.vcm'))
+
+            info = {
+                'version': version,
+                'model_type': model.model_type,
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'features': FEATURE_NAMES,
+            }
+            info.update(metadata or {})
+            with open(os.path.join(tmp_dir, 'metadata.json'), 'w') as f:
+                json.dump(info, f, indent=2)
+
+            os.replace(tmp_dir, self._version_dir(version))
+
+        print(f"📦 Modelo registrado como {version}")
+        return version
+
+    def load_full(self, version):
+        """
+        VentilatorModel completo (sklearn, desde model.pkl) de una versión,
+        con sus metadatos en training_info, para actualizarlo y registrarlo
+        """
+        if version not in self.versions():
+            raise KeyError(f'Versión desconocida: {version}')
+        model = VentilatorModel()
+        model.load(os.path.join(self._version_dir(version), 'model.pkl'))
+        model.training_info = {
+            k: v for k, v in self.metadata(version).items()
+            if k not in ('version', 'model_type', 'created_at', 'features')
+        }
+        return model
+
+    def import_file(self, filepath, metadata=None):
+        """Registrar un model.pkl suelto (ej. de antes de existir el registro)"""
+        model = VentilatorModel()
+        model.load(filepath)
+        return self.register(model, metadata)
+
+    @property
+    def default_version(self):
+        return self._read_index().get('default')
+
+    def set_default(self, version):
+        if version not in self.versions():
+            raise KeyError(f'Versión desconocida: {version}')
+        with self._lock:
+            index = self._read_index()
+            index['default'] = version
+            self._write_index(index)
+
+    # ------------------------------------------------------------------
+    # Modelos residentes en memoria
+    # ------------------------------------------------------------------
+
+    def get(self, version):
+        """Obtener un modelo cargado (lo carga si hace falta)"""
+        with self._lock:
+            if version in self._loaded:
+                self._loaded.move_to_end(version)
+                return self._loaded[version][0]
+
+            if version not in self.versions():
+                raise KeyError(f'Versión desconocida: {version}')
+
+            path = self.compact_path(version)
+            model = VentilatorModel()
+            model.load(path, use_mmap=self.use_mmap)
+            self._loaded[version] = (model, model.memory_bytes())
+            self._evict(keep=version)
+            return model
+
+    def compact_path(self, version):
+        """model.vcm de la versión (se exporta desde model.pkl si falta)"""
+        directory = self._version_dir(version)
+        path = os.path.join(directory, 'model.vcm')
+        if not os.path.exists(path):
+            model = VentilatorModel()
+            model.load(os.path.join(directory, 'model.pkl'))
+            # Otro proceso puede estar haciendo lo mismo: archivo temporal propio
+            tmp = f'{path}.{os.getpid()}.tmp'
+            model.export_compact(tmp)
+            os.replace(tmp, path)
+        return path
+
+    def unload(self, version):
+        with self._lock:
+            self._loaded.pop(version, None)
+
+    def _evict(self, keep):
+        """Descargar modelos LRU hasta respetar el presupuesto de memoria"""
+        while self.memory_used() > self.memory_budget and len(self._loaded) > 1:
+            oldest = next(iter(self._loaded))
+            if oldest == keep:
+                break
+            self._loaded.pop(oldest)
+            print(f"♻️  Modelo {oldest} descargado (presupuesto de memoria)")
+
+    def memory_used(self):
+        return sum(size for _, size in self._loaded.values())
+
+    def loaded(self):
+        """Versiones cargadas, de la menos a la más usada recientemente"""
+        with self._lock:
+            return [
+                {
+                    'version': version,
+                    'model_type': model.model_type,
+                    'memory_bytes': size,
+                    'shared': model.compact and self.use_mmap,
+                }
+                for version, (model, size) in self._loaded.items()
+            ]
+
+    # ------------------------------------------------------------------
+    # Ruteo de predicciones
+    # ------------------------------------------------------------------
+
+    def resolve(self, version=None, split=None):
+        """
+        Elegir la versión que atiende una petición.
+
+        version: versión explícita ('v3')
+        split:   reparto de tráfico 'v3:90,v4:10' (porcentajes o pesos)
+        Sin ninguno de los dos se usa la versión por defecto.
+
+        KeyError si la versión (o alguna del split) no existe; ValueError si
+        el split está mal formado.
+        """
+        if version:
+            self._check_versions([version])
+            return version
+
+        if split:
+            weights = parse_split(split)
+            choices = list(weights)
+            self._check_versions(choices)
+            return random.choices(choices, weights=[weights[v] for v in choices])[0]
+
+        return self.default_version
+
+    def _check_versions(self, versions):
+        known = set(self.versions())
+        for version in versions:
+            if version not in known:
+                raise KeyError(f'Versión desconocida: {version}')
+
+
+def parse_split(split):
+    """Convertir 'v3:90,v4:10' en {'v3': 90.0, 'v4': 10.0}"""
+    weights = {}
+    for part in split.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        version, _, weight = part.partition(':')
+        try:
+            weights[version.strip()] = float(weight)
+        except ValueError:
+            raise ValueError(f'Split inválido: {part!r} (formato: v1:90,v2:10)')
+    if not weights or sum(weights.values()) <= 0:
+        raise ValueError('El split debe tener al menos una versión con peso > 0')
+    return weights
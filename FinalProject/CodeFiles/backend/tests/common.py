@@ -0,0 +1,62 @@
+"""
+Datos y modelos sintéticos para los tests
+
+Los tests corren desde el backend (python -m unittest discover -s tests) y
+no necesitan los CSV de Kaggle: los ciclos se generan con la misma forma.
+"""
+import contextlib
+import io
+import os
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND not in sys.path:
+    sys.path.insert(0, BACKEND)
+
+import numpy as np
+import pandas as pd
+
+BREATHS = 40
+STEPS = 80
+
+# Hiperparámetros chicos para que cada test entrene en menos de un segundo
+TINY_PARAMS = {
+    'fast': {'n_estimators': 10, 'max_depth': 8, 'n_jobs': 1, 'verbose': 0},
+    'accurate': {'n_estimators': 10, 'max_depth': 3, 'verbose': 0},
+}
+
+
+def make_breaths(seed=0, breaths=BREATHS, steps=STEPS, first_id=1):
+    """Ciclos sintéticos contiguos, con la forma del CSV de Kaggle"""
+    rng = np.random.default_rng(seed)
+    breath_id = np.repeat(np.arange(first_id, first_id + breaths), steps)
+    step = np.tile(np.arange(steps), breaths)
+    u_in = rng.uniform(0, 30, len(step))
+    df = pd.DataFrame({
+        'id': np.arange(1, len(step) + 1) + (first_id - 1) * steps,
+        'breath_id': breath_id,
+        'R': np.repeat(rng.choice([5, 20, 50], breaths), steps),
+        'C': np.repeat(rng.choice([10, 20, 50], breaths), steps),
+        'time_step': step * 0.033,
+        'u_in': u_in,
+        'u_out': (step >= 30).astype(int),
+    })
+    df['pressure'] = 5 + 0.3 * u_in + 0.2 * np.roll(u_in, 1) + rng.normal(0, 0.5, len(step))
+    return df
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silenciar los prints de entrenamiento y las barras de progreso"""
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+def train_model(model_type='fast', seed=1, specialize=False, **params):
+    """VentilatorModel chico entrenado con make_breaths(seed)"""
+    from ventilator.model import VentilatorModel
+
+    model = VentilatorModel(model_type, dict(TINY_PARAMS[model_type], **params), specialize=specialize)
+    with quiet():
+        model.train(make_breaths(seed=seed))
+    return model
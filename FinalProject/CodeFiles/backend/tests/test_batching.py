@@ -0,0 +1,91 @@
+"""
+Micro-batching de predicciones (batching.py)
+
+Las peticiones que llegan dentro de la ventana se predicen en un solo lote
+y cada una recibe exactamente sus predicciones, aunque varias usen los
+mismos breath_id.
+"""
+import threading
+import unittest
+
+import numpy as np
+
+from batching import BatchedModel, MicroBatcher
+from common import make_breaths, quiet, train_model
+
+
+class MicroBatcherTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = train_model('fast')
+        # Peticiones chicas con breath_id repetidos entre ellas (1..n)
+        cls.requests = [make_breaths(seed=seed, breaths=seed + 1) for seed in range(4)]
+
+    def setUp(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def predict(self, key, df, presorted):
+        with self.lock:
+            self.calls.append((key, df['breath_id'].nunique()))
+        with quiet():
+            return self.model.predict(df, presorted, return_order=True)
+
+    def expected(self, df):
+        with quiet():
+            return self.model.predict(df, return_order=True)
+
+    def check_results(self, futures, frames):
+        for future, df in zip(futures, frames):
+            predictions, order = future.result(10)
+            expected, expected_order = self.expected(df)
+            np.testing.assert_array_equal(order, expected_order)
+            np.testing.assert_allclose(predictions, expected, rtol=1e-12)
+
+    def test_fan_out(self):
+        batcher = MicroBatcher(self.predict, window=0.5)
+        futures = [batcher.submit('v1', df) for df in self.requests]
+        self.check_results(futures, self.requests)
+        self.assertEqual(self.calls, [('v1', 1 + 2 + 3 + 4)])
+        self.assertEqual(batcher.stats()['batches'], 1)
+        self.assertEqual(batcher.stats()['requests'], 4)
+
+    def test_keys_are_not_mixed(self):
+        batcher = MicroBatcher(self.predict, window=0.5)
+        keys = ['v1', 'v2', 'v1', 'v2']
+        futures = [batcher.submit(key, df) for key, df in zip(keys, self.requests)]
+        self.check_results(futures, self.requests)
+        self.assertEqual(sorted(self.calls), [('v1', 1 + 3), ('v2', 2 + 4)])
+
+    def test_max_breaths(self):
+        batcher = MicroBatcher(self.predict, window=0.5, max_breaths=3)
+        futures = [batcher.submit('v1', df) for df in self.requests]
+        self.check_results(futures, self.requests)
+        # 1 + 2 llega al límite; 3 y 4 (cada uno ya lo alcanza) van solos
+        self.assertEqual(self.calls, [('v1', 3), ('v1', 3), ('v1', 4)])
+
+    def test_errors_reach_every_request(self):
+        def failing(key, df, presorted):
+            raise RuntimeError('modelo no disponible')
+
+        batcher = MicroBatcher(failing, window=0.5)
+        futures = [batcher.submit('v1', df) for df in self.requests[:2]]
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result(10)
+        self.assertEqual(batcher.stats()['batches'], 0)
+
+    def test_batched_model(self):
+        batcher = MicroBatcher(self.predict, window=0)
+        df = self.requests[2]
+        model = BatchedModel(batcher, 'v3', timeout=10)
+        predictions, order = model.predict(df, return_order=True, lean=True)
+        self.assertEqual(self.calls, [(('v3', True), 3)])
+        expected, expected_order = self.expected(df)
+        np.testing.assert_array_equal(order, expected_order)
+        np.testing.assert_allclose(model.predict(df), expected, rtol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Respuesta binaria columnar de /api/predict (columnar.py)
+"""
+import unittest
+
+import numpy as np
+
+from columnar import ALIGNMENT, MAGIC, breath_page, decode_predictions, encode_predictions
+from common import make_breaths
+
+
+class ColumnarTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        ids = np.arange(1, 1001)
+        pressures = np.linspace(-2, 60, 1000)
+        buffer = encode_predictions(ids, pressures, {'breath_start': 1})
+        self.assertEqual(bytes(buffer[:len(MAGIC)]), MAGIC)
+
+        header, columns = decode_predictions(bytes(buffer))
+        self.assertEqual(header['rows'], 1000)
+        self.assertEqual(header['breath_start'], 1)
+        self.assertEqual(columns['id'].dtype, np.dtype('<i4'))
+        self.assertEqual(columns['pressure'].dtype, np.dtype('<f4'))
+        np.testing.assert_array_equal(columns['id'], ids)
+        np.testing.assert_allclose(columns['pressure'], pressures, atol=1e-5)
+        # Vistas sobre el buffer, sin copia
+        self.assertFalse(columns['id'].flags.writeable)
+        self.assertFalse(columns['id'].flags.owndata)
+
+    def test_columns_are_aligned(self):
+        # Largo impar de ids: la columna siguiente igual empieza alineada
+        buffer = encode_predictions(np.arange(3), np.zeros(3))
+        header, columns = decode_predictions(buffer)
+        base = np.frombuffer(buffer, np.uint8).ctypes.data
+        for name, spec in header['columns'].items():
+            self.assertEqual(spec['offset'] % ALIGNMENT, 0)
+            self.assertEqual((columns[name].ctypes.data - base) % ALIGNMENT, 0)
+
+    def test_large_ids_use_int64(self):
+        ids = np.array([1, 2**31 + 5], dtype=np.int64)
+        header, columns = decode_predictions(encode_predictions(ids, [1.0, 2.0]))
+        self.assertEqual(columns['id'].dtype, np.dtype('<i8'))
+        np.testing.assert_array_equal(columns['id'], ids)
+
+    def test_empty(self):
+        header, columns = decode_predictions(encode_predictions([], []))
+        self.assertEqual(header['rows'], 0)
+        self.assertEqual(len(columns['id']), 0)
+        self.assertEqual(len(columns['pressure']), 0)
+
+    def test_rejects_other_payloads(self):
+        with self.assertRaises(ValueError):
+            decode_predictions(b'{"predictions": []}')
+
+
+class BreathPageTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Ciclos 1..10 en orden inverso: la página va por breath_id, no por posición
+        cls.df = make_breaths(breaths=10, steps=4).iloc[::-1].reset_index(drop=True)
+
+    def test_whole_file(self):
+        page, info = breath_page(self.df)
+        self.assertIs(page, self.df)
+        self.assertEqual(info, {'total_breaths': 10, 'breath_start': 1, 'breath_end': 10,
+                                'next_breath_start': None})
+
+    def test_pages(self):
+        page, info = breath_page(self.df, breath_start=3, max_breaths=4)
+        self.assertEqual(sorted(page['breath_id'].unique()), [3, 4, 5, 6])
+        self.assertEqual(len(page), 16)  # ciclos completos
+        self.assertEqual((info['breath_start'], info['breath_end'], info['next_breath_start']), (3, 6, 7))
+
+        page, info = breath_page(self.df, breath_start=info['next_breath_start'], max_breaths=4)
+        self.assertEqual(sorted(page['breath_id'].unique()), [7, 8, 9, 10])
+        self.assertIsNone(info['next_breath_start'])
+
+    def test_start_between_breaths(self):
+        df = self.df[self.df['breath_id'] != 5]
+        page, info = breath_page(df, breath_start=5, max_breaths=1)
+        self.assertEqual(info['breath_start'], 6)
+        self.assertEqual(page['breath_id'].unique().tolist(), [6])
+
+    def test_past_the_end(self):
+        page, info = breath_page(self.df, breath_start=11)
+        self.assertEqual(len(page), 0)
+        self.assertIsNone(info['breath_start'])
+        self.assertEqual(info['total_breaths'], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Formato compacto (.vcm)
+
+El modelo exportado tiene que predecir lo mismo que el estimador de
+sklearn, con el archivo mapeado o copiado, y cargarse sin importar sklearn.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from common import make_breaths, quiet, train_model
+from ventilator.compact import is_compact_file, load_compact
+from ventilator.model import VentilatorModel
+
+
+class CompactRoundTripTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.df = make_breaths(seed=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def export(self, model, name):
+        paths = (os.path.join(self.tmp.name, f'{name}.pkl'), os.path.join(self.tmp.name, f'{name}.vcm'))
+        with quiet():
+            model.save(paths[0])
+            model.export_compact(paths[1])
+        return paths
+
+    def check_round_trip(self, model_type, specialize=False):
+        model = train_model(model_type, specialize=specialize)
+        pkl_path, vcm_path = self.export(model, f'{model_type}_{specialize}')
+        with quiet():
+            expected = model.predict(self.df)
+
+        for use_mmap in (True, False):
+            compact = VentilatorModel()
+            with quiet():
+                compact.load(vcm_path, use_mmap=use_mmap)
+                predictions = compact.predict(self.df)
+            self.assertTrue(compact.compact)
+            self.assertEqual(compact.model_type, model_type)
+            self.assertEqual(compact.specialize, specialize)
+            np.testing.assert_allclose(predictions, expected, rtol=0, atol=1e-9)
+
+        self.assertTrue(is_compact_file(vcm_path))
+        self.assertFalse(is_compact_file(pkl_path))
+
+    def test_fast(self):
+        self.check_round_trip('fast')
+
+    def test_accurate(self):
+        self.check_round_trip('accurate')
+
+    def test_specialized(self):
+        self.check_round_trip('fast', specialize=True)
+
+    def test_mmap_arrays_are_read_only(self):
+        _, vcm_path = self.export(train_model('fast'), 'readonly')
+        forest, _, header = load_compact(vcm_path, use_mmap=True)
+        self.assertEqual(header['n_trees'], 10)
+        self.assertFalse(forest.threshold.flags.writeable)
+
+    def test_rejects_other_files(self):
+        path = os.path.join(self.tmp.name, 'not_a_model.vcm')
+        with open(path, 'wb') as f:
+            f.write(b'id,breath_id\n')
+        self.assertFalse(is_compact_file(path))
+        with self.assertRaises(ValueError):
+            load_compact(path)
+
+    def test_load_without_sklearn(self):
+        _, vcm_path = self.export(train_model('fast'), 'no_sklearn')
+        csv_path = os.path.join(self.tmp.name, 'no_sklearn.csv')
+        self.df.drop(columns='pressure').to_csv(csv_path, index=False)
+        code = (
+            'import sys, pandas as pd\n'
+            'from ventilator.model import VentilatorModel\n'
+            'model = VentilatorModel()\n'
+            f'model.load({vcm_path!r})\n'
+            f'model.predict(pd.read_csv({csv_path!r}))\n'
+            'assert "sklearn" not in sys.modules, "sklearn importado"\n'
+        )
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Compresión del modelo compacto (ventilator/compress.py)
+
+La compresión elegida tiene que respetar el presupuesto de MAE, achicar el
+.vcm y predecir igual después de exportarlo y cargarlo.
+"""
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from common import make_breaths, quiet, train_model
+from ventilator.compact import load_compact
+from ventilator.compress import _forest, _mae, search_compression, select_trees
+from ventilator.model import VentilatorModel
+
+
+class CompressionTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.models = {model_type: train_model(model_type, n_estimators=20)
+                      for model_type in ('fast', 'accurate')}
+        with quiet():
+            X, cls.y = cls.models['fast'].prepare_features(make_breaths(seed=5))
+        cls.X = {model_type: model.scaler.transform(X) for model_type, model in cls.models.items()}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def reference(self, model_type):
+        model = self.models[model_type]
+        return _mae(model.model.predict(self.X[model_type]), self.y)
+
+    def test_quantized_predictions(self):
+        for model_type, model in self.models.items():
+            with self.subTest(model_type=model_type):
+                forest, header = _forest(model.model, model.scaler, model_type, {'quantize': True})
+                exact = model.model.predict(self.X[model_type])
+                quantized = forest.predict(self.X[model_type])
+                # Hojas redondeadas: medio paso por árbol como mucho. Los umbrales
+                # redondeados mandan al otro lado sólo a las filas muy cercanas
+                tolerance = header['n_trees'] * header['scale'] * header['value_step']
+                self.assertGreater(np.mean(np.abs(quantized - exact) <= tolerance), 0.95)
+                self.assertLess(abs(_mae(quantized, self.y) - _mae(exact, self.y)), 0.01 * _mae(exact, self.y))
+
+    def test_depth_limit(self):
+        model = self.models['fast']
+        _, header = _forest(model.model, model.scaler, 'fast', {'max_depth': 3})
+        self.assertEqual(header['max_depth'], 3)
+
+    def test_search_respects_budget(self):
+        for model_type, model in self.models.items():
+            with self.subTest(model_type=model_type), quiet():
+                result = model.compress(self.X[model_type], self.y, mae_budget=0.05)
+            self.assertAlmostEqual(result['reference_mae'], self.reference(model_type), places=6)
+            self.assertLessEqual(result['mae'], result['limit'] + 1e-12)
+            self.assertEqual(model.compression, result['compression'])
+            self.assertTrue(result['compression'])
+
+    def test_no_budget_keeps_accuracy(self):
+        model = self.models['fast']
+        with quiet():
+            result = search_compression(model.model, model.scaler, 'fast', self.X['fast'], self.y,
+                                        mae_budget=0, quantize=False, prune='trees')
+        self.assertLessEqual(result['mae'], result['reference_mae'])
+
+    def test_export_round_trip(self):
+        model = train_model('fast', n_estimators=20)
+        plain_path = os.path.join(self.tmp.name, 'plain.vcm')
+        small_path = os.path.join(self.tmp.name, 'small.vcm')
+        with quiet():
+            model.export_compact(plain_path)
+            result = model.compress(self.X['fast'], self.y, mae_budget=0.05)
+            model.export_compact(small_path)
+        self.assertLess(os.path.getsize(small_path), os.path.getsize(plain_path))
+
+        _, _, header = load_compact(small_path)
+        self.assertEqual(header['compression'], result['compression'])
+        loaded = VentilatorModel()
+        with quiet():
+            loaded.load(small_path)
+        self.assertEqual(loaded.compression, result['compression'])
+        self.assertAlmostEqual(_mae(loaded.model.predict(self.X['fast']), self.y), result['mae'], places=9)
+
+    def test_specialized_keeps_all_trees(self):
+        model = train_model('fast', specialize=True)
+        with quiet():
+            result = model.compress(self.X['fast'], self.y, mae_budget=0.5, prune='trees')
+        self.assertNotIn('trees', result['compression'] or {})
+
+
+class SelectTreesTest(unittest.TestCase):
+
+    def test_boosting_keeps_a_prefix(self):
+        values = np.array([[4.0, 4.0], [1.0, 1.0], [0.5, 0.5]])
+        trees, mae = select_trees(values, np.array([5.0, 5.0]), base=0.0, scale=1.0,
+                                  boosting=True, limit=0.6)
+        self.assertEqual((trees, mae), ([0, 1], 0.0))
+
+    def test_forest_picks_best_average(self):
+        # El promedio de los árboles 1 y 3 da exacto; con uno solo no alcanza
+        values = np.array([[9.0, 9.0], [4.0, 6.0], [0.0, 0.0], [6.0, 4.0]])
+        trees, mae = select_trees(values, np.array([5.0, 5.0]), base=0.0, scale=0.25,
+                                  boosting=False, limit=0.5)
+        self.assertEqual((trees, mae), ([1, 3], 0.0))
+
+    def test_returns_everything_when_over_limit(self):
+        values = np.array([[1.0], [2.0]])
+        trees, _ = select_trees(values, np.array([10.0]), 0.0, 0.5, boosting=False, limit=0.1)
+        self.assertEqual(trees, [0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
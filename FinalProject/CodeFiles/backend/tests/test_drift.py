@@ -0,0 +1,154 @@
+"""
+Monitoreo de drift (ventilator/drift.py)
+
+PSI, sketches combinables sin importar cómo se parte el tráfico y el
+reporte de compare() ante tráfico estable, desplazado o con pares nuevos.
+"""
+import json
+import math
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from common import make_breaths, quiet, train_model
+from ventilator.drift import PSI_DRIFT, PSI_WARNING, DriftMonitor, DriftSketch, _status, compare, psi
+from ventilator.model import VentilatorModel
+
+
+class PsiTest(unittest.TestCase):
+
+    def test_identical_histograms(self):
+        self.assertEqual(psi([10, 20, 30], [1, 2, 3]), 0.0)
+
+    def test_known_value(self):
+        # p = (0.5, 0.5), q = (0.9, 0.1)
+        expected = (0.9 - 0.5) * math.log(0.9 / 0.5) + (0.1 - 0.5) * math.log(0.1 / 0.5)
+        self.assertAlmostEqual(psi([50, 50], [90, 10]), expected)
+
+    def test_empty_bins_use_floor(self):
+        value = psi([100, 0], [0, 100])
+        self.assertTrue(math.isfinite(value))
+        self.assertGreater(value, PSI_DRIFT)
+
+    def test_no_data(self):
+        self.assertIsNone(psi([0, 0], [1, 2]))
+        self.assertIsNone(psi([1, 2], [0, 0]))
+
+    def test_status(self):
+        self.assertEqual(_status(None), 'no_data')
+        self.assertEqual(_status(PSI_WARNING / 2), 'ok')
+        self.assertEqual(_status(PSI_WARNING), 'warning')
+        self.assertEqual(_status(PSI_DRIFT), 'drift')
+
+
+class DriftSketchTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.train = make_breaths(seed=1, breaths=100)
+        cls.baseline = DriftSketch.from_training(cls.train)
+
+    def observe(self, df):
+        sketch = self.baseline.empty_like()
+        sketch.observe(df, df['pressure'].to_numpy())
+        return sketch
+
+    def test_merge_matches_single_pass(self):
+        df = make_breaths(seed=2)
+        whole = self.observe(df)
+        merged = self.baseline.empty_like()
+        for part in np.array_split(np.arange(len(df)), 3):
+            merged.merge(self.observe(df.iloc[part]))
+
+        self.assertEqual(merged.rows, whole.rows)
+        for name, feature in whole.features.items():
+            other = merged.features[name]
+            np.testing.assert_array_equal(other.counts, feature.counts)
+            np.testing.assert_array_equal(other.n, feature.n)
+            np.testing.assert_allclose(other.mean, feature.mean)
+            np.testing.assert_allclose(other.m2, feature.m2)
+            self.assertEqual((other.min, other.max), (feature.min, feature.max))
+
+    def test_moments(self):
+        n, mean, std = self.baseline.features['u_in'].moments()
+        values = self.train['u_in'].to_numpy()
+        self.assertEqual(n, len(values))
+        self.assertAlmostEqual(mean, values.mean())
+        self.assertAlmostEqual(std, values.std())
+
+    def test_dict_round_trip(self):
+        data = json.loads(json.dumps(self.baseline.to_dict()))
+        self.assertEqual(DriftSketch.from_dict(data).to_dict(), self.baseline.to_dict())
+
+    def test_stable_traffic(self):
+        report = compare(self.baseline, self.observe(make_breaths(seed=2, breaths=100)))
+        self.assertEqual(report['features']['u_in']['status'], 'ok')
+        self.assertLess(abs(report['features']['u_in']['mean_shift']), 0.1)
+        self.assertEqual(report['unknown_group_rows'], 0)
+
+    def test_shifted_traffic(self):
+        df = make_breaths(seed=2, breaths=100)
+        df['u_in'] += 20
+        report = compare(self.baseline, self.observe(df))
+        u_in = report['features']['u_in']
+        self.assertEqual(u_in['status'], 'drift')
+        self.assertEqual(report['status'], 'drift')
+        self.assertGreater(u_in['mean_shift'], 1)
+        self.assertGreater(u_in['out_of_range'], 0)
+        self.assertEqual(report['features']['time_step']['status'], 'ok')
+
+    def test_new_pairs_and_nonfinite(self):
+        df = make_breaths(seed=2, breaths=5)
+        df['R'] = 7
+        df.loc[:9, 'u_in'] = np.nan
+        report = compare(self.baseline, self.observe(df))
+        self.assertEqual(report['unknown_group_rows'], len(df))
+        self.assertEqual(report['features']['u_in']['traffic']['rows'], len(df) - 10)
+        self.assertEqual(report['features']['u_in']['nonfinite'], 10)
+
+    def test_extend(self):
+        baseline = DriftSketch.from_dict(self.baseline.to_dict())
+        new = make_breaths(seed=3, breaths=20)
+        new['u_in'] += 5
+        baseline.extend(new)
+        self.assertEqual(baseline.rows, self.baseline.rows + len(new))
+        self.assertEqual(baseline.features['u_in'].high, new['u_in'].max())
+
+
+class DriftMonitorTest(unittest.TestCase):
+
+    def test_record_and_reset(self):
+        baseline = DriftSketch.from_training(make_breaths(seed=1))
+        monitor = DriftMonitor()
+        self.assertEqual(monitor.report('v1', baseline)['requests'], 0)
+
+        for seed in (2, 3):
+            sketch = baseline.empty_like()
+            sketch.observe(make_breaths(seed=seed, breaths=5))
+            monitor.record('v1', sketch)
+        report = monitor.report('v1', baseline, reset=True)
+        self.assertEqual((report['requests'], report['rows']), (2, 2 * 5 * 80))
+        self.assertIsNotNone(report['since'])
+        self.assertEqual(monitor.report('v1', baseline)['rows'], 0)
+
+
+class ModelBaselineTest(unittest.TestCase):
+
+    def test_baseline_travels_with_the_model(self):
+        model = train_model('fast')
+        self.assertEqual(model.baseline.rows, len(make_breaths(seed=1)))
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, save in (('model.pkl', model.save), ('model.vcm', model.export_compact)):
+                path = os.path.join(tmp, name)
+                loaded = VentilatorModel()
+                with quiet():
+                    save(path)
+                    loaded.load(path)
+                with self.subTest(name=name):
+                    self.assertEqual(loaded.baseline.to_dict(), model.baseline.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Búsqueda de hiperparámetros (hpsearch.py): retomar una búsqueda
+
+Al retomar se saltan los trials ya evaluados, pero sólo con los mismos
+datos y la misma configuración (tipo de modelo, estrategia, rondas).
+"""
+import json
+import os
+import tempfile
+import unittest
+
+from common import make_breaths, quiet
+from hpsearch import export_best, search
+
+
+class SearchResumeTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.input_path = os.path.join(cls.tmp.name, 'train.csv')
+        make_breaths(breaths=10).to_csv(cls.input_path, index=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        self.search_dir = tempfile.mkdtemp(dir=self.tmp.name)
+        self.log_path = os.path.join(self.search_dir, 'trials.jsonl')
+
+    def search(self, **kwargs):
+        """Búsqueda chica (por defecto: 3 trials de accurate con todos los datos)"""
+        options = dict(model_type='accurate', strategy='random', n_trials=3, workers=1,
+                       search_dir=self.search_dir)
+        options.update(kwargs)
+        with quiet():
+            return search(self.input_path, **options)
+
+    def records(self):
+        with open(self.log_path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def test_resume_skips_evaluated_trials(self):
+        best = self.search()
+        records = self.records()
+        self.assertEqual(len(records), 3)
+
+        # Corrida interrumpida después del primer trial
+        with open(self.log_path, 'w') as f:
+            f.write(json.dumps(records[0]) + '\n')
+        self.assertEqual(self.search()['val_mae'], best['val_mae'])
+        resumed = self.records()
+        self.assertEqual(len(resumed), 3)
+        self.assertEqual(resumed[0], records[0])
+
+    def test_halving_rungs(self):
+        self.search(strategy='halving', n_trials=4, eta=2, min_budget=0.5)
+        rungs = sorted((r['rung'], r['budget']) for r in self.records())
+        self.assertEqual(rungs, [(0, 0.5)] * 4 + [(1, 1.0)] * 2)
+
+    def test_other_settings_rejected(self):
+        self.search()
+        for changed in ({'model_type': 'fast'}, {'strategy': 'halving'}, {'n_trials': 5}):
+            with self.subTest(**changed), self.assertRaises(ValueError):
+                self.search(**changed)
+        self.assertEqual(len(self.records()), 3)
+
+    def test_other_halving_budgets_rejected(self):
+        self.search(strategy='halving', n_trials=4, eta=2, min_budget=0.5)
+        with self.assertRaises(ValueError):
+            self.search(strategy='halving', n_trials=4, eta=2, min_budget=0.25)
+
+    def test_other_data_rejected(self):
+        self.search()
+        with self.assertRaises(ValueError):
+            self.search(sample_breaths=0.5)
+
+    def test_export_rejects_other_model_type(self):
+        best = self.search()
+        with self.assertRaises(ValueError):
+            export_best(self.search_dir, 'fast', best)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Validación rápida de CSV (ventilator.utils.inspect_csv / validate_csv)
+
+inspect_csv sólo lee muestras del archivo: tiene que rechazar valores mal
+formados y detectar el orden de las filas sin parsearlo completo.
+"""
+import gzip
+import io
+import os
+import tempfile
+import unittest
+
+from common import make_breaths
+from ventilator.utils import inspect_csv, validate_csv
+
+
+def csv_bytes(df):
+    return df.to_csv(index=False).encode('utf-8')
+
+
+class InspectCsvTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_valid_file(self):
+        df = make_breaths()
+        report = inspect_csv(io.BytesIO(csv_bytes(df)), require_pressure=True)
+        self.assertTrue(report['valid'], report['errors'])
+        self.assertTrue(report['has_pressure'])
+        self.assertEqual(report['estimated_rows'], len(df))
+        self.assertIsNone(report['compression'])
+        layout = report['layout']
+        self.assertTrue(layout['presorted'])
+        self.assertEqual(layout['steps_per_breath'], 80)
+        self.assertTrue(layout['uniform_steps'])
+
+    def test_large_file_is_sampled(self):
+        df = make_breaths(breaths=300)
+        report = inspect_csv(self.write('large.csv', csv_bytes(df)))
+        self.assertTrue(report['valid'], report['errors'])
+        self.assertAlmostEqual(report['estimated_rows'], len(df), delta=len(df) * 0.05)
+        self.assertTrue(report['layout']['sorted_by_breath'])
+
+    def test_gzip(self):
+        df = make_breaths()
+        report = inspect_csv(self.write('test.csv.gz', gzip.compress(csv_bytes(df))))
+        self.assertTrue(report['valid'], report['errors'])
+        self.assertEqual(report['compression'], 'gzip')
+        self.assertEqual(report['estimated_rows'], len(df))
+
+    def test_unsorted(self):
+        df = make_breaths().sample(frac=1, random_state=0)
+        layout = inspect_csv(io.BytesIO(csv_bytes(df)))['layout']
+        self.assertFalse(layout['sorted_by_breath'])
+        self.assertFalse(layout['presorted'])
+
+    def test_keeps_stream_position(self):
+        stream = io.BytesIO(csv_bytes(make_breaths()))
+        stream.seek(10)
+        inspect_csv(stream)
+        self.assertEqual(stream.tell(), 10)
+
+    def check_invalid(self, data, message, require_pressure=False):
+        report = inspect_csv(io.BytesIO(data), require_pressure=require_pressure)
+        self.assertFalse(report['valid'])
+        self.assertTrue(any(message in error for error in report['errors']), report['errors'])
+
+    def test_missing_columns(self):
+        df = make_breaths()
+        self.check_invalid(csv_bytes(df.drop(columns='u_in')), 'Faltan columnas: u_in')
+        self.check_invalid(csv_bytes(df.drop(columns='pressure')), 'pressure', require_pressure=True)
+
+    def test_empty(self):
+        self.check_invalid(b'', 'vacío')
+        self.check_invalid(b'id,breath_id,R,C,time_step,u_in,u_out\n', 'vacío')
+
+    def test_non_numeric(self):
+        df = make_breaths().astype({'u_in': object})
+        df.loc[5, 'u_in'] = 'abc'
+        self.check_invalid(csv_bytes(df), 'no numéricos en: u_in')
+
+    def test_non_finite_in_integer_columns(self):
+        for value in ('nan', 'inf', '-inf'):
+            df = make_breaths().astype({'R': object})
+            df.loc[5, 'R'] = value
+            with self.subTest(value=value):
+                self.check_invalid(csv_bytes(df), 'no finitos (nan/inf) en columnas enteras: R')
+
+    def test_u_out_must_be_binary(self):
+        df = make_breaths()
+        df.loc[5, 'u_out'] = 2
+        self.check_invalid(csv_bytes(df), 'u_out')
+
+    def test_r_c_must_be_positive(self):
+        df = make_breaths()
+        df.loc[5, 'C'] = 0
+        self.check_invalid(csv_bytes(df), 'positivos')
+
+    def test_wrong_field_count(self):
+        data = csv_bytes(make_breaths()) + b'1,2,3\n'
+        self.check_invalid(data, 'campos')
+
+    def test_validate_csv(self):
+        df = make_breaths()
+        self.assertTrue(validate_csv(self.write('ok.csv', csv_bytes(df)), require_pressure=True))
+        self.assertFalse(validate_csv(self.write('no_pressure.csv', csv_bytes(df.drop(columns='pressure'))),
+                                      require_pressure=True))
+        self.assertFalse(validate_csv(os.path.join(self.tmp.name, 'missing.csv')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Scoring por lotes (predict.py)
+
+Un breath_id partido en dos tramos del archivo no se puede cortar por
+bloques: sus lags saldrían mal. score_batch tiene que dar las mismas
+predicciones que el modelo sobre el DataFrame completo, lo detecte la
+inspección o recién la lectura.
+
+Uso:
+    python -m unittest discover -s tests
+"""
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from common import STEPS, make_breaths, quiet, train_model
+from predict import NonContiguousBreaths, _load_state, _model_signature, _new_state, \
+    iter_breath_chunks, score_batch
+from ventilator.utils import inspect_csv
+
+
+def split_breaths(df):
+    """Primera mitad de cada ciclo y, después, todas las segundas mitades"""
+    first = df.groupby('breath_id').cumcount() < STEPS // 2
+    return pd.concat([df[first], df[~first]], ignore_index=True)
+
+
+def split_one_breath(df, breath_id):
+    """Mover la segunda mitad de un ciclo al final del archivo"""
+    moved = (df['breath_id'] == breath_id) & (df.groupby('breath_id').cumcount() >= STEPS // 2)
+    return pd.concat([df[~moved], df[moved]], ignore_index=True)
+
+
+class NonContiguousBreathsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.model_path = os.path.join(cls.tmp.name, 'model.pkl')
+        cls.model = train_model('fast')
+        with quiet():
+            cls.model.save(cls.model_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def score(self, df, input_path):
+        output_path = os.path.join(self.tmp.name, 'submission.csv')
+        with quiet():
+            score_batch(self.model_path, input_path, output_path, chunk_size=500, workers=1)
+            predictions, order = self.model.predict(df, return_order=True)
+
+        expected = pd.Series(predictions, index=df['id'].to_numpy()[order]).sort_index()
+        submission = pd.read_csv(output_path).set_index('id')['pressure'].sort_index()
+        self.assertEqual(len(submission), len(df))
+        self.assertTrue(submission.index.equals(expected.index))
+        np.testing.assert_allclose(submission.to_numpy(), expected.to_numpy())
+
+        # Ni el progreso ni el .vcm exportado del .pkl quedan al terminar
+        self.assertFalse(os.path.exists(output_path + '.progress.json'))
+        self.assertFalse(os.path.exists(output_path + '.model.vcm'))
+
+    def test_score_batch_matches_in_memory(self):
+        df = split_breaths(make_breaths()).drop(columns='pressure')
+        input_path = os.path.join(self.tmp.name, 'test.csv')
+        df.to_csv(input_path, index=False)
+        self.score(df, input_path)
+
+    def test_restarts_in_memory_when_inspection_misses(self):
+        # gzip: la inspección sólo ve el primer MB, y ahí el ciclo 5 parece contiguo
+        df = split_one_breath(make_breaths(breaths=300), 5).drop(columns='pressure')
+        input_path = os.path.join(self.tmp.name, 'test_split.csv.gz')
+        with gzip.open(input_path, 'wt') as f:
+            df.to_csv(f, index=False)
+        self.assertTrue(inspect_csv(input_path)['layout']['sorted_by_breath'])
+        self.score(df, input_path)
+
+    def test_breath_chunks_reject_repeated_breath(self):
+        text = split_breaths(make_breaths()).to_csv(index=False)
+        with self.assertRaises(NonContiguousBreaths):
+            list(iter_breath_chunks(io.StringIO(text), chunk_size=500))
+
+
+class ResumeStateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.model_path = os.path.join(self.tmp.name, 'model.vcm')
+        self.input_path = os.path.join(self.tmp.name, 'test.csv')
+        self.state_path = os.path.join(self.tmp.name, 'submission.csv.progress.json')
+        for path in (self.model_path, self.input_path):
+            with open(path, 'w') as f:
+                f.write('x')
+        state = _new_state(self.input_path, 500, False, _model_signature(self.model_path))
+        with open(self.state_path, 'w') as f:
+            json.dump(state, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def load(self, chunk_size=500, in_memory=False):
+        return _load_state(self.state_path, self.input_path, chunk_size, in_memory,
+                           _model_signature(self.model_path))
+
+    def test_same_run_resumes(self):
+        self.assertIsNotNone(self.load())
+
+    def test_other_settings_start_over(self):
+        self.assertIsNone(self.load(chunk_size=1000))
+        self.assertIsNone(self.load(in_memory=True))
+
+    def test_replaced_model_starts_over(self):
+        with open(self.model_path, 'w') as f:
+            f.write('otro modelo')
+        self.assertIsNone(self.load())
+
+    def test_touched_model_starts_over(self):
+        stat = os.stat(self.model_path)
+        os.utime(self.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNone(self.load())
+
+
+if __name__ == '__main__':
+    unittest.main()
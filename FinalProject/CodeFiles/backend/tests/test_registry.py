@@ -0,0 +1,150 @@
+"""
+Registro de modelos versionados (registry.py)
+
+Versiones en disco, versión por defecto, descarga LRU por presupuesto de
+memoria y ruteo de peticiones (version / split).
+"""
+import os
+import tempfile
+import unittest
+from collections import Counter
+
+from common import quiet, train_model
+from registry import ModelRegistry, parse_split
+
+
+class RegistryTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = train_model('fast')
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def register(self, count=1, **metadata):
+        with quiet():
+            return [self.registry.register(self.model, metadata) for _ in range(count)]
+
+    def test_versions_are_numbered(self):
+        self.assertEqual(self.register(3), ['v1', 'v2', 'v3'])
+        # Una versión a medio escribir no cuenta
+        os.makedirs(os.path.join(self.tmp.name, 'v4.tmp'))
+        self.assertEqual(self.registry.versions(), ['v1', 'v2', 'v3'])
+        self.assertEqual(self.register(), ['v4'])
+
+    def test_metadata(self):
+        version, = self.register(val_mae=0.5)
+        info = self.registry.metadata(version)
+        self.assertEqual(info['version'], version)
+        self.assertEqual(info['model_type'], 'fast')
+        self.assertEqual(info['val_mae'], 0.5)
+        self.assertIn('features', info)
+
+        with quiet():
+            full = self.registry.load_full(version)
+        self.assertFalse(full.compact)
+        self.assertEqual(full.training_info, {'val_mae': 0.5})
+
+    def test_default_version(self):
+        self.assertIsNone(self.registry.default_version)
+        self.register(2)
+        self.registry.set_default('v2')
+        self.assertEqual(ModelRegistry(self.tmp.name).default_version, 'v2')
+        with self.assertRaises(KeyError):
+            self.registry.set_default('v9')
+
+    def test_get_loads_compact_model(self):
+        version, = self.register()
+        with quiet():
+            model = self.registry.get(version)
+            self.assertIs(self.registry.get(version), model)
+        self.assertTrue(model.compact)
+        with self.assertRaises(KeyError):
+            self.registry.get('v9')
+
+    def test_compact_exported_when_missing(self):
+        version, = self.register()
+        path = self.registry.compact_path(version)
+        os.remove(path)
+        with quiet():
+            self.assertTrue(self.registry.get(version).compact)
+        self.assertTrue(os.path.exists(path))
+
+    def test_lru_eviction(self):
+        self.register(3)
+        with quiet():
+            size = self.registry.get('v1').memory_bytes()
+            # Entran dos modelos
+            self.registry.memory_budget = int(size * 2.5)
+            self.registry.get('v2')
+            self.registry.get('v1')  # v1 pasa a ser el más reciente
+            self.registry.get('v3')
+        self.assertEqual([m['version'] for m in self.registry.loaded()], ['v1', 'v3'])
+        self.assertLessEqual(self.registry.memory_used(), self.registry.memory_budget)
+
+    def test_model_over_budget_stays_loaded(self):
+        self.register()
+        self.registry.memory_budget = 1
+        with quiet():
+            self.registry.get('v1')
+        self.assertEqual([m['version'] for m in self.registry.loaded()], ['v1'])
+
+
+class ResolveTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.registry = ModelRegistry(cls.tmp.name)
+        model = train_model('fast')
+        with quiet():
+            cls.registry.register(model)
+            cls.registry.register(model)
+        cls.registry.set_default('v1')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_default(self):
+        self.assertEqual(self.registry.resolve(), 'v1')
+
+    def test_explicit_version(self):
+        self.assertEqual(self.registry.resolve(version='v2', split='v1:100'), 'v2')
+        with self.assertRaises(KeyError):
+            self.registry.resolve(version='v9')
+
+    def test_split(self):
+        counts = Counter(self.registry.resolve(split='v1:80,v2:20') for _ in range(2000))
+        self.assertEqual(set(counts), {'v1', 'v2'})
+        self.assertGreater(counts['v1'], counts['v2'])
+        self.assertEqual(self.registry.resolve(split='v1:0,v2:1'), 'v2')
+
+    def test_split_unknown_version(self):
+        with self.assertRaises(KeyError):
+            self.registry.resolve(split='v1:50,v9:50')
+
+    def test_split_malformed(self):
+        with self.assertRaises(ValueError):
+            self.registry.resolve(split='v1:mucho')
+
+
+class ParseSplitTest(unittest.TestCase):
+
+    def test_weights(self):
+        self.assertEqual(parse_split('v3:90,v4:10'), {'v3': 90.0, 'v4': 10.0})
+        self.assertEqual(parse_split(' v1 : 1 , v2:0.5 ,'), {'v1': 1.0, 'v2': 0.5})
+
+    def test_invalid(self):
+        for split in ('v1', 'v1:x', 'v1:0', 'v1:0,v2:0', '', ','):
+            with self.subTest(split=split), self.assertRaises(ValueError):
+                parse_split(split)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Modelos especializados por (R, C) (ventilator/specialized.py)
+
+Cada fila se despacha al sub-modelo de su par (R, C); valores nuevos y
+pares sin datos caen en el grupo más cercano.
+"""
+import unittest
+
+import numpy as np
+
+from common import TINY_PARAMS, make_breaths, quiet, train_model
+from ventilator.specialized import C_COLUMN, R_COLUMN, GroupedForest, _fill_table, fit_groups
+
+
+class Constant:
+    """Sub-modelo que predice su propio índice"""
+
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, X):
+        return np.full(len(X), float(self.value))
+
+
+def rows(pairs):
+    X = np.zeros((len(pairs), 4))
+    X[:, [R_COLUMN, C_COLUMN]] = pairs
+    return X
+
+
+class DispatchTest(unittest.TestCase):
+
+    def setUp(self):
+        # R y C normalizados en {-1, 0, 1}; sólo 3 de los 9 pares entrenados
+        present = np.zeros((3, 3), dtype=bool)
+        present[0, 0] = present[1, 2] = present[2, 1] = True
+        self.table = _fill_table(present)
+        self.forest = GroupedForest([Constant(g) for g in range(3)], [-1, 0, 1], [-1, 0, 1], self.table)
+
+    def test_fill_table(self):
+        # Los pares entrenados, en orden; el resto apunta al más cercano
+        np.testing.assert_array_equal(self.table, [[0, 0, 1],
+                                                   [0, 1, 1],
+                                                   [2, 2, 1]])
+
+    def test_trained_pairs(self):
+        X = rows([[-1, -1], [0, 1], [1, 0]])
+        np.testing.assert_array_equal(self.forest.group_codes(X), [0, 1, 2])
+        np.testing.assert_array_equal(self.forest.predict(X), [0, 1, 2])
+
+    def test_new_values_use_nearest_key(self):
+        X = rows([[-5, -0.9], [0.2, 3], [0.9, 0.4]])
+        np.testing.assert_array_equal(self.forest.group_codes(X), [0, 1, 2])
+
+    def test_untrained_pair_uses_neighbour(self):
+        np.testing.assert_array_equal(self.forest.group_codes(rows([[1, -1], [-1, 1]])), [2, 1])
+
+    def test_predict_keeps_row_order(self):
+        pairs = np.random.default_rng(0).choice([-1, 0, 1], size=(200, 2))
+        X = rows(pairs)
+        np.testing.assert_array_equal(self.forest.predict(X), self.table[pairs[:, 0] + 1, pairs[:, 1] + 1])
+
+
+class FitGroupsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = train_model('fast')
+        with quiet():
+            X, cls.y = cls.model.prepare_features(make_breaths(seed=1))
+        cls.X = cls.model.scaler.transform(X)
+
+    def check_sub_models(self, grouped):
+        codes = grouped.group_codes(self.X)
+        predictions = grouped.predict(self.X)
+        for g, sub in enumerate(grouped.models):
+            rows = codes == g
+            self.assertTrue(rows.any())
+            np.testing.assert_array_equal(predictions[rows], sub.predict(self.X[rows]))
+            # Cada sub-modelo ve un único par (R, C)
+            self.assertEqual(len(np.unique(self.X[rows][:, [R_COLUMN, C_COLUMN]], axis=0)), 1)
+
+    def test_parallel_fit_matches_serial(self):
+        with quiet():
+            serial = fit_groups('fast', self.X, self.y, TINY_PARAMS['fast'], workers=1)
+            parallel = fit_groups('fast', self.X, self.y, TINY_PARAMS['fast'], workers=2)
+        self.check_sub_models(parallel)
+        np.testing.assert_array_equal(parallel.table, serial.table)
+        np.testing.assert_array_equal(parallel.predict(self.X), serial.predict(self.X))
+
+    def test_resume_with_fitted_groups(self):
+        fitted = []
+        with quiet():
+            first = fit_groups('fast', self.X, self.y, TINY_PARAMS['fast'], workers=1,
+                               on_fit=lambda key, estimator: fitted.append((key, estimator)))
+            resumed = fit_groups('fast', self.X, self.y, TINY_PARAMS['fast'], workers=1,
+                                 fitted=dict(fitted[:2]))
+        self.assertIs(resumed.models[0], first.models[0])
+        self.assertIsNot(resumed.models[-1], first.models[-1])
+        self.check_sub_models(resumed)
+
+    def test_specialized_model(self):
+        model = train_model('fast', specialize=True)
+        pairs = make_breaths(seed=1)[['R', 'C']].drop_duplicates()
+        self.assertEqual(len(model.model.models), len(pairs))
+        with quiet():
+            predictions = model.predict(make_breaths(seed=4))
+        self.assertTrue(np.isfinite(predictions).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Actualización incremental (VentilatorModel.update)
+
+Los árboles que ya existían tienen que predecir exactamente lo mismo
+después de agregar los nuevos: el scaler no cambia y sus umbrales tampoco.
+"""
+import unittest
+
+import numpy as np
+
+from common import make_breaths, quiet, train_model
+
+
+def tree_predictions(model, X, count):
+    """Predicción de cada uno de los primeros count árboles (o etapas)"""
+    estimators = model.model.estimators_
+    if model.model_type == 'accurate':
+        estimators = estimators[:, 0]
+    return np.stack([tree.predict(X) for tree in estimators[:count]])
+
+
+class UpdateTest(unittest.TestCase):
+
+    def check_existing_trees(self, model_type):
+        model = train_model(model_type)
+        with quiet():
+            X, _ = model.prepare_features(make_breaths(seed=3))
+        X = model.scaler.transform(X)
+        current = len(model.model.estimators_)
+        before = tree_predictions(model, X, current)
+        mean, scale = model.scaler.mean_.copy(), model.scaler.scale_.copy()
+
+        with quiet():
+            summary = model.update(make_breaths(seed=2, breaths=20, first_id=1000), n_trees=4)
+
+        self.assertEqual(summary['added_trees'], 4)
+        self.assertEqual(len(model.model.estimators_), current + 4)
+        np.testing.assert_array_equal(model.scaler.mean_, mean)
+        np.testing.assert_array_equal(model.scaler.scale_, scale)
+        np.testing.assert_array_equal(tree_predictions(model, X, current), before)
+
+    def test_fast_keeps_existing_trees(self):
+        self.check_existing_trees('fast')
+
+    def test_accurate_keeps_existing_stages(self):
+        self.check_existing_trees('accurate')
+
+    def test_training_info_accumulates(self):
+        model = train_model('fast')
+        rows = model.training_info['training_rows']
+        new = make_breaths(seed=2, breaths=20, first_id=1000)
+        with quiet():
+            summary = model.update(new)
+        self.assertEqual(model.training_info['training_rows'], rows + len(new))
+        self.assertEqual(model.training_info['updates'], 1)
+        self.assertEqual(model.training_info['last_update'], summary)
+        self.assertIsNotNone(summary['val_mae_before'])
+        self.assertIsNotNone(summary['val_mae_after'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Subida por partes (uploads.py)
+
+Partes en cualquier orden, verificación SHA-256, vencimiento por ttl y
+uploads abandonados: un parseo que espera partes no ocupa un lugar de
+ingest_workers, así no frena a los uploads que sí se completan.
+"""
+import hashlib
+import io
+import os
+import tempfile
+import time
+import unittest
+
+import pandas as pd
+
+from common import make_breaths, quiet
+from uploads import UploadError, UploadManager
+
+
+def split_parts(data, count):
+    size = -(-len(data) // count)
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class UploadTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = make_breaths(breaths=5)
+        cls.data = cls.df.to_csv(index=False).encode('utf-8')
+        cls.parts = split_parts(cls.data, 3)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manager = self.make_manager()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_manager(self, **kwargs):
+        options = dict(timeout=30, ttl=3600, ingest_workers=1)
+        options.update(kwargs)
+        return UploadManager(self.tmp.name, max_part_size=1024 * 1024, **options)
+
+    def upload(self, order=None, complete=True, sha256=None):
+        upload_id = self.manager.create('train.csv').upload_id
+        for index in order if order is not None else range(len(self.parts)):
+            self.manager.put_part(upload_id, index, io.BytesIO(self.parts[index]))
+        if complete:
+            self.manager.complete(upload_id, len(self.parts), sha256)
+        return upload_id
+
+    def check_error(self, status_code, func, *args, **kwargs):
+        with self.assertRaises(UploadError) as raised:
+            func(*args, **kwargs)
+        self.assertEqual(raised.exception.status_code, status_code, str(raised.exception))
+
+    def test_parts_in_order(self):
+        upload_id = self.upload(sha256=hashlib.sha256(self.data).hexdigest())
+        pd.testing.assert_frame_equal(self.manager.dataframe(upload_id, timeout=10), self.df)
+        # El upload se consume
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, upload_id)))
+        self.check_error(404, self.manager.status, upload_id)
+
+    def test_parts_out_of_order(self):
+        upload_id = self.upload(order=[2, 0, 1])
+        self.assertEqual(self.manager.status(upload_id)['received_parts'], [0, 1, 2])
+        pd.testing.assert_frame_equal(self.manager.dataframe(upload_id, timeout=10), self.df)
+
+    def test_missing_parts(self):
+        upload_id = self.upload(order=[0, 2], complete=False)
+        self.check_error(409, self.manager.complete, upload_id, 3)
+        self.check_error(409, self.manager.dataframe, upload_id)
+
+    def test_part_sha256_mismatch(self):
+        upload_id = self.manager.create().upload_id
+        self.check_error(422, self.manager.put_part, upload_id, 0, io.BytesIO(self.parts[0]),
+                         expected_sha256=hashlib.sha256(b'otro').hexdigest())
+        self.assertEqual(self.manager.status(upload_id)['received_parts'], [])
+
+    def test_file_sha256_mismatch(self):
+        upload_id = self.upload(sha256=hashlib.sha256(b'otro').hexdigest())
+        self.check_error(422, self.manager.dataframe, upload_id, timeout=10)
+
+    def test_retried_part(self):
+        upload_id = self.upload(complete=False)
+        self.manager.put_part(upload_id, 1, io.BytesIO(self.parts[1]))
+        self.check_error(409, self.manager.put_part, upload_id, 1, io.BytesIO(b'otro contenido'))
+
+    def test_part_too_large(self):
+        upload_id = self.manager.create().upload_id
+        self.check_error(413, self.manager.put_part, upload_id, 0, io.BytesIO(b'x' * (1024 * 1024 + 1)))
+
+    def test_unknown_upload(self):
+        self.check_error(404, self.manager.status, 'no-es-un-id')
+        self.check_error(404, self.manager.status, '0' * 32)
+
+    def test_ttl_expiry(self):
+        self.manager = manager = self.make_manager(ttl=60)
+        stale = self.upload(order=[0], complete=False)
+        fresh = self.upload(order=[0], complete=False)
+        ingest = manager.get(stale).ingest
+        past = time.time() - 120
+        os.utime(os.path.join(self.tmp.name, stale), (past, past))
+
+        with quiet():
+            self.assertEqual(manager.cleanup(force=True), [stale])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, stale)))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, fresh)))
+        # Su parseo deja de esperar partes
+        self.assertTrue(ingest.done.wait(5))
+        self.assertEqual(getattr(ingest.error, 'status_code', None), 410)
+
+    def test_abandoned_uploads_do_not_block_ingest(self):
+        # Dos uploads abandonados con un solo lugar de parseo
+        abandoned = [self.upload(order=[0], complete=False) for _ in range(2)]
+        upload_id = self.upload()
+        # El parseo en segundo plano termina sin que nadie pida el DataFrame
+        self.assertTrue(self.manager.get(upload_id).ingest.done.wait(5))
+        pd.testing.assert_frame_equal(self.manager.dataframe(upload_id, timeout=10), self.df)
+        for other in abandoned:
+            self.assertTrue(self.manager.status(other)['ingesting'])
+
+    def test_discard_cancels_ingest(self):
+        upload_id = self.upload(order=[0], complete=False)
+        ingest = self.manager.get(upload_id).ingest
+        self.manager.discard(upload_id)
+        self.assertTrue(ingest.done.wait(5))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, upload_id)))
+
+
+if __name__ == '__main__':
+    unittest.main()
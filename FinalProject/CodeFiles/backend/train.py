@@ -1,28 +1,388 @@
-import pandas as pd
-from model import VentilatorModel
+"""
+Entrenamiento por línea de comandos con el dataset completo
+
+Etapas: cargar CSV -> muestrear ciclos -> features -> scaler -> ajuste ->
+evaluación -> guardado. Cada etapa deja un checkpoint en --checkpoint-dir:
+
+    state.json        parámetros de la corrida y etapas completadas
+    X.npy, y.npy      matriz de features (se reabre con mmap al retomar)
+    scaler.pkl        estadísticas del StandardScaler
+    trees_0010.pkl    (fast) bloques de árboles ya entrenados
+    group_1_2.pkl     (--specialize) sub-modelo de cada par (R, C) ya entrenado
+    boosting.pkl      (accurate) estimador con las etapas ya ajustadas
+
+Si la corrida se interrumpe, el mismo comando retoma desde el último
+checkpoint. Al final imprime el tiempo de cada etapa y la memoria pico.
+
+Uso:
+    python train.py --input train.csv --model-type fast --sample-breaths 0.5 \
+        --checkpoint-dir checkpoints/run1 --checkpoint-every 10 --jobs -1
+"""
+import argparse
+import glob
+import json
+import os
+import pickle
+import sys
+
+from ventilator.instrumentation import StageTimer
+from ventilator.model import VentilatorModel, _build_estimator
+
+
+def _atomic_pickle(obj, path):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def _load_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class Checkpoint:
+    """Directorio de checkpoints de una corrida"""
+
+    def __init__(self, directory, params):
+        self.directory = directory
+        self.params = params
+        os.makedirs(directory, exist_ok=True)
+        self.state_path = os.path.join(directory, 'state.json')
+        self.state = {'params': params, 'completed': []}
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def resume(self):
+        """Retomar una corrida anterior si los parámetros coinciden"""
+        if not os.path.exists(self.state_path):
+            return False
+        with open(self.state_path) as f:
+            state = json.load(f)
+        if state.get('params') != self.params:
+            raise ValueError(
+                f'El checkpoint en {self.directory} es de otra corrida '
+                '(parámetros distintos). Usa --restart o otro --checkpoint-dir.'
+            )
+        self.state = state
+        return True
+
+    def done(self, stage):
+        return stage in self.state['completed']
+
+    def mark(self, stage):
+        if stage not in self.state['completed']:
+            self.state['completed'].append(stage)
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+
+
+def load_training_data(input_path, sample_breaths, seed):
+    """
+    Leer el CSV completo y, opcionalmente, quedarse con una muestra de ciclos.
+    Retorna (df, presorted) donde presorted indica que ya viene ordenado.
+    """
+    import numpy as np
+    from ventilator.ingest import read_csv
+    from ventilator.utils import inspect_csv
+
+    # Rechazar archivos mal formados antes de parsearlos completos
+    report = inspect_csv(input_path, require_pressure=True)
+    if not report['valid']:
+        raise ValueError(f"CSV inválido: {'; '.join(report['errors'])}")
+
+    df = read_csv(input_path)
+    print(f"  Registros: {len(df):,}  |  Ciclos: {df['breath_id'].nunique():,}")
+
+    if sample_breaths:
+        breaths = df['breath_id'].unique()
+        count = int(len(breaths) * sample_breaths) if sample_breaths <= 1 else int(sample_breaths)
+        count = max(1, min(count, len(breaths)))
+        rng = np.random.default_rng(seed)
+        chosen = rng.choice(breaths, size=count, replace=False)
+        df = df[df['breath_id'].isin(chosen)].reset_index(drop=True)
+        print(f"  Muestra: {count:,} ciclos ({len(df):,} registros)")
+
+    return df, report['layout']['presorted']
+
+
+def build_feature_checkpoint(checkpoint, input_path, sample_breaths, seed, dtype=None):
+    import numpy as np
+    from ventilator.drift import DriftSketch
+    from ventilator.features import build_features
+
+    df, presorted = load_training_data(input_path, sample_breaths, seed)
+    X, y, _ = build_features(df, presorted, dtype=dtype)
+    np.save(checkpoint.path('X.npy'), X)
+    np.save(checkpoint.path('y.npy'), y)
+    # Estadísticas base para el monitoreo de drift (el df no se guarda)
+    baseline = DriftSketch.from_training(df, seed)
+    return len(df), int(df['breath_id'].nunique()), baseline.to_dict()
+
+
+def split_indices(n, validation_split, seed):
+    """Índices de entrenamiento/validación (mismo resultado al retomar)"""
+    import numpy as np
+
+    permutation = np.random.default_rng(seed).permutation(n)
+    n_val = int(n * validation_split)
+    return np.sort(permutation[n_val:]), np.sort(permutation[:n_val])
+
+
+def fit_scaler(checkpoint, X_train):
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler().fit(X_train)
+    _atomic_pickle(scaler, checkpoint.path('scaler.pkl'))
+    return scaler
+
+
+def fit_forest(checkpoint, estimator, X, y, every):
+    """
+    RandomForest con warm_start: se agregan `every` árboles por vez y cada
+    bloque nuevo se guarda en su propio archivo (no se reescribe todo el bosque)
+    """
+    blocks = sorted(glob.glob(checkpoint.path('trees_*.pkl')))
+    trees = []
+    for block in blocks:
+        trees.extend(_load_pickle(block))
+
+    target = estimator.n_estimators
+    if trees:
+        print(f"  ↻ Retomando con {len(trees)} árboles ya entrenados")
+        # Un ajuste mínimo inicializa los atributos del estimador; luego se
+        # reemplazan sus árboles por los del checkpoint
+        estimator.set_params(n_estimators=len(trees))
+        estimator.fit(X[:2], y[:2])
+        estimator.estimators_ = trees
+
+    while len(trees) < target:
+        n_new = min(every, target - len(trees))
+        estimator.set_params(n_estimators=len(trees) + n_new)
+        estimator.fit(X, y)
+        new_trees = estimator.estimators_[len(trees):]
+        _atomic_pickle(new_trees, checkpoint.path(f'trees_{len(trees) + n_new:04d}.pkl'))
+        trees = list(estimator.estimators_)
+        print(f"  💾 Checkpoint: {len(trees)}/{target} árboles")
+        sys.stdout.flush()
+
+    return estimator
+
+
+def fit_boosting(checkpoint, estimator, X, y, every):
+    """GradientBoosting con warm_start: se guardan las etapas ajustadas"""
+    path = checkpoint.path('boosting.pkl')
+    target = estimator.n_estimators
+    done = 0
+
+    if os.path.exists(path):
+        estimator = _load_pickle(path)
+        done = estimator.n_estimators_
+        print(f"  ↻ Retomando con {done} etapas de boosting")
+
+    while done < target:
+        done = min(done + every, target)
+        estimator.set_params(n_estimators=done)
+        estimator.fit(X, y)
+        _atomic_pickle(estimator, path)
+        print(f"  💾 Checkpoint: {done}/{target} etapas")
+        sys.stdout.flush()
+
+    return estimator
+
+
+def fit_specialized(checkpoint, model_type, X, y, jobs):
+    """
+    Un sub-modelo por par (R, C), entrenados en paralelo (ver ventilator/specialized.py).
+    Cada grupo terminado se guarda en su propio archivo.
+    """
+    from ventilator.specialized import fit_groups
+
+    fitted = {}
+    for path in glob.glob(checkpoint.path('group_*_*.pkl')):
+        i, j = os.path.splitext(os.path.basename(path))[0].split('_')[1:]
+        fitted[(int(i), int(j))] = _load_pickle(path)
+    if fitted:
+        print(f"  ↻ Retomando con {len(fitted)} grupos ya entrenados")
+
+    def save(key, estimator):
+        _atomic_pickle(estimator, checkpoint.path(f'group_{key[0]}_{key[1]}.pkl'))
+
+    workers = None if jobs is None or jobs < 1 else jobs
+    return fit_groups(model_type, X, y, workers=workers, fitted=fitted, on_fit=save)
+
+
+def evaluate(model, X_val, y_val):
+    import numpy as np
+
+    predictions = model.predict(X_val)
+    return float(np.mean(np.abs(predictions - y_val)))
+
+
+def train_full(input_path, output_path='model.pkl', model_type='fast',
+               sample_breaths=None, checkpoint_dir='checkpoints',
+               checkpoint_every=10, jobs=-1, validation_split=0.2,
+               seed=42, restart=False, register=False, lean=False, specialize=False,
+               compress_budget=None):
+    """
+    Entrenar con checkpoints; retorna (VentilatorModel, MAE de validación)
+
+    lean: features en float32 (la mitad de memoria y de disco en X.npy)
+    specialize: un sub-modelo por par (R, C); --jobs es el número de grupos
+    que se entrenan a la vez
+    compress_budget: comprimir el .vcm con este aumento relativo de MAE
+    permitido (ver compress.py)
+    """
+    import numpy as np
+
+    params = {
+        'input': os.path.abspath(input_path),
+        'input_size': os.path.getsize(input_path),
+        'model_type': model_type,
+        'sample_breaths': sample_breaths,
+        'validation_split': validation_split,
+        'seed': seed,
+    }
+    if lean:
+        # Sólo si está activo: los checkpoints float64 existentes siguen valiendo
+        params['dtype'] = 'float32'
+    if specialize:
+        params['specialize'] = True
+    checkpoint = Checkpoint(checkpoint_dir, params)
+    if restart:
+        checkpoint.clear()
+    elif checkpoint.resume():
+        print(f"↻ Retomando desde {checkpoint_dir} (etapas completas: "
+              f"{', '.join(checkpoint.state['completed']) or 'ninguna'})")
+
+    timer = StageTimer()
+
+    print(f"\n{'='*60}")
+    print(f"ENTRENAMIENTO COMPLETO - Modelo: {model_type.upper()}")
+    print(f"{'='*60}")
+
+    if not checkpoint.done('features'):
+        rows, breaths, baseline = timer.run('Carga y features', build_feature_checkpoint,
+                                            checkpoint, input_path, sample_breaths, seed,
+                                            np.float32 if lean else None)
+        checkpoint.state['rows'] = rows
+        checkpoint.state['breaths'] = breaths
+        checkpoint.state['baseline'] = baseline
+        checkpoint.mark('features')
+
+    X = np.load(checkpoint.path('X.npy'), mmap_mode='r')
+    y = np.load(checkpoint.path('y.npy'), mmap_mode='r')
+    train_idx, val_idx = split_indices(len(X), validation_split, seed)
+    print(f"\n  Entrenamiento: {len(train_idx):,} muestras  |  Validación: {len(val_idx):,}")
+
+    # Única copia de las filas de entrenamiento (X está mapeado desde disco);
+    # el scaler se ajusta sobre ella y la normaliza in-place
+    X_train = X[train_idx]
+    if checkpoint.done('scaler'):
+        scaler = _load_pickle(checkpoint.path('scaler.pkl'))
+    else:
+        scaler = timer.run('Scaler', fit_scaler, checkpoint, X_train)
+        checkpoint.mark('scaler')
+
+    X_train = timer.run('Normalización', scaler.transform, X_train, copy=False)
+    y_train = np.asarray(y[train_idx])
+
+    estimator = _build_estimator(model_type)
+    estimator.set_params(warm_start=True, verbose=0)
+    if specialize:
+        estimator = timer.run('Ajuste (grupos R, C)', fit_specialized,
+                              checkpoint, model_type, X_train, y_train, jobs)
+    elif model_type == 'fast':
+        estimator.set_params(n_jobs=jobs)
+        estimator = timer.run('Ajuste (árboles)', fit_forest,
+                              checkpoint, estimator, X_train, y_train, checkpoint_every)
+    else:
+        # GradientBoosting es secuencial por etapas: --jobs no aplica
+        estimator = timer.run('Ajuste (boosting)', fit_boosting,
+                              checkpoint, estimator, X_train, y_train, checkpoint_every)
+    checkpoint.mark('fit')
+    del X_train
+
+    X_val = scaler.transform(X[val_idx], copy=False)
+    y_val = np.asarray(y[val_idx])
+    val_mae = timer.run('Evaluación', evaluate, estimator, X_val, y_val)
+    print(f"\n  MAE de validación: {val_mae:.4f} cmH₂O")
+
+    model = VentilatorModel(model_type, specialize=specialize)
+    model.model = estimator
+    model.scaler = scaler
+    if checkpoint.state.get('baseline'):
+        from ventilator.drift import DriftSketch
+        model.baseline = DriftSketch.from_dict(checkpoint.state['baseline'])
+    model.training_info = {
+        'training_rows': int(checkpoint.state.get('rows', len(X))),
+        'training_breaths': int(checkpoint.state.get('breaths', 0)),
+        'val_mae': val_mae,
+        'sample_breaths': sample_breaths,
+    }
+    if specialize:
+        model.training_info['specialized'] = True
+    if compress_budget is not None:
+        # El .vcm exportado (y registrado) sale cuantizado y podado; el .pkl queda completo
+        result = timer.run('Compresión', model.compress, X_val, y_val, compress_budget)
+        model.training_info['compression'] = result['compression']
+        model.training_info['compressed_val_mae'] = result['mae']
+
+    def save():
+        model.save(output_path)
+        model.export_compact(os.path.splitext(output_path)[0] + '.vcm')
+        if register:
+            from config import Config
+            from registry import ModelRegistry
+            ModelRegistry(Config.MODEL_FOLDER).register(model, model.training_info)
+
+    timer.run('Guardado', save)
+    checkpoint.mark('saved')
+    timer.report()
+
+    return model, val_mae
+
 
 def train_model(train_path, output_path='model.pkl'):
-    print("Cargando datos...")
-    df = pd.read_csv(train_path)
-    
-    # Usar solo una muestra para demo (primeros 10000 registros)
-    df = df.head(10000)
-    
-    print(f"Datos cargados: {len(df)} registros")
-    print(f"Breaths únicos: {df['breath_id'].nunique()}")
-    
-    print("\nEntrenando modelo...")
-    model = VentilatorModel()
-    mae = model.train(df)
-    
-    print(f"\n✓ Entrenamiento completado!")
-    print(f"MAE en entrenamiento: {mae:.4f} cmH₂O")
-    
-    print(f"\nGuardando modelo en {output_path}...")
-    model.save(output_path)
-    print("✓ Modelo guardado!")
-    
-    return model, mae
+    """Compatibilidad con la versión anterior: entrena con el archivo completo"""
+    return train_full(train_path, output_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Entrenamiento completo con checkpoints')
+    parser.add_argument('--input', default='train.csv', help='CSV de entrenamiento')
+    parser.add_argument('--output', default='model.pkl', help='Modelo de salida (.pkl, también se exporta .vcm)')
+    parser.add_argument('--model-type', default='fast', choices=['fast', 'accurate'])
+    parser.add_argument('--sample-breaths', type=float, default=None,
+                        help='Fracción (<=1) o número de ciclos a usar; por defecto todos')
+    parser.add_argument('--checkpoint-dir', default='checkpoints')
+    parser.add_argument('--checkpoint-every', type=int, default=10,
+                        help='Árboles / etapas de boosting entre checkpoints')
+    parser.add_argument('--jobs', type=int, default=-1, help='Procesos para RandomForest (-1 = todos)')
+    parser.add_argument('--validation-split', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--restart', action='store_true', help='Borrar checkpoints y empezar de cero')
+    parser.add_argument('--register', action='store_true', help='Registrar el modelo en Config.MODEL_FOLDER')
+    parser.add_argument('--lean', action='store_true', help='Features en float32 (mitad de memoria)')
+    parser.add_argument('--specialize', action='store_true', help='Un sub-modelo por par (R, C)')
+    parser.add_argument('--compress-budget', type=float, default=None,
+                        help='Cuantizar y podar el .vcm con este aumento de MAE (0.01 = +1%%)')
+    args = parser.parse_args()
+
+    train_full(args.input, args.output, model_type=args.model_type,
+               sample_breaths=args.sample_breaths, checkpoint_dir=args.checkpoint_dir,
+               checkpoint_every=args.checkpoint_every, jobs=args.jobs,
+               validation_split=args.validation_split, seed=args.seed,
+               restart=args.restart, register=args.register, lean=args.lean,
+               specialize=args.specialize, compress_budget=args.compress_budget)
+
 
 if __name__ == "__main__":
-    model, mae = train_model('train.csv')
\ No newline at end of file
+    main()
@@ -0,0 +1,418 @@
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+
+# Subida de archivos grandes por partes
+#
+#   POST /api/uploads                      -> crea el upload, retorna upload_id
+#   PUT  /api/uploads/<id>/parts/<n>       -> cuerpo = bytes de la parte n
+#                                             (header X-Content-SHA256 opcional)
+#   GET  /api/uploads/<id>                 -> partes recibidas (para retomar)
+#   POST /api/uploads/<id>/complete        -> total de partes (+ sha256 opcional)
+#
+# Cada parte se escribe directo a disco en UPLOAD_FOLDER/<id>/part_000000.
+# Apenas se crea el upload arranca su parseo (un hilo por upload), que lee
+# las partes en orden: mientras las últimas siguen llegando, el prefijo ya
+# recibido se va parseando. Como máximo ingest_workers parseos usan CPU a la
+# vez; un parseo que espera la próxima parte libera su lugar, así un upload
+# abandonado no frena a los demás.
+#
+# /api/train y /api/predict reciben el upload_id y lo consumen: al entregar
+# el DataFrame se borra el directorio. Los uploads sin actividad por más de
+# ttl segundos (abandonados, o completos y nunca consumidos) se borran junto
+# con su DataFrame ya parseado; si su parseo seguía esperando partes, se
+# cancela.
+
+PART_PATTERN = re.compile(r'^part_(\d{6})$')
+UPLOAD_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+SWEEP_INTERVAL = 60  # segundos entre barridos de uploads vencidos
+
+
+class UploadError(Exception):
+    """Error del protocolo de subida (se responde con status_code)"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+    def __reduce__(self):
+        # Conservar status_code al volver desde un proceso del pool
+        return UploadError, (str(self), self.status_code)
+
+
+class Upload:
+    def __init__(self, upload_id, directory, meta):
+        self.upload_id = upload_id
+        self.directory = directory
+        self.meta = meta
+        self.condition = threading.Condition()
+        self.ingest = None   # parseo en curso o terminado (Ingest)
+        self.cancelled = False
+
+    @property
+    def complete(self):
+        return self.meta.get('total_parts') is not None
+
+    def part_path(self, index):
+        return os.path.join(self.directory, f'part_{index:06d}')
+
+    def parts(self):
+        found = []
+        for name in os.listdir(self.directory):
+            match = PART_PATTERN.match(name)
+            if match:
+                found.append(int(match.group(1)))
+        return sorted(found)
+
+    def save_meta(self):
+        tmp = os.path.join(self.directory, 'meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, os.path.join(self.directory, 'meta.json'))
+
+    def wait_for_part(self, index, timeout):
+        """
+        Esperar a que llegue la parte `index`. Retorna su ruta, o None si el
+        upload ya está completo y no hay más partes.
+        """
+        deadline = time.time() + timeout
+        with self.condition:
+            while True:
+                if self.cancelled:
+                    raise UploadError(f'Upload {self.upload_id} borrado', 410)
+                path = self.part_path(index)
+                if os.path.exists(path):
+                    return path
+                if self.complete and index >= self.meta['total_parts']:
+                    return None
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError(f'Upload {self.upload_id}: la parte {index} no llegó')
+                self.condition.wait(remaining)
+
+    def notify(self):
+        with self.condition:
+            self.condition.notify_all()
+
+    def cancel(self):
+        """Cortar la espera de partes (el upload se borra)"""
+        with self.condition:
+            self.cancelled = True
+            self.condition.notify_all()
+
+
+class PartsReader(io.RawIOBase):
+    """
+    Archivo de sólo lectura que concatena las partes de un upload en orden,
+    bloqueándose hasta que llega la siguiente. Calcula el SHA-256 del total.
+
+    slot: semáforo de parseos simultáneos. Se toma mientras hay partes para
+    leer y se suelta mientras se espera la siguiente.
+    """
+
+    def __init__(self, upload, timeout, slot=None):
+        self.upload = upload
+        self.timeout = timeout
+        self.slot = slot
+        self.holding = False
+        self.index = 0
+        self.current = None
+        self.sha256 = hashlib.sha256()
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while True:
+            if self.current is None:
+                path = self.upload.part_path(self.index)
+                if not os.path.exists(path):
+                    self._release()
+                    path = self.upload.wait_for_part(self.index, self.timeout)
+                self._acquire()
+                if path is None:
+                    return 0
+                self.current = open(path, 'rb')
+
+            n = self.current.readinto(buffer)
+            if n:
+                self.sha256.update(memoryview(buffer)[:n])
+                self.bytes_read += n
+                return n
+
+            self.current.close()
+            self.current = None
+            self.index += 1
+
+    def _acquire(self):
+        if self.slot is not None and not self.holding:
+            self.slot.acquire()
+            self.holding = True
+
+    def _release(self):
+        if self.holding:
+            self.slot.release()
+            self.holding = False
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+        self._release()
+        super().close()
+
+
+class Ingest:
+    """Parseo del CSV de un upload a medida que llegan las partes"""
+
+    def __init__(self, upload, parse, timeout, slot=None):
+        self.upload = upload
+        self.parse = parse
+        self.timeout = timeout
+        self.slot = slot
+        self.result = None
+        self.error = None
+        self.sha256 = None
+        self.done = threading.Event()
+
+    def start(self):
+        name = f'ingest-{self.upload.upload_id[:8]}'
+        threading.Thread(target=self.run, daemon=True, name=name).start()
+
+    def run(self):
+        reader = PartsReader(self.upload, self.timeout, self.slot)
+        try:
+            with io.BufferedReader(reader, buffer_size=1024 * 1024) as stream:
+                self.result = self.parse(stream)
+            self.sha256 = reader.sha256.hexdigest()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+
+def parse_csv(stream):
+    # Acepta partes de un archivo gzip / zstd (ver ventilator/ingest.py)
+    from ventilator.ingest import read_csv
+    return read_csv(stream)
+
+
+class UploadManager:
+    def __init__(self, root='uploads', max_part_size=16 * 1024 * 1024, timeout=600, parse=parse_csv,
+                 ttl=3600, ingest_workers=2):
+        """
+        ttl: segundos sin actividad tras los que se borra un upload
+        ingest_workers: parseos simultáneos como máximo (sin contar los que
+        esperan partes)
+        """
+        self.root = root
+        self.max_part_size = max_part_size
+        self.timeout = timeout
+        self.parse = parse
+        self.ttl = ttl
+        self.ingest_workers = ingest_workers
+        self._uploads = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(ingest_workers)
+        self._last_sweep = 0
+        os.makedirs(self.root, exist_ok=True)
+        # Uploads que quedaron de antes de reiniciar el servidor
+        self.cleanup()
+
+    def cleanup(self, force=False):
+        """
+        Borrar los uploads sin actividad por más de ttl segundos (la fecha de
+        modificación del directorio cambia con cada parte y al completarlo).
+        Sin force, a lo sumo un barrido cada SWEEP_INTERVAL segundos.
+        Retorna los upload_id borrados.
+        """
+        now = time.time()
+        if not force and now - self._last_sweep < SWEEP_INTERVAL:
+            return []
+        self._last_sweep = now
+
+        removed = []
+        for name in os.listdir(self.root):
+            directory = os.path.join(self.root, name)
+            if not UPLOAD_ID_PATTERN.fullmatch(name) or not os.path.isdir(directory):
+                continue
+            try:
+                if now - os.path.getmtime(directory) < self.ttl:
+                    continue
+            except OSError:
+                continue
+            with self._lock:
+                upload = self._uploads.get(name)
+                if upload is not None:
+                    if upload.complete and upload.ingest is not None and not upload.ingest.done.is_set():
+                        # Parseo de un upload completo en curso: se revisa en el próximo barrido
+                        continue
+                    # Si esperaba partes, que deje de esperar
+                    upload.cancel()
+                self._uploads.pop(name, None)
+            shutil.rmtree(directory, ignore_errors=True)
+            removed.append(name)
+
+        with self._lock:
+            # Consumidos o borrados por otro proceso
+            for upload_id, upload in list(self._uploads.items()):
+                if not os.path.isdir(upload.directory):
+                    self._uploads.pop(upload_id)
+        if removed:
+            print(f"🧹 {len(removed)} upload(s) vencidos borrados")
+        return removed
+
+    def discard(self, upload_id):
+        """Borrar un upload (directorio y DataFrame parseado)"""
+        with self._lock:
+            upload = self._uploads.pop(upload_id, None)
+        if upload is not None:
+            upload.cancel()
+        shutil.rmtree(os.path.join(self.root, upload_id), ignore_errors=True)
+
+    def create(self, filename=None, size=None, sha256=None):
+        self.cleanup()
+        upload_id = uuid.uuid4().hex
+        directory = os.path.join(self.root, upload_id)
+        os.makedirs(directory)
+        upload = Upload(upload_id, directory, {
+            'filename': filename,
+            'size': size,
+            'sha256': sha256,
+            'total_parts': None,
+            'created_at': time.time(),
+        })
+        upload.save_meta()
+        with self._lock:
+            self._uploads[upload_id] = upload
+            self._start_ingest(upload)
+        return upload
+
+    def get(self, upload_id):
+        """Buscar un upload (también los de antes de reiniciar el servidor)"""
+        if not UPLOAD_ID_PATTERN.fullmatch(upload_id or ''):
+            raise UploadError('upload_id inválido', 404)
+        self.cleanup()
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None:
+                directory = os.path.join(self.root, upload_id)
+                try:
+                    with open(os.path.join(directory, 'meta.json')) as f:
+                        meta = json.load(f)
+                except OSError:
+                    raise UploadError(f'Upload desconocido: {upload_id}', 404)
+                upload = Upload(upload_id, directory, meta)
+                self._uploads[upload_id] = upload
+        return upload
+
+    def put_part(self, upload_id, index, stream, expected_sha256=None):
+        """Guardar una parte leyendo el cuerpo de la petición por bloques"""
+        upload = self.get(upload_id)
+        if upload.complete and index >= upload.meta['total_parts']:
+            raise UploadError(f'La parte {index} excede el total declarado', 400)
+
+        path = upload.part_path(index)
+        tmp = path + f'.{uuid.uuid4().hex}.tmp'
+        sha256 = hashlib.sha256()
+        size = 0
+        with open(tmp, 'wb') as f:
+            while True:
+                block = stream.read(1024 * 1024)
+                if not block:
+                    break
+                size += len(block)
+                if size > self.max_part_size:
+                    f.close()
+                    os.remove(tmp)
+                    raise UploadError(f'La parte supera {self.max_part_size} bytes', 413)
+                sha256.update(block)
+                f.write(block)
+
+        digest = sha256.hexdigest()
+        if expected_sha256 and expected_sha256.lower() != digest:
+            os.remove(tmp)
+            raise UploadError(f'SHA-256 de la parte {index} no coincide', 422)
+
+        if os.path.exists(path):
+            # Reintento de una parte ya recibida: válido sólo si es idéntica
+            with open(path, 'rb') as f:
+                same = hashlib.sha256(f.read()).hexdigest() == digest
+            os.remove(tmp)
+            if not same:
+                raise UploadError(f'La parte {index} ya existe con otro contenido', 409)
+        else:
+            os.replace(tmp, path)
+            upload.notify()
+
+        return {'index': index, 'bytes': size, 'sha256': digest}
+
+    def complete(self, upload_id, total_parts, sha256=None):
+        upload = self.get(upload_id)
+        missing = [i for i in range(total_parts) if not os.path.exists(upload.part_path(i))]
+        if missing:
+            raise UploadError(f'Faltan partes: {missing[:20]}', 409)
+
+        upload.meta['total_parts'] = total_parts
+        if sha256:
+            upload.meta['sha256'] = sha256.lower()
+        upload.save_meta()
+        upload.notify()
+        return self.status(upload_id)
+
+    def status(self, upload_id):
+        upload = self.get(upload_id)
+        parts = upload.parts()
+        return {
+            'upload_id': upload_id,
+            'filename': upload.meta.get('filename'),
+            'complete': upload.complete,
+            'total_parts': upload.meta.get('total_parts'),
+            'part_size': self.max_part_size,
+            'received_parts': parts,
+            'received_bytes': sum(os.path.getsize(upload.part_path(i)) for i in parts),
+            'ingesting': upload.ingest is not None and not upload.ingest.done.is_set(),
+        }
+
+    def _start_ingest(self, upload):
+        """Arrancar el parseo (con self._lock tomado)"""
+        upload.ingest = Ingest(upload, self.parse, self.timeout, self._slots)
+        upload.ingest.start()
+
+    def dataframe(self, upload_id, timeout=None):
+        """
+        Esperar el resultado del parseo de un upload completo. El upload se
+        consume: al entregar el DataFrame se borra su directorio.
+        """
+        upload = self.get(upload_id)
+        if not upload.complete:
+            raise UploadError('El upload no está completo', 409)
+
+        with self._lock:
+            stale = upload.ingest is not None and upload.ingest.done.is_set() and \
+                isinstance(upload.ingest.error, TimeoutError)
+            if upload.ingest is None or stale:
+                # Nunca arrancó (ej. tras reiniciar) o se cansó de esperar partes
+                self._start_ingest(upload)
+            ingest = upload.ingest
+
+        if not ingest.done.wait(timeout or self.timeout):
+            raise UploadError('El parseo del upload no terminó a tiempo', 504)
+        with self._lock:
+            if upload.ingest is ingest:
+                upload.ingest = None
+
+        if ingest.error is not None:
+            raise UploadError(f'Error al parsear el upload: {ingest.error}', 400)
+        expected = upload.meta.get('sha256')
+        if expected and expected != ingest.sha256:
+            raise UploadError('El SHA-256 del archivo completo no coincide', 422)
+        self.discard(upload_id)
+        return ingest.result
@@ -0,0 +1,104 @@
+import threading
+import time
+
+# Pool acotado de procesos para el trabajo pesado (pandas / sklearn)
+#
+# Los hilos del servidor HTTP sólo esperan el resultado (sin el GIL), así
+# /api/status y los demás endpoints livianos responden en milisegundos aunque
+# haya predicciones grandes en curso. Hay a lo sumo `workers` trabajos en
+# ejecución y `max_pending` esperando; más allá se rechaza con PoolBusy (503)
+# en lugar de encolar sin límite.
+
+
+class PoolBusy(Exception):
+    """La cola está llena: el cliente debe reintentar más tarde (503)"""
+
+
+class PoolTimeout(Exception):
+    """El trabajo no terminó dentro del tiempo de la petición (504)"""
+
+
+class WorkPool:
+    def __init__(self, workers=2, max_pending=8, timeout=300, initializer=None, initargs=()):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._initializer = initializer
+        self._initargs = initargs
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    def _get_executor(self):
+        # Los procesos se crean al primer trabajo (y con 'spawn': no heredan
+        # los hilos ni los locks del servidor)
+        with self._lock:
+            if self._executor is None:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                self._executor = ProcessPoolExecutor(
+                    self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=self._initializer,
+                    initargs=self._initargs
+                )
+            return self._executor
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+        self._slots.release()
+
+    def run(self, fn, *args, timeout=None):
+        """
+        Ejecutar fn(*args) en el pool y esperar el resultado.
+        Lanza PoolBusy si no hay lugar en la cola y PoolTimeout si no termina
+        a tiempo. Un trabajo vencido que ya empezó sigue ocupando su lugar
+        hasta terminar, así la cola refleja la carga real de los procesos.
+        """
+        from concurrent.futures import TimeoutError as FutureTimeout
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PoolBusy(f'Servidor ocupado: {self.workers + self.max_pending} trabajos en curso')
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+
+        start = time.time()
+        try:
+            return future.result(timeout=timeout or self.timeout)
+        except FutureTimeout:
+            future.cancel()  # sólo tiene efecto si todavía estaba en la cola
+            with self._lock:
+                self._timed_out += 1
+            raise PoolTimeout(f'El trabajo no terminó en {time.time() - start:.0f} s')
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'in_flight': self._in_flight,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'timed_out': self._timed_out,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
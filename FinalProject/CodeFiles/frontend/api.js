@@ -14,6 +14,20 @@ export const trainModel = async (file, epochs = 50) => {
   return response.data;
 };
 
+// Actualización incremental: agrega a la versión (por defecto la actual)
+// árboles entrenados sólo con los ciclos nuevos del archivo
+export const updateModel = async (file, version = null) => {
+  const formData = new FormData();
+  formData.append('file', file);
+  if (version) formData.append('version', version);
+
+  const response = await axios.post(`${API_URL}/update`, formData, {
+    headers: { 'Content-Type': 'multipart/form-data' }
+  });
+
+  return response.data;
+};
+
 export const predictTest = async (file) => {
   const formData = new FormData();
   formData.append('file', file);
@@ -28,4 +42,109 @@ export const predictTest = async (file) => {
 export const loadModel = async () => {
   const response = await axios.get(`${API_URL}/load_model`);
   return response.data;
-};
\ No newline at end of file
+};
+
+// Drift del tráfico de predicción vs los datos de entrenamiento (reset: nueva ventana)
+export const getDrift = async (version = null, reset = false) => {
+  const params = {};
+  if (version) params.version = version;
+  if (reset) params.reset = 'true';
+  const response = await axios.get(`${API_URL}/drift`, { params });
+  return response.data;
+};
+
+const sha256Hex = async (buffer) => {
+  const digest = await crypto.subtle.digest('SHA-256', buffer);
+  return Array.from(new Uint8Array(digest))
+    .map((b) => b.toString(16).padStart(2, '0'))
+    .join('');
+};
+
+// Subida por partes para archivos grandes (train.csv / test.csv completos).
+// Pasando el uploadId de un intento anterior, sólo se envían las partes que faltan.
+// Retorna el upload_id para usar en trainModel / predictTest.
+export const uploadInParts = async (file, onProgress, uploadId = null) => {
+  let partSize;
+  let received = new Set();
+
+  if (uploadId) {
+    const status = await axios.get(`${API_URL}/uploads/${uploadId}`);
+    received = new Set(status.data.received_parts);
+    partSize = status.data.part_size;
+  }
+  if (!uploadId || !partSize) {
+    const created = await axios.post(`${API_URL}/uploads`, { filename: file.name, size: file.size });
+    uploadId = created.data.upload_id;
+    partSize = created.data.part_size;
+    received = new Set();
+  }
+
+  const totalParts = Math.ceil(file.size / partSize);
+  for (let index = 0; index < totalParts; index++) {
+    if (!received.has(index)) {
+      const buffer = await file.slice(index * partSize, (index + 1) * partSize).arrayBuffer();
+      await axios.put(`${API_URL}/uploads/${uploadId}/parts/${index}`, buffer, {
+        headers: {
+          'Content-Type': 'application/octet-stream',
+          'X-Content-SHA256': await sha256Hex(buffer)
+        }
+      });
+    }
+    if (onProgress) onProgress((index + 1) / totalParts);
+  }
+
+  await axios.post(`${API_URL}/uploads/${uploadId}/complete`, { total_parts: totalParts });
+  return uploadId;
+};
+
+export const trainFromUpload = async (uploadId, modelType = 'fast') => {
+  const response = await axios.post(`${API_URL}/train`, { upload_id: uploadId, model_type: modelType }, {
+    headers: { 'Content-Type': 'application/x-www-form-urlencoded' }
+  });
+  return response.data;
+};
+
+export const predictFromUpload = async (uploadId) => {
+  const response = await axios.post(`${API_URL}/predict`, { upload_id: uploadId }, {
+    headers: { 'Content-Type': 'application/x-www-form-urlencoded' }
+  });
+  return response.data;
+};
+
+// Respuesta binaria columnar de /api/predict (ver backend/columnar.py):
+//   'VPR1' | largo del header (uint32 LE) | header JSON | columnas alineadas a 8 bytes
+// Las columnas son vistas tipadas sobre el mismo ArrayBuffer (sin copiar).
+const COLUMNAR_MIME = 'application/vnd.ventilator.predictions';
+const TYPED_ARRAYS = { '<i4': Int32Array, '<i8': BigInt64Array, '<f4': Float32Array, '<f8': Float64Array };
+
+export const decodePredictions = (buffer) => {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+  if (magic !== 'VPR1') throw new Error('Respuesta columnar inválida');
+  const headerLength = view.getUint32(4, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+  const dataStart = Math.ceil((8 + headerLength) / 8) * 8;
+
+  const columns = {};
+  for (const [name, spec] of Object.entries(header.columns)) {
+    columns[name] = new TYPED_ARRAYS[spec.dtype](buffer, dataStart + spec.offset, spec.length);
+  }
+  return { header, columns };
+};
+
+// Todas las predicciones de un upload, pidiendo maxBreaths ciclos por página.
+// onPage recibe cada página decodificada ({ header, columns }).
+export const predictAllFromUpload = async (uploadId, onPage, maxBreaths = 5000) => {
+  let breathStart = null;
+  do {
+    const params = { upload_id: uploadId, max_breaths: maxBreaths };
+    if (breathStart !== null) params.breath_start = breathStart;
+    const response = await axios.post(`${API_URL}/predict`, params, {
+      headers: { 'Content-Type': 'application/x-www-form-urlencoded', Accept: COLUMNAR_MIME },
+      responseType: 'arraybuffer'
+    });
+    const page = decodePredictions(response.data);
+    await onPage(page);
+    breathStart = page.header.next_breath_start;
+  } while (breathStart !== null);
+};
@@ -1,7 +1,7 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import pandas as pd
 from model import VentilatorModel
+from ventilator.ingest import read_csv
 import io
 
 app = Flask(__name__)
@@ -22,8 +22,8 @@ def train():
     file = request.files['file']
     
     try:
-        # Leer CSV
-        df = pd.read_csv(file)
+        # Leer CSV (también gzip / zstd)
+        df = read_csv(file.stream)
         
         # Usar muestra pequeña para demo
         df = df.head(5000)
@@ -61,23 +61,25 @@ def predict():
     file = request.files['file']
     
     try:
-        # Leer CSV
-        df_test = pd.read_csv(file)
+        # Leer CSV (también gzip / zstd)
+        df_test = read_csv(file.stream)
         
         # Muestra pequeña
         df_test = df_test.head(5000)
         
         print(f"Prediciendo {len(df_test)} registros...")
         
-        # Predecir
-        predictions = model.predict(df_test)
+        # Predecir (en orden de ciclo; order indica la fila de df_test de cada una)
+        predictions, order = model.predict(df_test, return_order=True)
+        ids = df_test['id'].to_numpy()[order]
+        breath_ids = df_test['breath_id'].to_numpy()[order]
         
         # Preparar respuesta
         results = []
-        for i, (idx, row) in enumerate(df_test.iterrows()):
+        for i in range(len(predictions)):
             results.append({
-                'id': int(row['id']),
-                'breath_id': int(row['breath_id']),
+                'id': int(ids[i]),
+                'breath_id': int(breath_ids[i]),
                 'pressure': float(predictions[i])
             })
         
@@ -85,7 +87,7 @@ def predict():
         simulated_pressures = df_test.apply(
             lambda row: row['R'] * row['u_in'] * 0.1 + (1/row['C']) * row['time_step'] * 0.5,
             axis=1
-        )
+        ).to_numpy()[order]
         mae = abs(predictions - simulated_pressures).mean()
         
         return jsonify({
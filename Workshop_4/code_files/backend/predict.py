@@ -1,5 +1,6 @@
 import pandas as pd
 from model import VentilatorModel
+from ventilator.ingest import read_csv
 
 def predict_test(model_path, test_csv_path, output_csv='submission.csv'):
     print("Cargando modelo...")
@@ -7,7 +8,7 @@ def predict_test(model_path, test_csv_path, output_csv='submission.csv'):
     model.load(model_path)
     
     print("Cargando datos de test...")
-    df_test = pd.read_csv(test_csv_path)
+    df_test = read_csv(test_csv_path)
     
     # Usar solo una muestra para demo
     df_test = df_test.head(10000)
@@ -15,11 +16,12 @@ def predict_test(model_path, test_csv_path, output_csv='submission.csv'):
     print(f"Datos de test: {len(df_test)} registros")
     
     print("\nHaciendo predicciones...")
-    predictions = model.predict(df_test)
+    # Las predicciones salen en orden de ciclo: order indica la fila de cada una
+    predictions, order = model.predict(df_test, return_order=True)
     
     print("\nCreando archivo de submission...")
     submission = pd.DataFrame({
-        'id': df_test['id'],
+        'id': df_test['id'].to_numpy()[order],
         'pressure': predictions
     })
     
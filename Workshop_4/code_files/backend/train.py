@@ -1,9 +1,11 @@
-import pandas as pd
 from model import VentilatorModel
+from ventilator.ingest import read_csv
+from ventilator.instrumentation import StageTimer
 
 def train_model(train_path, output_path='model.pkl'):
-    print("Cargando datos...")
-    df = pd.read_csv(train_path)
+    timer = StageTimer()
+    
+    df = timer.run('Carga de datos', read_csv, train_path)
     
     # Usar solo una muestra para demo (primeros 10000 registros)
     df = df.head(10000)
@@ -11,16 +13,14 @@ def train_model(train_path, output_path='model.pkl'):
     print(f"Datos cargados: {len(df)} registros")
     print(f"Breaths únicos: {df['breath_id'].nunique()}")
     
-    print("\nEntrenando modelo...")
     model = VentilatorModel()
-    mae = model.train(df)
+    mae = timer.run('Entrenamiento', model.train, df)
     
     print(f"\n✓ Entrenamiento completado!")
     print(f"MAE en entrenamiento: {mae:.4f} cmH₂O")
     
-    print(f"\nGuardando modelo en {output_path}...")
-    model.save(output_path)
-    print("✓ Modelo guardado!")
+    timer.run('Guardado', model.save, output_path)
+    timer.report()
     
     return model, mae
 
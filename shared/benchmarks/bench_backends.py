@@ -0,0 +1,182 @@
+"""
+Benchmark entre backends: Workshop_4 vs FinalProject sobre el pipeline compartido
+
+Cada backend corre en un proceso propio con su directorio primero en
+sys.path (el `import model` de Workshop_4 es su model.py; FinalProject usa
+ventilator.model directamente) y, con el mismo CSV y el mismo artefacto:
+
+    1. lee el CSV (ventilator.ingest.read_csv)
+    2. construye las features con VentilatorModel.prepare_features
+    3. carga el mismo model.pkl y predice
+
+Cada backend se verifica contra una referencia independiente del pipeline
+compartido, sobre los primeros --reference-breaths ciclos (las features van
+en orden de aparición de los ciclos, así que son las primeras filas de X):
+
+    - X e y contra la implementación original fila por fila de Workshop_4
+      (legacy_features, es lenta)
+    - las predicciones contra el estimador del artefacto aplicado
+      directamente a esas features (scaler.transform + model.predict)
+
+Comparar los backends entre sí no prueba nada: los dos llaman al mismo
+ventilator.features. Se compara el throughput (filas por segundo) de cada
+etapa, mejor de --repeat corridas.
+
+Uso:
+    python shared/benchmarks/bench_backends.py --input train.csv \\
+        [--repeat 3] [--reference-breaths 50] [--train-breaths 500]
+"""
+import argparse
+import importlib
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Nombre -> (directorio del backend, módulo que define su VentilatorModel)
+BACKENDS = {
+    'Workshop_4': (os.path.join(REPO, 'Workshop_4', 'code_files', 'backend'), 'model'),
+    'FinalProject': (os.path.join(REPO, 'FinalProject', 'CodeFiles', 'backend'), 'ventilator.model'),
+}
+
+
+def best_time(func, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def legacy_features(df):
+    """prepare_features original de Workshop_4 (fila por fila), como referencia"""
+    import numpy as np
+
+    features = []
+    targets = []
+    for breath_id in df['breath_id'].unique():
+        breath_data = df[df['breath_id'] == breath_id].sort_values('time_step')
+        for i in range(len(breath_data)):
+            row = breath_data.iloc[i]
+            feature_vector = [row['R'], row['C'], row['time_step'], row['u_in'], row['u_out']]
+            if i > 0:
+                prev_row = breath_data.iloc[i - 1]
+                feature_vector.extend([prev_row['u_in'], prev_row['u_out']])
+            else:
+                feature_vector.extend([0, 0])
+            if i > 1:
+                prev2_row = breath_data.iloc[i - 2]
+                feature_vector.extend([prev2_row['u_in'], prev2_row['u_out']])
+            else:
+                feature_vector.extend([0, 0])
+            features.append(feature_vector)
+            if 'pressure' in row:
+                targets.append(row['pressure'])
+    return np.array(features), np.array(targets) if targets else None
+
+
+def worker(name, csv_path, model_path, out_dir, repeat, results):
+    directory, module_name = BACKENDS[name]
+    sys.path.insert(0, directory)
+    os.chdir(directory)
+    import numpy as np
+    from ventilator.ingest import read_csv
+
+    sys.stdout = open(os.devnull, 'w')
+    module = importlib.import_module(module_name)
+    read_s, df = best_time(lambda: read_csv(csv_path), repeat)
+    model = module.VentilatorModel()
+    model.load(model_path)
+    features_s, (X, y) = best_time(lambda: model.prepare_features(df), repeat)
+    predict_s, predictions = best_time(lambda: model.predict(df), repeat)
+    sys.stdout = sys.__stdout__
+
+    np.save(os.path.join(out_dir, f'{name}_X.npy'), X)
+    np.save(os.path.join(out_dir, f'{name}_y.npy'), y)
+    np.save(os.path.join(out_dir, f'{name}_pred.npy'), predictions)
+    results.put({
+        'name': name,
+        'module': os.path.relpath(module.__file__, REPO),
+        'rows': len(df),
+        'read': read_s,
+        'features': features_s,
+        'predict': predict_s,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Features idénticas y throughput entre backends')
+    parser.add_argument('--input', required=True, help='CSV de entrenamiento (con pressure)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--reference-breaths', type=int, default=50,
+                        help='Ciclos comparados contra la implementación original')
+    parser.add_argument('--train-breaths', type=int, default=500,
+                        help='Ciclos para entrenar el artefacto compartido')
+    args = parser.parse_args()
+
+    import numpy as np
+    import pandas as pd
+    from ventilator.ingest import read_csv
+    from ventilator.model import VentilatorModel
+
+    csv_path = os.path.abspath(args.input)
+    df = read_csv(csv_path)
+    breaths = pd.unique(df['breath_id'])
+    print(f"📁 {len(df):,} filas, {len(breaths):,} ciclos")
+
+    failures = []
+    reference = df[df['breath_id'].isin(breaths[:args.reference_breaths])]
+    start = time.perf_counter()
+    X_legacy, y_legacy = legacy_features(reference)
+    legacy_s = time.perf_counter() - start
+    print(f"📐 Referencia fila por fila: {len(reference):,} filas "
+          f"({len(reference) / legacy_s:,.0f} filas/s)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'model.pkl')
+        sys.stdout = open(os.devnull, 'w')
+        model = VentilatorModel('fast', {'n_estimators': 20, 'verbose': 0})
+        model.train(df[df['breath_id'].isin(breaths[:args.train_breaths])])
+        model.save(model_path)
+        sys.stdout = sys.__stdout__
+        pred_legacy = model.model.predict(model.scaler.transform(X_legacy))
+        expected = {'X': X_legacy, 'y': y_legacy, 'pred': pred_legacy}
+
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        rows = []
+        for name in BACKENDS:
+            process = context.Process(target=worker,
+                                      args=(name, csv_path, model_path, tmp, args.repeat, results))
+            process.start()
+            rows.append(results.get())
+            process.join()
+            print(f"  ✓ {name}")
+
+        n = len(reference)
+        for row in rows:
+            name = row['name']
+            for suffix, label in (('X', 'features'), ('y', 'presiones'), ('pred', 'predicciones')):
+                result = np.load(os.path.join(tmp, f'{name}_{suffix}.npy'), allow_pickle=True)
+                if np.array_equal(result[:n], expected[suffix]):
+                    print(f"✓ {name}: {label} idénticas a la referencia")
+                else:
+                    failures.append(f'{label} de {name} vs referencia')
+
+    print(f"\n📊 Throughput por etapa (filas/s, mejor de {args.repeat})\n")
+    print(f"  {'backend':<13} {'VentilatorModel':<36} {'lectura':>11} {'features':>11} {'predicción':>11}")
+    for row in rows:
+        print(f"  {row['name']:<13} {row['module']:<36} {row['rows'] / row['read']:>11,.0f} "
+              f"{row['rows'] / row['features']:>11,.0f} {row['rows'] / row['predict']:>11,.0f}")
+    print()
+
+    if failures:
+        raise SystemExit(f"❌ Diferencias: {', '.join(failures)}")
+
+
+if __name__ == '__main__':
+    main()
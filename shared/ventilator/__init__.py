@@ -0,0 +1,20 @@
+"""
+Pipeline compartido de predicción de presión del ventilador
+
+Lo usan los backends de Workshop_4 y FinalProject, así cada optimización se
+hace una sola vez:
+
+    ingest           lectura de CSVs (también gzip / zstd) en streaming
+    utils            validación rápida de CSVs (inspect_csv)
+    features         construcción vectorizada de features
+    model            VentilatorModel: entrenamiento, actualización y predicción
+    specialized      sub-modelos por par (R, C)
+    compact          formato de artefacto .vcm (inferencia con numpy y mmap)
+    compress         cuantización y poda del .vcm
+    drift            monitoreo de drift sobre el tráfico de predicción
+    instrumentation  tiempo por etapa y memoria pico
+
+Los módulos no se importan acá: cargar un modelo compacto no debe pagar el
+import de pandas ni de sklearn.
+"""
+__version__ = '1.0.0'
@@ -0,0 +1,408 @@
+import json
+import mmap
+
+# Formato compacto de inferencia (.vcm)
+#
+# Guarda los arreglos numéricos de los árboles (hijos, feature, umbral, valor)
+# y las estadísticas del scaler en un único archivo binario:
+#
+#   MAGIC (4 bytes) | largo del header (uint32 LE) | header JSON | arreglos
+#
+# Cada arreglo empieza alineado a 64 bytes para poder mapearlo en memoria
+# directamente con numpy, sin copiar y sin importar sklearn.
+#
+# Compresión opcional (ver compress.py), indicada en header['compression']:
+#
+#   quantize   umbrales y valores de hoja en uint16 (feature en uint8). Cada
+#              feature tiene su propio rango de umbrales (threshold_lo/step);
+#              la entrada se codifica con la misma escala una vez por
+#              predicción y el recorrido compara enteros.
+#   max_depth  los nodos a esa profundidad pasan a ser hojas (sklearn guarda
+#              el promedio en todos los nodos) y los de abajo se descartan
+#   trees      índices de los árboles que se conservan
+
+MAGIC = b'VCM1'
+ALIGNMENT = 64
+
+
+def is_compact_file(filepath):
+    """Indica si el archivo tiene el formato compacto"""
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _node_depth(t):
+    """Profundidad de cada nodo de un árbol de sklearn (por niveles, vectorizado)"""
+    import numpy as np
+
+    depth = np.zeros(t.node_count, dtype=np.int32)
+    frontier = np.array([0])
+    level = 0
+    while len(frontier):
+        depth[frontier] = level
+        children = np.concatenate([t.children_left[frontier], t.children_right[frontier]])
+        frontier = children[children != -1]
+        level += 1
+    return depth
+
+
+def _flatten_trees(trees, max_depth=None):
+    """
+    Concatena los árboles en arreglos planos con índices absolutos.
+    Las hojas apuntan a sí mismas para que el recorrido vectorizado
+    pueda iterar un número fijo de niveles.
+
+    max_depth: recortar los árboles a esa profundidad.
+    Retorna (arreglos, profundidad de cada árbol).
+    """
+    import numpy as np
+
+    lefts, rights, features, thresholds, values, roots, depths = [], [], [], [], [], [], []
+    offset = 0
+
+    for tree in trees:
+        t = tree.tree_
+        is_leaf = t.children_left == -1
+        ids = np.arange(t.node_count)
+        keep = slice(None)
+        depth = int(t.max_depth)
+
+        if max_depth is not None and depth > max_depth:
+            node_depth = _node_depth(t)
+            is_leaf = is_leaf | (node_depth >= max_depth)
+            keep = node_depth <= max_depth
+            ids = np.cumsum(keep) - 1  # nuevos índices de los nodos que quedan
+            depth = max_depth
+
+        node_ids = (ids + offset).astype(np.int32)
+        left = np.where(is_leaf, node_ids, node_ids[t.children_left])[keep]
+        right = np.where(is_leaf, node_ids, node_ids[t.children_right])[keep]
+        feature = np.where(is_leaf, 0, t.feature).astype(np.int32)[keep]
+        threshold = np.where(is_leaf, np.inf, t.threshold).astype(np.float64)[keep]
+
+        lefts.append(left)
+        rights.append(right)
+        features.append(feature)
+        thresholds.append(threshold)
+        values.append(t.value[:, 0, 0].astype(np.float64)[keep])
+        roots.append(offset)
+
+        offset += len(left)
+        depths.append(depth)
+
+    return {
+        'left': np.concatenate(lefts),
+        'right': np.concatenate(rights),
+        'feature': np.concatenate(features),
+        'threshold': np.concatenate(thresholds),
+        'value': np.concatenate(values),
+        'roots': np.array(roots, dtype=np.int64),
+    }, depths
+
+
+QUANT_LEVELS = 65535  # uint16
+
+
+def _quantize(arrays, n_features):
+    """
+    Umbrales a uint16 con una escala por feature y valores de hoja a uint16
+    con una escala global. Retorna (value_lo, value_step) para el header.
+
+    Un umbral cuantizado q representa lo + q * step; la entrada se codifica
+    como ceil((x - lo) / step), así x <= umbral equivale a código <= q.
+    """
+    import numpy as np
+
+    n = len(arrays['left'])
+    is_leaf = arrays['left'] == np.arange(n)
+    feature, threshold = arrays['feature'], arrays['threshold']
+
+    lo = np.zeros(n_features)
+    step = np.ones(n_features)
+    codes = np.zeros(n, dtype=np.uint16)
+    for j in range(n_features):
+        nodes = ~is_leaf & (feature == j)
+        if not nodes.any():
+            continue
+        lo[j] = threshold[nodes].min()
+        span = threshold[nodes].max() - lo[j]
+        step[j] = span / QUANT_LEVELS if span > 0 else 1.0
+        codes[nodes] = np.round((threshold[nodes] - lo[j]) / step[j])
+
+    value = arrays['value']
+    value_lo = float(value.min())
+    span = float(value.max()) - value_lo
+    value_step = span / QUANT_LEVELS if span > 0 else 1.0
+
+    arrays['feature'] = feature.astype(np.uint8)
+    arrays['threshold'] = codes
+    arrays['threshold_lo'] = lo
+    arrays['threshold_step'] = step
+    arrays['value'] = np.round((value - value_lo) / value_step).astype(np.uint16)
+    return value_lo, value_step
+
+
+def _ensemble_terms(estimator):
+    """(árboles, base, escala) de pred = base + escala * suma(árboles)"""
+    import numpy as np
+
+    if hasattr(estimator, 'learning_rate'):
+        # GradientBoosting: pred = init + learning_rate * suma(árboles)
+        trees = [stage[0] for stage in estimator.estimators_]
+        n_features = estimator.n_features_in_
+        if estimator.init_ == 'zero':
+            base = 0.0
+        else:
+            base = float(estimator.init_.predict(np.zeros((1, n_features)))[0])
+        return trees, base, float(estimator.learning_rate)
+    # RandomForest: pred = promedio de los árboles
+    trees = list(estimator.estimators_)
+    return trees, 0.0, 1.0 / len(trees)
+
+
+def compact_arrays(estimator, scaler, model_type, metadata=None, compression=None):
+    """
+    Arreglos y header del formato compacto (sin escribir el archivo).
+
+    Un GroupedForest (ver specialized.py) se guarda con todos los árboles en
+    los mismos arreglos; header['groups'] indica el rango de árboles de cada
+    sub-modelo y la tabla de despacho va en los arreglos group_*.
+
+    compression: {'quantize': bool, 'max_depth': int, 'trees': [índices]}
+    (ver el comentario al inicio del módulo)
+    """
+    import numpy as np
+
+    compression = {k: v for k, v in (compression or {}).items() if v}
+    max_depth = compression.get('max_depth')
+
+    groups = None
+    if hasattr(estimator, 'table'):
+        if compression.get('trees'):
+            raise ValueError('La selección de árboles no aplica a modelos especializados')
+        trees, groups = [], []
+        for sub in estimator.models:
+            sub_trees, base, scale = _ensemble_terms(sub)
+            groups.append({'trees': [len(trees), len(trees) + len(sub_trees)],
+                           'base': base, 'scale': scale})
+            trees.extend(sub_trees)
+        base, scale = 0.0, 1.0
+    else:
+        trees, base, scale = _ensemble_terms(estimator)
+        if compression.get('trees'):
+            kept = [trees[i] for i in compression['trees']]
+            if not hasattr(estimator, 'learning_rate'):
+                scale = 1.0 / len(kept)  # promedio de los árboles que quedan
+            trees = kept
+
+    arrays, depths = _flatten_trees(trees, max_depth)
+    header = {
+        'model_type': model_type,
+        'n_trees': len(trees),
+        'max_depth': max(depths),
+        'base': base,
+        'scale': scale,
+        'metadata': metadata or {},
+        'arrays': {}
+    }
+    if groups is not None:
+        for group in groups:
+            first, last = group['trees']
+            group['max_depth'] = max(depths[first:last])
+        header['groups'] = groups
+    if compression:
+        header['compression'] = compression
+    if compression.get('quantize'):
+        header['value_lo'], header['value_step'] = _quantize(arrays, len(scaler.mean_))
+
+    arrays['scaler_mean'] = np.asarray(scaler.mean_, dtype=np.float64)
+    arrays['scaler_scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+    if groups is not None:
+        arrays['group_r_keys'] = estimator.r_keys
+        arrays['group_c_keys'] = estimator.c_keys
+        arrays['group_table'] = estimator.table
+
+    return arrays, header
+
+
+def export_compact(estimator, scaler, model_type, filepath, metadata=None, compression=None):
+    """
+    Exporta un RandomForestRegressor o GradientBoostingRegressor ya entrenado
+    (junto con su StandardScaler) al formato compacto (ver compact_arrays)
+    """
+    import numpy as np
+
+    arrays, header = compact_arrays(estimator, scaler, model_type, metadata, compression)
+
+    # Calcular offsets (relativos al inicio de la zona de datos)
+    data_offset = 0
+    for name, arr in arrays.items():
+        data_offset = _align(data_offset)
+        header['arrays'][name] = {
+            'dtype': arr.dtype.str,
+            'shape': list(arr.shape),
+            'offset': data_offset
+        }
+        data_offset += arr.nbytes
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + 4 + len(header_bytes))
+
+    with open(filepath, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(4, 'little'))
+        f.write(header_bytes)
+        for name, arr in arrays.items():
+            f.seek(data_start + header['arrays'][name]['offset'])
+            f.write(np.ascontiguousarray(arr).tobytes())
+
+    return filepath
+
+
+class CompactScaler:
+    """Equivalente mínimo de StandardScaler.transform"""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        import numpy as np
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class CompactForest:
+    """Inferencia de ensambles de árboles usando solo numpy"""
+
+    def __init__(self, arrays, header):
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.n_trees = header['n_trees']
+        self.max_depth = header['max_depth']
+        self.base = header['base']
+        self.scale = header['scale']
+        # Modelo cuantizado (ver _quantize); sin cuantizar, 0 + 1 * valor
+        self.threshold_lo = arrays.get('threshold_lo')
+        self.threshold_step = arrays.get('threshold_step')
+        self.value_lo = header.get('value_lo', 0.0)
+        self.value_step = header.get('value_step', 1.0)
+
+    def arrays(self):
+        arrays = (self.left, self.right, self.feature, self.threshold, self.value, self.roots)
+        if self.threshold_lo is not None:
+            arrays += (self.threshold_lo, self.threshold_step)
+        return arrays
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.arrays())
+
+    def _encode(self, X):
+        import numpy as np
+
+        # sklearn compara en float32 contra umbrales float64: se replica igual
+        X = np.asarray(X, dtype=np.float32)
+        if self.threshold_lo is None:
+            return X
+        codes = np.ceil((X - self.threshold_lo) / self.threshold_step)
+        return np.clip(codes, -1, QUANT_LEVELS + 1).astype(np.int32)
+
+    def _leaves(self, Xb):
+        """Índice de la hoja de cada fila, árbol por árbol"""
+        import numpy as np
+
+        rows = np.arange(len(Xb))
+        for root in self.roots:
+            idx = np.full(len(Xb), root, dtype=np.int64)
+            for _ in range(self.max_depth):
+                go_left = Xb[rows, self.feature[idx]] <= self.threshold[idx]
+                idx = np.where(go_left, self.left[idx], self.right[idx])
+            yield idx
+
+    def predict(self, X, batch_size=65536):
+        import numpy as np
+
+        X = self._encode(X)
+        out = np.empty(len(X), dtype=np.float64)
+
+        for start in range(0, len(X), batch_size):
+            Xb = X[start:start + batch_size]
+            total = np.zeros(len(Xb), dtype=np.float64)
+            for idx in self._leaves(Xb):
+                total += self.value[idx]
+
+            total = self.value_lo * len(self.roots) + self.value_step * total
+            out[start:start + len(Xb)] = self.base + self.scale * total
+
+        return out
+
+    def tree_values(self, X):
+        """Matriz (árboles, filas) con el valor de hoja de cada árbol (sin base ni escala)"""
+        import numpy as np
+
+        X = self._encode(X)
+        return np.stack([self.value_lo + self.value_step * self.value[idx] for idx in self._leaves(X)])
+
+
+def build_forest(arrays, header):
+    """CompactForest (o GroupedForest) a partir de los arreglos y el header"""
+    if 'groups' not in header:
+        return CompactForest(arrays, header)
+
+    from .specialized import GroupedForest
+
+    # Cada sub-modelo es una vista de los arreglos compartidos con sus raíces
+    models = []
+    for group in header['groups']:
+        first, last = group['trees']
+        models.append(CompactForest(
+            dict(arrays, roots=arrays['roots'][first:last]),
+            dict(header, **group, n_trees=last - first)
+        ))
+    return GroupedForest(models, arrays['group_r_keys'], arrays['group_c_keys'], arrays['group_table'])
+
+
+def load_compact(filepath, use_mmap=True):
+    """
+    Carga un archivo .vcm. Con use_mmap=True los arreglos son vistas de solo
+    lectura sobre el archivo mapeado (no se copian a memoria privada).
+
+    Retorna (CompactForest o GroupedForest, CompactScaler, header)
+    """
+    import numpy as np
+
+    with open(filepath, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{filepath} no es un modelo compacto')
+        header_len = int.from_bytes(f.read(4), 'little')
+        header = json.loads(f.read(header_len).decode('utf-8'))
+        data_start = _align(len(MAGIC) + 4 + header_len)
+
+        if use_mmap:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            f.seek(0)
+            buffer = f.read()
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape'])) if spec['shape'] else 1
+        arrays[name] = np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=data_start + spec['offset']
+        ).reshape(spec['shape'])
+
+    forest = build_forest(arrays, header)
+    scaler = CompactScaler(arrays['scaler_mean'], arrays['scaler_scale'])
+    return forest, scaler, header
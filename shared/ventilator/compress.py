@@ -0,0 +1,179 @@
+"""
+Compresión del modelo compacto (.vcm) contra un presupuesto de MAE
+
+Pasos, cada uno sólo si el MAE de validación sigue dentro de
+MAE original * (1 + mae_budget):
+
+    1. cuantización  umbrales y valores de hoja en uint16 (ver compact.py)
+    2. profundidad   se baja max_depth de a un nivel mientras alcance
+    3. árboles       (fast) selección greedy: se agrega el árbol que más baja
+                     el MAE del promedio y se corta en el menor número de
+                     árboles dentro del presupuesto. (accurate) se conservan
+                     las primeras etapas del boosting.
+
+El pickle registrado sigue teniendo el modelo completo; la compresión se
+aplica al exportar el .vcm que se sirve. report() compara tamaño, tiempo
+de carga, velocidad de inferencia y MAE de cada variante.
+"""
+import os
+import pickle
+import tempfile
+import time
+
+
+def _forest(estimator, scaler, model_type, compression=None):
+    from .compact import build_forest, compact_arrays
+
+    arrays, header = compact_arrays(estimator, scaler, model_type, compression=compression)
+    return build_forest(arrays, header), header
+
+
+def _mae(predictions, y):
+    import numpy as np
+    return float(np.mean(np.abs(predictions - y)))
+
+
+def select_trees(values, y, base, scale, boosting, limit):
+    """
+    Menor subconjunto de árboles con MAE <= limit.
+    values: matriz (árboles, filas) de CompactForest.tree_values
+    Retorna (índices, MAE).
+    """
+    import numpy as np
+
+    n_trees = len(values)
+    if boosting:
+        # Las etapas dependen de las anteriores: sólo se puede cortar el final
+        cumulative = np.cumsum(values, axis=0)
+        for k in range(1, n_trees + 1):
+            mae = _mae(base + scale * cumulative[k - 1], y)
+            if mae <= limit:
+                return list(range(k)), mae
+        return list(range(n_trees)), mae
+
+    chosen = []
+    remaining = np.arange(n_trees)
+    total = np.zeros(values.shape[1])
+    for k in range(1, n_trees + 1):
+        errors = np.abs((total + values[remaining]) / k - y).mean(axis=1)
+        best = int(errors.argmin())
+        chosen.append(int(remaining[best]))
+        total += values[remaining[best]]
+        remaining = np.delete(remaining, best)
+        if errors[best] <= limit:
+            return sorted(chosen), float(errors[best])
+    return sorted(chosen), float(errors[best])
+
+
+def search_compression(estimator, scaler, model_type, X_val, y_val, mae_budget=0.01,
+                       quantize=True, prune='both', max_rows=50000, seed=42):
+    """
+    Buscar la compresión más agresiva dentro del presupuesto de MAE.
+
+    X_val: features normalizadas; si hay más de max_rows filas la búsqueda
+    usa una muestra (el MAE final se mide con todas).
+    prune: 'none' | 'depth' | 'trees' | 'both'
+
+    Retorna {'compression', 'reference_mae', 'mae', 'limit', 'steps'}
+    """
+    import numpy as np
+
+    X, y = X_val, np.asarray(y_val)
+    if len(X) > max_rows:
+        rows = np.sort(np.random.default_rng(seed).choice(len(X), max_rows, replace=False))
+        X, y = X[rows], y[rows]
+
+    forest, header = _forest(estimator, scaler, model_type)
+    reference = _mae(forest.predict(X), y)
+    limit = reference * (1 + mae_budget)
+    steps = [('original', {}, reference)]
+    compression = {}
+    print(f"📏 MAE de referencia {reference:.4f}  |  límite {limit:.4f} (+{mae_budget * 100:.1f}%)")
+
+    def evaluate(candidate):
+        return _mae(_forest(estimator, scaler, model_type, candidate)[0].predict(X), y)
+
+    if quantize:
+        mae = evaluate({'quantize': True})
+        print(f"  cuantización uint16: MAE {mae:.4f}")
+        if mae <= limit:
+            compression['quantize'] = True
+            steps.append(('cuantización', dict(compression), mae))
+
+    if prune in ('depth', 'both'):
+        accepted = None
+        for depth in range(header['max_depth'] - 1, 0, -1):
+            mae = evaluate(dict(compression, max_depth=depth))
+            print(f"  profundidad {depth}: MAE {mae:.4f}")
+            if mae > limit:
+                break
+            accepted = (depth, mae)
+        if accepted:
+            compression['max_depth'] = accepted[0]
+            steps.append((f"profundidad {accepted[0]}", dict(compression), accepted[1]))
+
+    if prune in ('trees', 'both') and not hasattr(estimator, 'table'):
+        forest, header = _forest(estimator, scaler, model_type, compression)
+        boosting = hasattr(estimator, 'learning_rate')
+        trees, mae = select_trees(forest.tree_values(X), y, header['base'], header['scale'], boosting, limit)
+        print(f"  {len(trees)}/{header['n_trees']} árboles: MAE {mae:.4f}")
+        if len(trees) < header['n_trees']:
+            compression['trees'] = trees
+            steps.append((f"{len(trees)} árboles", dict(compression), mae))
+
+    final = _mae(_forest(estimator, scaler, model_type, compression)[0].predict(X_val), y_val)
+    return {
+        'compression': compression or None,
+        'reference_mae': reference,
+        'mae': final,
+        'limit': limit,
+        'steps': steps,
+    }
+
+
+def _best_time(func, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(model, X_val, y_val, variants, repeat=3):
+    """
+    Tamaño, carga, inferencia y MAE del pickle y de cada variante .vcm.
+    variants: [(nombre, compression)]; la primera es la referencia.
+    """
+    from .compact import export_compact, load_compact
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.pkl')
+        with open(path, 'wb') as f:
+            pickle.dump(model.model, f)
+
+        def load_pickle():
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+
+        load, _ = _best_time(load_pickle, repeat)
+        infer, predictions = _best_time(lambda: model.model.predict(X_val), repeat)
+        rows.append(('sklearn (.pkl)', os.path.getsize(path), load, infer, _mae(predictions, y_val)))
+
+        for name, compression in variants:
+            path = os.path.join(tmp, 'model.vcm')
+            export_compact(model.model, model.scaler, model.model_type, path, compression=compression)
+            # Carga copiando a memoria: con mmap el costo se pagaría en la primera predicción
+            load, (forest, _, _) = _best_time(lambda: load_compact(path, use_mmap=False), repeat)
+            infer, predictions = _best_time(lambda: forest.predict(X_val), repeat)
+            rows.append((name, os.path.getsize(path), load, infer, _mae(predictions, y_val)))
+
+    reference = rows[1]
+    print(f"\n📊 Compresión ({len(X_val):,} filas de validación)\n")
+    print(f"  {'variante':<24} {'tamaño MB':>10} {'carga ms':>9} {'predict ms':>11} {'MAE':>8} {'ΔMAE':>8}")
+    for name, size, load, infer, mae in rows:
+        print(f"  {name:<24} {size / 1024 ** 2:>10.2f} {load * 1000:>9.1f} {infer * 1000:>11.1f} "
+              f"{mae:>8.4f} {(mae / reference[4] - 1) * 100:>+7.2f}%")
+    print()
+    return rows
@@ -0,0 +1,416 @@
+import threading
+from datetime import datetime
+
+# Monitoreo de drift y calidad de datos sobre el tráfico de predicción
+#
+# Cada petición se resume en un DriftSketch de tamaño fijo, sin guardar filas:
+#
+#   - por feature y por par (R, C): histograma sobre bordes fijos (cuantiles
+#     de los datos de entrenamiento) y momentos n, media y M2 (Welford / Chan)
+#   - por feature: mínimo, máximo, valores no finitos y valores fuera del
+#     rango visto en el entrenamiento
+#
+# Los sketches se combinan con merge() sin importar cómo se partió el
+# tráfico (por petición, por proceso del pool o por lote del micro-batching)
+# y el resultado es el mismo que con todas las filas juntas. La memoria es
+# constante: (grupos x (bins + 3)) números por feature.
+#
+# El sketch base se calcula al entrenar y viaja en el artefacto del modelo
+# (pickle y header del .vcm). El del tráfico usa sus mismos bordes y grupos,
+# así compare() trabaja sobre arreglos chicos: PSI por feature y por grupo,
+# desplazamiento de la media en desvíos estándar y cuantiles aproximados.
+#
+# numpy se importa dentro de cada función: app.py crea el DriftMonitor al
+# arrancar y el servidor no debe pagar ese import hasta la primera petición.
+
+# Entradas del CSV que se monitorean (R y C definen los grupos) y la salida:
+# presión real en el sketch base, predicha en el del tráfico
+INPUT_FEATURES = ['time_step', 'u_in', 'u_out']
+OUTPUT_FEATURE = 'pressure'
+
+N_BINS = 20
+# Filas de entrenamiento usadas para elegir los bordes (los conteos usan todas)
+EDGE_SAMPLE = 200000
+
+# Umbrales habituales de PSI: < 0.1 estable, < 0.25 cambio moderado
+PSI_WARNING = 0.1
+PSI_DRIFT = 0.25
+# Con menos filas en un grupo el PSI es ruido de muestreo
+MIN_GROUP_ROWS = 500
+
+QUANTILES = (0.05, 0.5, 0.95)
+
+# Clave numérica de un par (R, C); R y C son enteros chicos en el dataset
+_KEY_SCALE = 1e6
+
+
+def _group_keys(R, C):
+    import numpy as np
+
+    return np.asarray(R, dtype=np.float64) * _KEY_SCALE + np.asarray(C, dtype=np.float64)
+
+
+def _finite_or_none(value):
+    import numpy as np
+
+    return float(value) if np.isfinite(value) else None
+
+
+class FeatureSketch:
+    """Histograma y momentos de una feature, por grupo (R, C)"""
+
+    def __init__(self, edges, n_groups, low=None, high=None):
+        """
+        edges: bordes internos de los bins (el primero y el último quedan abiertos)
+        low, high: rango visto en el entrenamiento (None: no contar fuera de rango)
+        """
+        import numpy as np
+
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.low, self.high = low, high
+        self.counts = np.zeros((n_groups, len(self.edges) + 1), dtype=np.int64)
+        self.n = np.zeros(n_groups, dtype=np.int64)
+        self.mean = np.zeros(n_groups)
+        self.m2 = np.zeros(n_groups)
+        self.min, self.max = np.inf, -np.inf
+        self.nonfinite = 0
+        self.out_of_range = 0
+
+    def empty_like(self):
+        return FeatureSketch(self.edges, len(self.n), self.low, self.high)
+
+    def _merge_moments(self, n, mean, m2):
+        import numpy as np
+
+        # Combinación de Chan et al.: exacta para cualquier partición de las filas
+        total = self.n + n
+        safe = np.maximum(total, 1)
+        delta = mean - self.mean
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.n * n / safe)
+        self.mean = self.mean + delta * (n / safe)
+        self.n = total
+
+    def update(self, values, groups):
+        """values: float64; groups: índice de grupo de cada valor"""
+        import numpy as np
+
+        finite = np.isfinite(values)
+        if not finite.all():
+            self.nonfinite += int(len(values) - finite.sum())
+            values, groups = values[finite], groups[finite]
+        if not len(values):
+            return
+
+        n_groups, n_bins = self.counts.shape
+        bins = np.searchsorted(self.edges, values, side='right')
+        self.counts += np.bincount(groups * n_bins + bins, minlength=self.counts.size).reshape(self.counts.shape)
+
+        n = np.bincount(groups, minlength=n_groups)
+        mean = np.bincount(groups, weights=values, minlength=n_groups) / np.maximum(n, 1)
+        m2 = np.bincount(groups, weights=(values - mean[groups]) ** 2, minlength=n_groups)
+        self._merge_moments(n, mean, m2)
+
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if self.low is not None:
+            self.out_of_range += int(np.count_nonzero((values < self.low) | (values > self.high)))
+
+    def merge(self, other):
+        self.counts += other.counts
+        self._merge_moments(other.n, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.nonfinite += other.nonfinite
+        self.out_of_range += other.out_of_range
+
+    def moments(self, group=None):
+        """(n, media, desvío) de un grupo o de todos juntos"""
+        import numpy as np
+
+        if group is not None:
+            n = int(self.n[group])
+            return n, float(self.mean[group]), float(np.sqrt(self.m2[group] / n)) if n else 0.0
+        n = int(self.n.sum())
+        if not n:
+            return 0, 0.0, 0.0
+        mean = float((self.n * self.mean).sum() / n)
+        m2 = float(self.m2.sum() + (self.n * (self.mean - mean) ** 2).sum())
+        return n, mean, float(np.sqrt(m2 / n))
+
+    def quantiles(self, probs=QUANTILES, group=None):
+        """Cuantiles aproximados: interpolación lineal dentro de cada bin"""
+        import numpy as np
+
+        counts = self.counts.sum(axis=0) if group is None else self.counts[group]
+        total = counts.sum()
+        if not total:
+            return [None] * len(probs)
+        lo = min(self.min, self.edges[0]) if len(self.edges) else self.min
+        hi = max(self.max, self.edges[-1]) if len(self.edges) else self.max
+        bounds = np.concatenate([[lo], self.edges, [hi]])
+        cdf = np.concatenate([[0], np.cumsum(counts)]) / total
+        return [float(v) for v in np.interp(probs, cdf, bounds)]
+
+    def to_dict(self):
+        return {
+            'edges': self.edges.tolist(),
+            'low': self.low,
+            'high': self.high,
+            'counts': self.counts.tolist(),
+            'n': self.n.tolist(),
+            'mean': self.mean.tolist(),
+            'm2': self.m2.tolist(),
+            'min': _finite_or_none(self.min),
+            'max': _finite_or_none(self.max),
+            'nonfinite': self.nonfinite,
+            'out_of_range': self.out_of_range,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        import numpy as np
+
+        sketch = cls(data['edges'], len(data['n']), data['low'], data['high'])
+        sketch.counts = np.asarray(data['counts'], dtype=np.int64).reshape(sketch.counts.shape)
+        sketch.n = np.asarray(data['n'], dtype=np.int64)
+        sketch.mean = np.asarray(data['mean'], dtype=np.float64)
+        sketch.m2 = np.asarray(data['m2'], dtype=np.float64)
+        sketch.min = np.inf if data['min'] is None else data['min']
+        sketch.max = -np.inf if data['max'] is None else data['max']
+        sketch.nonfinite = data['nonfinite']
+        sketch.out_of_range = data['out_of_range']
+        return sketch
+
+
+class DriftSketch:
+    """
+    Resumen de un conjunto de filas: un FeatureSketch por feature, con un
+    grupo por par (R, C) del entrenamiento más uno final para pares nuevos
+    """
+
+    def __init__(self, groups, features):
+        """
+        groups: pares (R, C) del entrenamiento
+        features: {nombre: FeatureSketch} con len(groups) + 1 grupos
+        """
+        import numpy as np
+
+        self.groups = [tuple(float(v) for v in group) for group in groups]
+        self.features = features
+        self.rows = 0
+        keys = _group_keys([r for r, _ in self.groups], [c for _, c in self.groups])
+        self._order = np.argsort(keys)
+        self._keys = keys[self._order]
+
+    @classmethod
+    def from_training(cls, df, seed=42):
+        """
+        Sketch base de los datos de entrenamiento (con pressure). Los bordes
+        de cada feature son sus cuantiles: bins de igual frecuencia.
+        """
+        import numpy as np
+
+        pairs = np.unique(np.column_stack([df['R'].to_numpy(np.float64), df['C'].to_numpy(np.float64)]), axis=0)
+        rng = np.random.default_rng(seed)
+        probs = np.linspace(0, 1, N_BINS + 1)[1:-1]
+
+        features = {}
+        for name in INPUT_FEATURES + [OUTPUT_FEATURE]:
+            values = df[name].to_numpy(np.float64)
+            values = values[np.isfinite(values)]
+            sample = rng.choice(values, EDGE_SAMPLE) if len(values) > EDGE_SAMPLE else values
+            edges = np.unique(np.quantile(sample, probs))
+            features[name] = FeatureSketch(edges, len(pairs) + 1, float(values.min()), float(values.max()))
+
+        sketch = cls(pairs, features)
+        sketch.observe(df, df[OUTPUT_FEATURE].to_numpy())
+        return sketch
+
+    def empty_like(self):
+        """Sketch vacío con los mismos bordes, grupos y rango (para el tráfico)"""
+        return DriftSketch(self.groups, {name: f.empty_like() for name, f in self.features.items()})
+
+    def group_codes(self, df):
+        """Índice de grupo de cada fila; len(groups) para pares (R, C) nuevos"""
+        import numpy as np
+
+        keys = _group_keys(df['R'].to_numpy(), df['C'].to_numpy())
+        index = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        return np.where(self._keys[index] == keys, self._order[index], len(self.groups))
+
+    def observe(self, df, predictions=None, order=None):
+        """
+        Agregar las filas de df. predictions: presiones (reales o predichas);
+        order: fila de df de cada predicción si no están en el orden de df
+        """
+        import numpy as np
+
+        codes = self.group_codes(df)
+        for name in INPUT_FEATURES:
+            self.features[name].update(df[name].to_numpy(np.float64), codes)
+        if predictions is not None:
+            self.features[OUTPUT_FEATURE].update(
+                np.asarray(predictions, dtype=np.float64), codes if order is None else codes[order]
+            )
+        self.rows += len(df)
+
+    def extend(self, df):
+        """
+        Sumar datos de entrenamiento nuevos al sketch base (ver
+        VentilatorModel.update): mismos bordes, rango ampliado
+        """
+        self.observe(df, df[OUTPUT_FEATURE].to_numpy())
+        for feature in self.features.values():
+            feature.low = min(feature.low, feature.min)
+            feature.high = max(feature.high, feature.max)
+            feature.out_of_range = 0
+
+    def merge(self, other):
+        for name, feature in self.features.items():
+            feature.merge(other.features[name])
+        self.rows += other.rows
+
+    def to_dict(self):
+        return {
+            'groups': [list(group) for group in self.groups],
+            'rows': self.rows,
+            'features': {name: f.to_dict() for name, f in self.features.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        features = {name: FeatureSketch.from_dict(f) for name, f in data['features'].items()}
+        sketch = cls(data['groups'], features)
+        sketch.rows = data['rows']
+        return sketch
+
+
+def psi(expected, actual, floor=1e-4):
+    """Population Stability Index entre dos histogramas con los mismos bins"""
+    import numpy as np
+
+    expected = np.asarray(expected, dtype=np.float64)
+    actual = np.asarray(actual, dtype=np.float64)
+    if not expected.sum() or not actual.sum():
+        return None
+    p = np.maximum(expected / expected.sum(), floor)
+    q = np.maximum(actual / actual.sum(), floor)
+    return float(((q - p) * np.log(q / p)).sum())
+
+
+def _status(value):
+    if value is None:
+        return 'no_data'
+    if value >= PSI_DRIFT:
+        return 'drift'
+    return 'warning' if value >= PSI_WARNING else 'ok'
+
+
+def _summary(feature, group=None):
+    n, mean, std = feature.moments(group)
+    summary = {'rows': n, 'mean': mean, 'std': std}
+    for p, value in zip(QUANTILES, feature.quantiles(QUANTILES, group)):
+        summary[f'p{int(p * 100):02d}'] = value
+    return summary
+
+
+def _shift(base, traffic):
+    """Diferencia de medias en desvíos estándar del entrenamiento"""
+    if not traffic['rows'] or not base['std']:
+        return None
+    return (traffic['mean'] - base['mean']) / base['std']
+
+
+def compare(baseline, traffic):
+    """
+    Reporte de drift del tráfico respecto del sketch base. El estado de cada
+    feature sale del PSI total; el general es el peor entre features y la
+    mezcla de pares (R, C).
+    """
+    rank = ['no_data', 'ok', 'warning', 'drift']
+    n_groups = len(baseline.groups)
+    any_feature = next(iter(baseline.features))
+    base_mix = baseline.features[any_feature].n
+    traffic_mix = traffic.features[any_feature].n
+    mix_psi = psi(base_mix[:n_groups], traffic_mix[:n_groups])
+
+    report = {
+        'rows': traffic.rows,
+        'unknown_group_rows': int(traffic_mix[n_groups]),
+        'group_mix': {
+            'psi': mix_psi,
+            'status': _status(mix_psi),
+            'groups': [
+                {
+                    'R': r, 'C': c,
+                    'baseline_share': float(base_mix[g] / max(base_mix.sum(), 1)),
+                    'traffic_share': float(traffic_mix[g] / max(traffic_mix.sum(), 1)),
+                }
+                for g, (r, c) in enumerate(baseline.groups)
+            ],
+        },
+        'features': {},
+    }
+
+    statuses = [report['group_mix']['status']]
+    for name, base in baseline.features.items():
+        current = traffic.features[name]
+        value = psi(base.counts.sum(axis=0), current.counts.sum(axis=0))
+        base_summary, traffic_summary = _summary(base), _summary(current)
+        groups = []
+        for g, (r, c) in enumerate(baseline.groups):
+            rows = int(current.n[g])
+            group_psi = psi(base.counts[g], current.counts[g]) if rows >= MIN_GROUP_ROWS else None
+            groups.append({
+                'R': r, 'C': c, 'rows': rows,
+                'psi': group_psi,
+                'status': _status(group_psi),
+                'mean_shift': _shift(_summary(base, g), _summary(current, g)),
+            })
+        observed = current.n.sum() + current.nonfinite
+        report['features'][name] = {
+            'psi': value,
+            'status': _status(value),
+            'mean_shift': _shift(base_summary, traffic_summary),
+            'baseline': base_summary,
+            'traffic': traffic_summary,
+            'nonfinite': current.nonfinite,
+            'out_of_range': current.out_of_range,
+            'out_of_range_fraction': current.out_of_range / observed if observed else 0.0,
+            'groups': groups,
+        }
+        statuses.append(report['features'][name]['status'])
+
+    report['status'] = max(statuses, key=rank.index)
+    return report
+
+
+class DriftMonitor:
+    """
+    Sketches del tráfico acumulados por versión del modelo (thread-safe).
+    Cada petición aporta un sketch ya calculado: acá sólo se combinan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._traffic = {}  # versión -> [DriftSketch, desde, peticiones]
+
+    def record(self, version, sketch):
+        with self._lock:
+            current = self._traffic.get(version)
+            if current is None:
+                since = datetime.now().isoformat(timespec='seconds')
+                self._traffic[version] = [sketch, since, 1]
+            else:
+                current[0].merge(sketch)
+                current[2] += 1
+
+    def report(self, version, baseline, reset=False):
+        """compare() del tráfico acumulado; reset empieza una ventana nueva"""
+        with self._lock:
+            current = self._traffic.pop(version, None) if reset else self._traffic.get(version)
+            if current is None:
+                current = [baseline.empty_like(), None, 0]
+            report = compare(baseline, current[0])
+        report['since'], report['requests'] = current[1], current[2]
+        return report
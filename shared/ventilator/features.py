@@ -0,0 +1,114 @@
+"""
+Construcción vectorizada de features
+
+Produce exactamente las mismas columnas que el ciclo original de
+VentilatorModel.prepare_features (ver FEATURE_NAMES en model.py), pero con
+operaciones de numpy sobre todo el DataFrame en lugar de fila por fila.
+"""
+
+
+# Columna de X de cada lag (ver FEATURE_NAMES en model.py)
+LAG_COLUMNS = {
+    ('u_in', 1): 5, ('u_out', 1): 6, ('u_in', 2): 7, ('u_out', 2): 8,
+}
+
+
+def _breath_order(df, presorted=False, holdout=None):
+    """breath_order + indicador de si el orden es la identidad (sin reordenar)"""
+    import numpy as np
+    import pandas as pd
+
+    codes, _ = pd.factorize(df['breath_id'])
+    time_step = df['time_step'].to_numpy()
+
+    verified = False
+    if presorted:
+        # factorize numera en orden de aparición: si los ciclos están
+        # contiguos los códigos nunca bajan, y dentro del ciclo el tiempo sube
+        same_breath = codes[1:] == codes[:-1]
+        verified = bool(np.all(codes[1:] >= codes[:-1]) and
+                        np.all(time_step[1:][same_breath] > time_step[:-1][same_breath]))
+
+    if holdout is not None:
+        # Los ciclos marcados van al final, así train y validación quedan
+        # como dos bloques contiguos (vistas, sin copiar)
+        last = np.asarray(holdout, dtype=bool)[codes]
+        if verified:
+            order = np.concatenate([np.flatnonzero(~last), np.flatnonzero(last)])
+        else:
+            order = np.lexsort((time_step, codes, last))
+        return order, codes[order], False
+
+    if verified:
+        return np.arange(len(codes)), codes, True
+
+    order = np.lexsort((time_step, codes))
+    return order, codes[order], False
+
+
+def breath_order(df, presorted=False, holdout=None):
+    """
+    Orden de las filas usado por las features: ciclos en orden de primera
+    aparición y, dentro de cada ciclo, por time_step.
+
+    presorted: el archivo ya viene ordenado (ver utils.inspect_csv). Se
+    confirma con una pasada O(n) y, si es cierto, se evita el ordenamiento.
+    holdout: booleano por ciclo (en orden de aparición); esos ciclos van al final.
+
+    Retorna (order, breath_codes) donde breath_codes ya está en ese orden.
+    """
+    order, codes, _ = _breath_order(df, presorted, holdout)
+    return order, codes
+
+
+def build_features(df, presorted=False, dtype=None, holdout=None, scaler=None):
+    """
+    Crear features temporales y de ventana (2 pasos anteriores de u_in/u_out)
+
+    dtype:   tipo de X (float64 por defecto; float32 usa la mitad de memoria
+             y es el tipo con el que sklearn recorre los árboles)
+    holdout: ver breath_order
+    scaler:  StandardScaler ya ajustado. Cada columna se normaliza al
+             construirla (en float64, con una sola conversión a dtype), así
+             no hace falta otra matriz y el resultado es idéntico a
+             scaler.transform(X).astype(dtype)
+
+    Retorna (X, y, order):
+        X:     matriz (n_filas, 9) preasignada, sin copias intermedias
+        y:     presiones en el mismo orden que X, o None si no hay 'pressure'
+        order: índices posicionales de df que corresponden a cada fila de X
+    """
+    import numpy as np
+
+    order, codes, identity = _breath_order(df, presorted, holdout)
+    n = len(order)
+    X = np.empty((n, 9), dtype=dtype or np.float64)
+
+    def put(j, values):
+        if scaler is None:
+            X[:, j] = values
+        else:
+            X[:, j] = (values - scaler.mean_[j]) / scaler.scale_[j]
+
+    new_breath = {lag: codes[lag:] != codes[:-lag] for lag in (1, 2) if n > lag}
+
+    for j, column in enumerate(['R', 'C', 'time_step', 'u_in', 'u_out']):
+        values = df[column].to_numpy(dtype=np.float64)
+        values = values if identity else values[order]
+        put(j, values)
+
+        # Lags dentro del mismo ciclo (0 al inicio de cada ciclo)
+        if column in ('u_in', 'u_out'):
+            for lag in (1, 2):
+                lagged = np.zeros(n)
+                if n > lag:
+                    lagged[lag:] = values[:-lag]
+                    lagged[lag:][new_breath[lag]] = 0
+                put(LAG_COLUMNS[(column, lag)], lagged)
+
+    y = None
+    if 'pressure' in df.columns:
+        pressure = df['pressure'].to_numpy(dtype=np.float64)
+        y = pressure if identity else pressure[order]
+
+    return X, y, order
@@ -0,0 +1,78 @@
+"""
+Entrada de CSVs comprimidos (gzip / zstd) con descompresión en streaming
+
+El formato se detecta por los bytes mágicos, no por la extensión, así
+funciona igual con archivos subidos, uploads por partes y rutas locales.
+El archivo nunca se descomprime completo en memoria: pandas lee del
+descompresor a medida que parsea.
+
+zstd requiere el paquete opcional `zstandard`.
+"""
+import io
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def detect_compression(head):
+    """'gzip', 'zstd' o None según los primeros bytes"""
+    if head.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if head.startswith(ZSTD_MAGIC):
+        return 'zstd'
+    return None
+
+
+def sniff(stream, size=4):
+    """Leer los primeros bytes sin consumirlos; retorna (stream, bytes)"""
+    if hasattr(stream, 'peek'):
+        return stream, stream.peek(size)[:size]
+    if stream.seekable():
+        position = stream.tell()
+        head = stream.read(size)
+        stream.seek(position)
+        return stream, head
+    stream = io.BufferedReader(stream)
+    return stream, stream.peek(size)[:size]
+
+
+def open_input(source):
+    """
+    Abrir una ruta o archivo binario y retornar (stream, compresión).
+    Si está comprimido, el stream entrega los bytes ya descomprimidos.
+    """
+    if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+        source = open(source, 'rb')
+
+    stream, head = sniff(source)
+    compression = detect_compression(head)
+
+    if compression == 'gzip':
+        import gzip
+        return gzip.GzipFile(fileobj=stream, mode='rb'), compression
+
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError('El archivo está comprimido con zstd: instala el paquete "zstandard"')
+        # closefd=False: cerrar el descompresor no debe cerrar el archivo original
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            stream, read_across_frames=True, closefd=False
+        )
+        return io.BufferedReader(reader, buffer_size=1024 * 1024), compression
+
+    return stream, None
+
+
+def read_csv(source, **kwargs):
+    """pd.read_csv que acepta entradas comprimidas con gzip o zstd"""
+    import pandas as pd
+
+    if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+        with open(source, 'rb') as f:
+            stream, _ = open_input(f)
+            return pd.read_csv(stream, **kwargs)
+
+    stream, _ = open_input(source)
+    return pd.read_csv(stream, **kwargs)
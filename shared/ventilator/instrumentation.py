@@ -0,0 +1,43 @@
+import resource
+import sys
+import time
+
+# Instrumentación de los procesos de entrenamiento y predicción por lotes:
+# tiempo de cada etapa y memoria pico. El monitoreo del tráfico de predicción
+# está en drift.py.
+
+
+class StageTimer:
+    """Acumula el tiempo de cada etapa para el resumen final"""
+
+    def __init__(self):
+        self.stages = []
+
+    def run(self, name, func, *args, **kwargs):
+        print(f"\n▶ {name}...")
+        sys.stdout.flush()
+        start = time.time()
+        result = func(*args, **kwargs)
+        elapsed = time.time() - start
+        self.stages.append((name, elapsed))
+        print(f"✓ {name} ({elapsed:.2f} s)")
+        return result
+
+    def report(self):
+        total = sum(seconds for _, seconds in self.stages)
+        print(f"\n{'='*60}")
+        print("TIEMPOS POR ETAPA")
+        print(f"{'='*60}")
+        for name, seconds in self.stages:
+            share = seconds / total * 100 if total else 0
+            print(f"  {name:<28} {seconds:10.2f} s  {share:5.1f}%")
+        print(f"  {'TOTAL':<28} {total:10.2f} s")
+        print(f"\n  Memoria pico: {peak_memory_mb():,.1f} MB")
+        print(f"{'='*60}\n")
+
+
+def peak_memory_mb():
+    """Memoria residente pico del proceso y sus hijos (ru_maxrss está en KB en Linux)"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(usage, children) / 1024
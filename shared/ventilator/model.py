@@ -0,0 +1,459 @@
+import pickle
+import time
+
+# numpy y sklearn se importan de forma perezosa (dentro de los métodos que los
+# usan) para que importar este módulo, o cargar un modelo compacto, sea rápido.
+
+# Orden de las columnas que genera prepare_features
+FEATURE_NAMES = [
+    'R', 'C', 'time_step', 'u_in', 'u_out',
+    'u_in_lag1', 'u_out_lag1', 'u_in_lag2', 'u_out_lag2'
+]
+
+
+def _build_estimator(model_type, params=None):
+    """
+    Crear el estimador de sklearn según el tipo de modelo.
+    params sobrescribe los hiperparámetros por defecto (ver hpsearch.py).
+    """
+    estimator = _default_estimator(model_type)
+    if params:
+        estimator.set_params(**params)
+    return estimator
+
+
+def _default_estimator(model_type):
+    from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+
+    if model_type == 'fast':
+        # Modelo más rápido para demo
+        return RandomForestRegressor(
+            n_estimators=100,  # Más rápido que 200
+            max_depth=15,
+            random_state=42,
+            n_jobs=-1,  # Usar todos los CPUs
+            verbose=1    # Mostrar progreso
+        )
+    # Modelo más preciso pero más lento
+    return GradientBoostingRegressor(
+        n_estimators=100,  # Reducido de 200 a 100
+        learning_rate=0.1,
+        max_depth=5,
+        random_state=42,
+        verbose=1  # Mostrar progreso
+    )
+
+
+def _estimator_bytes(estimator):
+    """Tamaño aproximado de los árboles de un estimador de sklearn"""
+    total = 0
+    for tree in getattr(estimator, 'estimators_', []):
+        # GradientBoosting guarda los árboles en una matriz (n_etapas, 1)
+        tree = tree[0] if hasattr(tree, '__len__') else tree
+        t = tree.tree_
+        # Cada nodo ocupa 64 bytes en sklearn, más el arreglo de valores
+        total += t.node_count * 64 + t.value.nbytes
+    return int(total)
+
+
+# Pickles de modelos especializados guardados cuando specialized.py era un
+# módulo suelto del backend
+_MOVED_MODULES = {'specialized': 'ventilator.specialized'}
+
+
+class _Unpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        return super().find_class(_MOVED_MODULES.get(module, module), name)
+
+
+class VentilatorModel:
+    def __init__(self, model_type='fast', params=None, specialize=False):
+        """
+        model_type: 'fast' (RandomForest) o 'accurate' (GradientBoosting)
+        params: hiperparámetros que reemplazan los valores por defecto
+        specialize: entrenar un sub-modelo por par (R, C) (ver specialized.py)
+
+        El estimador y el scaler se crean al primer uso.
+        """
+        self.model_type = model_type
+        self.params = params or {}
+        self.specialize = specialize
+        self._model = None
+        self._scaler = None
+        self.compact = False
+        self.compression = None  # ver compress()
+        self.baseline = None  # estadísticas de los datos de entrenamiento (ver drift.py)
+        self.training_info = {}
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = _build_estimator(self.model_type, self.params)
+        return self._model
+
+    @model.setter
+    def model(self, value):
+        self._model = value
+
+    @property
+    def scaler(self):
+        if self._scaler is None:
+            from sklearn.preprocessing import StandardScaler
+            self._scaler = StandardScaler()
+        return self._scaler
+
+    @scaler.setter
+    def scaler(self, value):
+        self._scaler = value
+        
+    def prepare_features(self, df, presorted=False, return_order=False):
+        """
+        Crear features temporales y de ventana (ver features.py)
+
+        Las filas salen ordenadas por ciclo (orden de aparición) y time_step.
+        presorted: el CSV ya viene en ese orden (ver utils.inspect_csv)
+        return_order: agregar los índices de df que corresponden a cada fila
+        """
+        from .features import build_features
+
+        print(f"Preparando features de {len(df)} registros...")
+        start_time = time.time()
+        
+        X, y, order = build_features(df, presorted)
+        
+        elapsed = time.time() - start_time
+        print(f"✓ Features preparadas en {elapsed:.2f} segundos")
+        
+        y = y if y is not None and len(y) else None
+        if return_order:
+            return X, y, order
+        return X, y
+    
+    def train(self, df, validation_split=0.2, presorted=False, lean=False):
+        """
+        Entrenar el modelo con validación
+
+        lean: modo de poca memoria. Las features se construyen en float32, el
+        split es por ciclos completos (train y validación son vistas de la
+        misma matriz) y se normaliza in-place: una sola matriz en memoria en
+        lugar de ~4 copias en float64.
+        """
+        import numpy as np
+        import pandas as pd
+        from sklearn.model_selection import train_test_split
+
+        print(f"\n{'='*60}")
+        print(f"INICIANDO ENTRENAMIENTO - Modelo: {self.model_type.upper()}")
+        print(f"{'='*60}\n")
+        
+        # Ciclos en orden de aparición (el mismo que usa build_features)
+        breath_ids = pd.unique(df['breath_id'])
+        n_breaths = len(breath_ids)
+        
+        # Preparar datos
+        if lean:
+            from .features import build_features
+            # Ciclos de validación elegidos al azar; build_features los deja al final
+            holdout = np.zeros(n_breaths, dtype=bool)
+            holdout[np.random.default_rng(42).permutation(n_breaths)[:int(n_breaths * validation_split)]] = True
+            n_train = len(df) - int(df['breath_id'].isin(breath_ids[holdout]).sum())
+            
+            print(f"Preparando features de {len(df)} registros (float32)...")
+            start_time = time.time()
+            X, y, _ = build_features(df, presorted, dtype=np.float32, holdout=holdout)
+            print(f"✓ Features preparadas en {time.time() - start_time:.2f} segundos")
+        else:
+            X, y = self.prepare_features(df, presorted)
+        
+        print(f"\nDatos de entrenamiento:")
+        print(f"  - Total de muestras: {len(X):,}")
+        print(f"  - Features: {X.shape[1]}")
+        print(f"  - Ciclos respiratorios: {n_breaths}")
+        
+        # Split train/validation
+        if lean:
+            X_train, X_val = X[:n_train], X[n_train:]
+            y_train, y_val = y[:n_train], y[n_train:]
+        else:
+            X_train, X_val, y_train, y_val = train_test_split(
+                X, y, test_size=validation_split, random_state=42
+            )
+        
+        print(f"\nDivisión de datos:")
+        print(f"  - Entrenamiento: {len(X_train):,} muestras")
+        print(f"  - Validación: {len(X_val):,} muestras")
+        
+        # Normalizar features
+        print("\nNormalizando features...")
+        if lean:
+            self.scaler.fit(X_train)
+            self.scaler.transform(X, copy=False)  # escala train y validación in-place
+            X_train_scaled, X_val_scaled = X_train, X_val
+        else:
+            X_train_scaled = self.scaler.fit_transform(X_train)
+            X_val_scaled = self.scaler.transform(X_val)
+        
+        # Entrenar
+        print(f"\n{'='*60}")
+        print("ENTRENANDO MODELO...")
+        print(f"{'='*60}\n")
+        start_time = time.time()
+        
+        if self.specialize:
+            from .specialized import fit_groups
+            self.model = fit_groups(self.model_type, X_train_scaled, y_train, self.params)
+        else:
+            self.model.fit(X_train_scaled, y_train)
+        
+        training_time = time.time() - start_time
+        
+        # Calcular métricas
+        print("\nCalculando métricas...")
+        train_pred = self.model.predict(X_train_scaled)
+        val_pred = self.model.predict(X_val_scaled)
+        
+        train_mae = np.mean(np.abs(train_pred - y_train))
+        val_mae = np.mean(np.abs(val_pred - y_val))
+        
+        train_rmse = np.sqrt(np.mean((train_pred - y_train)**2))
+        val_rmse = np.sqrt(np.mean((val_pred - y_val)**2))
+        
+        # Resultados
+        print(f"\n{'='*60}")
+        print("RESULTADOS DEL ENTRENAMIENTO")
+        print(f"{'='*60}\n")
+        print(f"Tiempo de entrenamiento: {training_time:.2f} segundos")
+        print(f"\nMétricas en ENTRENAMIENTO:")
+        print(f"  - MAE:  {train_mae:.4f} cmH₂O")
+        print(f"  - RMSE: {train_rmse:.4f} cmH₂O")
+        print(f"\nMétricas en VALIDACIÓN:")
+        print(f"  - MAE:  {val_mae:.4f} cmH₂O")
+        print(f"  - RMSE: {val_rmse:.4f} cmH₂O")
+        
+        # Verificar overfitting
+        if val_mae > train_mae * 1.5:
+            print(f"\n⚠️  ADVERTENCIA: Posible overfitting detectado")
+            print(f"   (MAE validación es {(val_mae/train_mae):.2f}x el MAE de entrenamiento)")
+        else:
+            print(f"\n✓ Modelo generaliza bien (validación/train ratio: {(val_mae/train_mae):.2f})")
+        
+        print(f"\n{'='*60}\n")
+
+        # Resumen para los metadatos del registro de modelos
+        self.training_info = {
+            'training_rows': int(len(X)),
+            'training_breaths': int(n_breaths),
+            'train_mae': float(train_mae),
+            'val_mae': float(val_mae),
+            'training_time_s': round(training_time, 2),
+        }
+        if self.specialize:
+            self.training_info['specialized'] = True
+
+        # Distribución de los datos de entrenamiento, para monitorear el tráfico
+        from .drift import DriftSketch
+        self.baseline = DriftSketch.from_training(df)
+
+        return val_mae  # Retornar MAE de validación
+
+    def update(self, df, validation_split=0.2, presorted=False, n_trees=None):
+        """
+        Actualización incremental con ciclos nuevos, sin reentrenar desde cero
+
+        - scaler: queda como fue ajustado. Los árboles sólo comparan umbrales,
+          así que cualquier escala monótona sirve para los nuevos; cambiarla
+          alteraría las predicciones de los existentes (sklearn compara X en
+          float32). La distribución combinada la sigue el baseline de drift.py
+        - fast: se agregan n_trees árboles entrenados sólo con los datos
+          nuevos (warm_start). Por defecto, en proporción a las filas nuevas
+          respecto de training_info['training_rows']
+        - accurate: se continúan n_trees etapas de boosting sobre los
+          residuos de los datos nuevos (por defecto, la misma proporción)
+
+        Una fracción de los ciclos nuevos queda para validar y se mide el MAE
+        antes y después. El costo depende de los datos nuevos, no del historial.
+        Las estadísticas base de drift.py suman los ciclos nuevos.
+        Retorna el resumen de la actualización.
+        """
+        import numpy as np
+        import pandas as pd
+        from .features import build_features
+
+        if self.compact:
+            raise ValueError('La actualización necesita el modelo completo (.pkl), no el compacto')
+        if self.specialize:
+            raise ValueError('La actualización incremental no aplica a modelos especializados por (R, C)')
+
+        print(f"\n{'='*60}")
+        print(f"ACTUALIZACIÓN INCREMENTAL - Modelo: {self.model_type.upper()}")
+        print(f"{'='*60}\n")
+        start_time = time.time()
+
+        # Split por ciclos: los de validación quedan al final de X
+        breath_ids = pd.unique(df['breath_id'])
+        holdout = np.zeros(len(breath_ids), dtype=bool)
+        holdout[np.random.default_rng(42).permutation(len(breath_ids))[:int(len(breath_ids) * validation_split)]] = True
+        n_train = len(df) - int(df['breath_id'].isin(breath_ids[holdout]).sum())
+        X, y, _ = build_features(df, presorted, holdout=holdout)
+        X_train, X_val = X[:n_train], X[n_train:]
+        y_train, y_val = y[:n_train], y[n_train:]
+
+        def val_mae():
+            if not len(X_val):
+                return None
+            return float(np.mean(np.abs(self.model.predict(self.scaler.transform(X_val)) - y_val)))
+
+        mae_before = val_mae()
+
+        current = len(self.model.estimators_)
+        if n_trees is None:
+            history = self.training_info.get('training_rows') or n_train
+            n_trees = int(np.clip(round(current * n_train / history), 1, current))
+        print(f"Filas nuevas: {n_train:,} de entrenamiento, {len(X_val):,} de validación")
+        print(f"Agregando {n_trees} {'etapas' if self.model_type == 'accurate' else 'árboles'} "
+              f"a los {current} existentes...")
+
+        self.model.set_params(warm_start=True, n_estimators=current + n_trees, verbose=0)
+        self.model.fit(self.scaler.transform(X_train), y_train)
+        self.model.set_params(warm_start=False)
+
+        mae_after = val_mae()
+        update_time = time.time() - start_time
+        if mae_before is not None:
+            print(f"\nMAE de validación: {mae_before:.4f} -> {mae_after:.4f} cmH₂O")
+        print(f"✓ Actualización en {update_time:.2f} segundos\n")
+
+        if self.compression and self.compression.get('trees'):
+            # Los índices elegidos dejarían afuera los árboles nuevos
+            self.compression = {k: v for k, v in self.compression.items() if k != 'trees'} or None
+        if self.baseline is not None:
+            self.baseline.extend(df)
+
+        summary = {
+            'new_rows': int(len(df)),
+            'new_breaths': int(len(breath_ids)),
+            'added_trees': n_trees,
+            'total_trees': current + n_trees,
+            'val_mae_before': mae_before,
+            'val_mae_after': mae_after,
+            'update_time_s': round(update_time, 2),
+        }
+        info = self.training_info
+        info['training_rows'] = int(info.get('training_rows', 0)) + len(df)
+        info['training_breaths'] = int(info.get('training_breaths', 0)) + len(breath_ids)
+        if mae_after is not None:
+            info['val_mae'] = mae_after
+        info['updates'] = int(info.get('updates', 0)) + 1
+        info['last_update'] = summary
+        return summary
+    
+    def predict(self, df, presorted=False, return_order=False, lean=False):
+        """
+        Hacer predicciones (en el orden de las features, ver prepare_features).
+        return_order=True retorna (predicciones, índices de df de cada una).
+        lean=True: features en float32, normalizadas al construirlas (mismas
+        predicciones que el camino float64: sklearn recorre los árboles en float32)
+        """
+        print(f"\nRealizando predicciones en {len(df)} registros...")
+        if lean:
+            from .features import build_features
+            import numpy as np
+            X_scaled, _, order = build_features(df, presorted, dtype=np.float32, scaler=self.scaler)
+        else:
+            X, _, order = self.prepare_features(df, presorted, return_order=True)
+            X_scaled = self.scaler.transform(X)
+        
+        print("Generando predicciones...")
+        predictions = self.model.predict(X_scaled)
+        
+        print(f"✓ {len(predictions)} predicciones completadas")
+        print(f"  Rango: [{predictions.min():.2f}, {predictions.max():.2f}] cmH₂O")
+        print(f"  Media: {predictions.mean():.2f} cmH₂O")
+        
+        if return_order:
+            return predictions, order
+        return predictions
+    
+    def save(self, filepath='model.pkl'):
+        """Guardar modelo"""
+        if self.compact:
+            raise ValueError('Un modelo compacto no se puede guardar como pickle')
+        print(f"\nGuardando modelo en {filepath}...")
+        with open(filepath, 'wb') as f:
+            pickle.dump({
+                'model': self.model,
+                'scaler': self.scaler,
+                'model_type': self.model_type,
+                'compression': self.compression,
+                'baseline': self.baseline.to_dict() if self.baseline is not None else None
+            }, f)
+        print("✓ Modelo guardado exitosamente")
+    
+    def memory_bytes(self):
+        """Tamaño aproximado en memoria de los arreglos del modelo"""
+        if self.compact:
+            return int(self.model.nbytes)
+
+        # Modelo especializado: la suma de sus sub-modelos
+        return sum(_estimator_bytes(m) for m in getattr(self.model, 'models', [self.model]))
+
+    def compress(self, X_val, y_val, mae_budget=0.01, quantize=True, prune='both'):
+        """
+        Elegir la compresión del modelo compacto (ver compress.py): cuantizar
+        umbrales y hojas y recortar profundidad / árboles mientras el MAE de
+        validación no suba más de mae_budget (relativo, 0.01 = +1%).
+
+        X_val: features ya normalizadas. La compresión se aplica en
+        export_compact(); el pickle sigue guardando el modelo completo.
+        Retorna el resumen de la búsqueda.
+        """
+        from .compress import search_compression
+
+        result = search_compression(self.model, self.scaler, self.model_type, X_val, y_val,
+                                    mae_budget, quantize, prune)
+        self.compression = result['compression']
+        return result
+
+    def export_compact(self, filepath='model.vcm'):
+        """Exportar al formato compacto de inferencia (ver compact.py)"""
+        from .compact import export_compact
+
+        print(f"\nExportando modelo compacto en {filepath}...")
+        metadata = {'baseline': self.baseline.to_dict()} if self.baseline is not None else None
+        export_compact(self.model, self.scaler, self.model_type, filepath,
+                       metadata=metadata, compression=self.compression)
+        print("✓ Modelo compacto exportado")
+    
+    def load(self, filepath='model.pkl', use_mmap=True):
+        """
+        Cargar modelo. Si el archivo está en formato compacto (.vcm) se usa la
+        ruta de inferencia con numpy, sin importar sklearn.
+
+        use_mmap: (.vcm) mapear el archivo en lugar de copiarlo. Los procesos
+        que mapean el mismo archivo comparten esas páginas (page cache).
+        """
+        from .compact import is_compact_file, load_compact
+
+        print(f"\nCargando modelo desde {filepath}...")
+        if is_compact_file(filepath):
+            self.model, self.scaler, header = load_compact(filepath, use_mmap)
+            self.model_type = header.get('model_type', 'unknown')
+            self.specialize = 'groups' in header
+            self.compression = header.get('compression')
+            baseline = header.get('metadata', {}).get('baseline')
+            self.compact = True
+        else:
+            with open(filepath, 'rb') as f:
+                data = _Unpickler(f).load()
+                self.model = data['model']
+                self.specialize = hasattr(self.model, 'table')
+                self.scaler = data['scaler']
+                self.model_type = data.get('model_type', 'unknown')
+                self.compression = data.get('compression')
+                baseline = data.get('baseline')
+            self.compact = False
+        self.baseline = None
+        if baseline:
+            from .drift import DriftSketch
+            self.baseline = DriftSketch.from_dict(baseline)
+        print(f"✓ Modelo cargado (tipo: {self.model_type})")
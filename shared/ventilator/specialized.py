@@ -0,0 +1,176 @@
+import os
+import time
+
+# Modelos especializados por configuración pulmonar (R, C)
+#
+# R y C toman sólo 3 valores cada uno en el dataset: hay 9 pulmones posibles.
+# En lugar de un único bosque que gasta niveles de cada árbol en separar R y
+# C, se entrena un sub-modelo por par (R, C) y cada fila se despacha al suyo
+# con una tabla precalculada:
+#
+#   r = searchsorted(puntos medios de R, X[:, 0])      -> 0..2
+#   c = searchsorted(puntos medios de C, X[:, 1])      -> 0..2
+#   sub-modelo = table[r, c]
+#
+# Las claves se guardan tal como aparecen en X (ya normalizadas), así el
+# despacho no necesita el scaler. Un valor nuevo de R o C cae en el grupo más
+# cercano, y un par sin datos de entrenamiento usa el par vecino.
+
+# Columnas de R y C en X (ver FEATURE_NAMES en model.py)
+R_COLUMN, C_COLUMN = 0, 1
+
+
+def _midpoints(keys):
+    import numpy as np
+
+    keys = np.asarray(keys, dtype=np.float64)
+    return (keys[1:] + keys[:-1]) / 2
+
+
+class GroupedForest:
+    """Un estimador por par (R, C) con la interfaz predict(X) de sklearn"""
+
+    def __init__(self, models, r_keys, c_keys, table):
+        """
+        models: sub-modelos (sklearn o CompactForest)
+        r_keys, c_keys: valores de R y C tal como aparecen en X, ordenados
+        table: matriz (len(r_keys), len(c_keys)) con el índice del sub-modelo
+        """
+        import numpy as np
+
+        self.models = list(models)
+        self.r_keys = np.asarray(r_keys, dtype=np.float64)
+        self.c_keys = np.asarray(c_keys, dtype=np.float64)
+        self.table = np.asarray(table, dtype=np.int32)
+        self._r_mid = _midpoints(self.r_keys)
+        self._c_mid = _midpoints(self.c_keys)
+
+    def group_codes(self, X):
+        """Índice del sub-modelo de cada fila de X"""
+        import numpy as np
+
+        r = np.searchsorted(self._r_mid, X[:, R_COLUMN])
+        c = np.searchsorted(self._c_mid, X[:, C_COLUMN])
+        return self.table[r, c]
+
+    def predict(self, X):
+        """Una predicción vectorizada por grupo; el resultado queda en el orden de X"""
+        import numpy as np
+
+        codes = self.group_codes(X)
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes, minlength=len(self.models))
+
+        out = np.empty(len(X), dtype=np.float64)
+        start = 0
+        for model, count in zip(self.models, counts):
+            if count:
+                rows = order[start:start + count]
+                out[rows] = model.predict(X[rows])
+                start += count
+        return out
+
+    @property
+    def nbytes(self):
+        # Los sub-modelos compactos son vistas del mismo archivo: contar cada arreglo una vez
+        arrays = {}
+        for model in self.models:
+            for array in model.arrays():
+                arrays[id(array)] = array.nbytes
+        return sum(arrays.values()) + self.table.nbytes
+
+
+def _fill_table(present):
+    """
+    Tabla (len(R), len(C)) -> índice de sub-modelo. Los pares sin datos
+    apuntan al par entrenado más cercano (en pasos de la grilla).
+    """
+    import numpy as np
+
+    trained = np.argwhere(present)
+    table = np.full(present.shape, -1, dtype=np.int32)
+    for g, (i, j) in enumerate(trained):
+        table[i, j] = g
+    for i, j in np.argwhere(~present):
+        nearest = np.abs(trained - [i, j]).sum(axis=1).argmin()
+        table[i, j] = nearest
+    return table
+
+
+def _fit_group(model_type, params, X, y):
+    from .model import _build_estimator
+
+    estimator = _build_estimator(model_type, params)
+    estimator.set_params(verbose=0)
+    if model_type == 'fast':
+        # El paralelismo está en los grupos: un CPU por sub-modelo
+        estimator.set_params(n_jobs=1)
+    start = time.time()
+    estimator.fit(X, y)
+    return estimator, time.time() - start
+
+
+def fit_groups(model_type, X, y, params=None, workers=None, fitted=None, on_fit=None):
+    """
+    Entrenar un sub-modelo por par (R, C) presente en X, en paralelo.
+
+    X, y: features normalizadas y presiones (X puede ser un mmap)
+    workers: procesos (por defecto uno por CPU, como mucho uno por grupo)
+    fitted: {(i, j): estimador} ya entrenados (al retomar un checkpoint)
+    on_fit(key, estimador): se llama al terminar cada grupo
+
+    Retorna un GroupedForest.
+    """
+    import numpy as np
+
+    r_keys, r_idx = np.unique(X[:, R_COLUMN], return_inverse=True)
+    c_keys, c_idx = np.unique(X[:, C_COLUMN], return_inverse=True)
+    cell = r_idx * len(c_keys) + c_idx
+    present = np.bincount(cell, minlength=len(r_keys) * len(c_keys)).reshape(len(r_keys), len(c_keys)) > 0
+    table = _fill_table(present)
+
+    # Filas de cada celda (en orden creciente: argsort estable)
+    counts = np.bincount(cell, minlength=present.size)
+    order = np.argsort(cell, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+    keys = [tuple(int(v) for v in key) for key in np.argwhere(present)]
+    estimators = dict(fitted or {})
+    pending = [key for key in keys if key not in estimators]
+
+    def rows(key):
+        g = key[0] * len(c_keys) + key[1]
+        return order[bounds[g]:bounds[g + 1]]
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending) or 1))
+    print(f"  {len(keys)} grupos (R, C), {len(pending)} por entrenar con {workers} procesos")
+
+    def done(key, result):
+        estimator, seconds = result
+        estimators[key] = estimator
+        print(f"  ✓ Grupo {key}: {counts[key[0] * len(c_keys) + key[1]]:,} filas en {seconds:.2f} s")
+        if on_fit:
+            on_fit(key, estimator)
+
+    if workers == 1:
+        for key in pending:
+            index = rows(key)
+            done(key, _fit_group(model_type, params, X[index], y[index]))
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        # 'spawn' como en workpool.py: el entrenamiento puede correr dentro
+        # del servidor y un fork heredaría sus hilos y locks
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = {}
+            for key in pending:
+                index = rows(key)
+                futures[pool.submit(_fit_group, model_type, params, X[index], np.asarray(y[index]))] = key
+            for future in as_completed(futures):
+                done(futures[future], future.result())
+
+    if model_type == 'fast':
+        for estimator in estimators.values():
+            estimator.set_params(n_jobs=-1)  # en inferencia, como el modelo global
+
+    return GroupedForest([estimators[key] for key in keys], r_keys, c_keys, table)
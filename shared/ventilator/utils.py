@@ -0,0 +1,320 @@
+# numpy, pandas y sklearn se importan dentro de cada función para que
+# importar este módulo no tenga costo de arranque.
+import math
+
+
+def prepare_data(df, sequence_length=10, scaler_info=None):
+    """
+    Prepara datos para el modelo LSTM
+    
+    Args:
+        df: DataFrame con los datos
+        sequence_length: Longitud de la secuencia
+        scaler_info: Información de escalado previo (opcional)
+    
+    Returns:
+        X: Arrays de entrada (num_samples, sequence_length, features)
+        y: Array de salida (num_samples,)
+        scaler_info: Información de escalado
+    """
+    import numpy as np
+    from sklearn.preprocessing import MinMaxScaler
+    
+    try:
+        # Seleccionar columnas numéricas relevantes
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        
+        if len(numeric_cols) == 0:
+            return None, None, None
+        
+        # Usar máximo 5 features
+        numeric_cols = numeric_cols[:min(5, len(numeric_cols))]
+        data = df[numeric_cols].values
+        
+        # Normalizar datos
+        if scaler_info is None:
+            scaler = MinMaxScaler()
+            data_normalized = scaler.fit_transform(data)
+            scaler_info = {
+                'min': scaler.data_min_.tolist(),
+                'max': scaler.data_max_.tolist(),
+                'scale': scaler.scale_.tolist(),
+                'columns': numeric_cols
+            }
+        else:
+            # Usar scaler info previo
+            min_vals = np.array(scaler_info['min'])
+            max_vals = np.array(scaler_info['max'])
+            data_normalized = (data - min_vals) / (max_vals - min_vals)
+        
+        # Crear secuencias
+        X, y = [], []
+        
+        for i in range(len(data_normalized) - sequence_length):
+            X.append(data_normalized[i:i+sequence_length])
+            # Predecir el valor siguiente del primer feature
+            y.append(data_normalized[i+sequence_length, 0])
+        
+        return np.array(X), np.array(y), scaler_info
+    
+    except Exception as e:
+        print(f"Error preparing data: {e}")
+        return None, None, None
+
+def normalize_data(data, scaler_info):
+    """Normaliza datos usando información de scaler"""
+    import numpy as np
+    min_vals = np.array(scaler_info['min'])
+    max_vals = np.array(scaler_info['max'])
+    return (data - min_vals) / (max_vals - min_vals)
+
+def denormalize_data(data, scaler_info):
+    """Desnormaliza datos usando información de scaler"""
+    import numpy as np
+    min_vals = np.array(scaler_info['min'])[0]
+    max_vals = np.array(scaler_info['max'])[0]
+    return data * (max_vals - min_vals) + min_vals
+
+# Columnas del dataset del ventilador y su tipo esperado
+REQUIRED_COLUMNS = {
+    'id': int,
+    'breath_id': int,
+    'R': int,
+    'C': int,
+    'time_step': float,
+    'u_in': float,
+    'u_out': int,
+}
+OPTIONAL_COLUMNS = {'pressure': float}
+
+
+def _sample_lines(handle, size, data_start, n_ranges, range_bytes):
+    """
+    Leer n_ranges bloques de range_bytes repartidos en el archivo y devolver
+    sus líneas completas (se descarta la línea cortada al inicio y al final)
+    """
+    if size - data_start <= n_ranges * range_bytes:
+        handle.seek(data_start)
+        text = handle.read().decode('utf-8', errors='replace')
+        return [[line for line in text.splitlines() if line.strip()]]
+
+    step = (size - data_start - range_bytes) / max(n_ranges - 1, 1)
+    samples = []
+    for i in range(n_ranges):
+        offset = data_start + int(i * step)
+        handle.seek(offset)
+        lines = handle.read(range_bytes).decode('utf-8', errors='replace').split('\n')
+        if offset != data_start:
+            lines = lines[1:]   # primera línea cortada
+        lines = lines[:-1]      # última línea cortada (o vacía)
+        samples.append([line.rstrip('\r') for line in lines if line.strip()])
+    return samples
+
+
+# Bytes descomprimidos que se inspeccionan en archivos gzip / zstd
+COMPRESSED_PREFIX_BYTES = 1024 * 1024
+
+
+def _inspect_compressed(handle, compression, require_pressure, n_ranges, range_bytes):
+    """
+    Un archivo comprimido no permite saltar a un offset: se descomprime sólo
+    un prefijo y se inspecciona ese prefijo (columnas, tipos y orden).
+    """
+    import io
+    from .ingest import open_input
+
+    start = handle.tell()
+    handle.seek(0, 2)
+    compressed_size = handle.tell() - start
+    handle.seek(start)
+
+    stream, _ = open_input(handle)
+    prefix = stream.read(COMPRESSED_PREFIX_BYTES)
+    at_end = len(prefix) < COMPRESSED_PREFIX_BYTES
+    consumed = max(handle.tell() - start, 1)
+    if not at_end:
+        prefix = prefix[:prefix.rfind(b'\n') + 1]
+
+    report = inspect_csv(io.BytesIO(prefix), require_pressure, n_ranges, range_bytes)
+    report['compression'] = compression
+    if not at_end:
+        # Extrapolar con la proporción comprimido / descomprimido leída
+        report['estimated_rows'] = int(report['estimated_rows'] * compressed_size / consumed)
+    return report
+
+
+def inspect_csv(source, require_pressure=False, n_ranges=8, range_bytes=64 * 1024):
+    """
+    Validación rápida de un CSV del ventilador sin parsearlo completo.
+
+    Lee sólo el encabezado y n_ranges bloques de bytes repartidos en el
+    archivo, y revisa columnas, tipos, u_out binario, orden y pasos por ciclo.
+
+    Args:
+        source: ruta o archivo binario con seek (ej. request.files['file'].stream)
+        require_pressure: exigir la columna 'pressure' (entrenamiento)
+
+    Returns:
+        dict con 'valid', 'errors', 'columns', 'has_pressure',
+        'estimated_rows', 'compression' y 'layout' (orden detectado, pasos por ciclo)
+
+    Los archivos gzip / zstd se detectan por sus bytes mágicos y se
+    inspecciona sólo su primer MB descomprimido.
+    """
+    import csv
+    from .ingest import detect_compression
+
+    report = {'valid': False, 'errors': [], 'columns': [], 'has_pressure': False,
+              'estimated_rows': 0, 'compression': None, 'layout': {}}
+    errors = report['errors']
+
+    opened = isinstance(source, (str, bytes)) or hasattr(source, '__fspath__')
+    handle = open(source, 'rb') if opened else source
+    position = None if opened else handle.tell()
+
+    try:
+        handle.seek(0)
+        compression = detect_compression(handle.read(4))
+        handle.seek(0)
+        if compression:
+            return _inspect_compressed(handle, compression, require_pressure, n_ranges, range_bytes)
+
+        handle.seek(0, 2)
+        size = handle.tell()
+        handle.seek(0)
+        header_line = handle.readline().decode('utf-8-sig', errors='replace').strip()
+        data_start = handle.tell()
+
+        if not header_line or size <= data_start:
+            errors.append('El archivo está vacío o sólo tiene encabezado')
+            return report
+
+        columns = next(csv.reader([header_line]))
+        report['columns'] = columns
+        report['has_pressure'] = 'pressure' in columns
+
+        missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+        if require_pressure and 'pressure' not in columns:
+            missing.append('pressure')
+        if missing:
+            errors.append(f'Faltan columnas: {", ".join(missing)}')
+            return report
+
+        types = dict(REQUIRED_COLUMNS)
+        types.update({c: t for c, t in OPTIONAL_COLUMNS.items() if c in columns})
+        index = {c: columns.index(c) for c in types}
+
+        samples = _sample_lines(handle, size, data_start, n_ranges, range_bytes)
+
+        rows_seen = 0
+        bytes_seen = 0
+        sorted_by_id = True
+        sorted_by_breath = True
+        sorted_by_time = True
+        steps = []
+        previous_last = None   # (id, breath_id) de la muestra anterior
+
+        for lines in samples:
+            runs = []          # [breath_id, cantidad de filas]
+            last_id = last_breath = last_time = None
+
+            for line_number, fields in enumerate(csv.reader(lines)):
+                bytes_seen += len(lines[line_number]) + 1
+                if len(fields) != len(columns):
+                    errors.append(f'Fila con {len(fields)} campos (se esperaban {len(columns)})')
+                    return report
+                try:
+                    values = {c: t(fields[index[c]]) if t is float else int(float(fields[index[c]]))
+                              for c, t in types.items()}
+                except (ValueError, OverflowError):
+                    # int(float('inf')) es OverflowError, int(float('nan')) ValueError
+                    bad = [c for c in types if not _is_number(fields[index[c]])]
+                    if bad:
+                        errors.append(f'Valores no numéricos en: {", ".join(bad)}')
+                    else:
+                        bad = [c for c, t in types.items() if t is int and not _is_finite(fields[index[c]])]
+                        errors.append(f'Valores no finitos (nan/inf) en columnas enteras: {", ".join(bad)}')
+                    return report
+
+                if values['u_out'] not in (0, 1):
+                    errors.append('u_out debe ser 0 o 1')
+                    return report
+                if values['R'] <= 0 or values['C'] <= 0:
+                    errors.append('R y C deben ser positivos')
+                    return report
+
+                if last_id is not None and values['id'] <= last_id:
+                    sorted_by_id = False
+                if last_breath is not None and values['breath_id'] == last_breath:
+                    runs[-1][1] += 1
+                    if values['time_step'] <= last_time:
+                        sorted_by_time = False
+                else:
+                    if last_breath is not None and values['breath_id'] < last_breath:
+                        sorted_by_breath = False
+                    runs.append([values['breath_id'], 1])
+
+                last_id, last_breath, last_time = values['id'], values['breath_id'], values['time_step']
+                rows_seen += 1
+
+            if not runs:
+                continue
+
+            # Un ciclo que aparece en dos tramos separados no está contiguo
+            if len({breath for breath, _ in runs}) != len(runs):
+                sorted_by_breath = False
+            if previous_last is not None:
+                if runs[0][0] < previous_last[1]:
+                    sorted_by_breath = False
+                if lines and int(float(next(csv.reader([lines[0]]))[index['id']])) <= previous_last[0]:
+                    sorted_by_id = False
+            previous_last = (last_id, last_breath)
+
+            # Sólo los ciclos completos dentro de la muestra (no el primero ni el último)
+            steps.extend(count for _, count in runs[1:-1])
+
+        if rows_seen == 0:
+            errors.append('No se encontraron filas de datos')
+            return report
+
+        report['estimated_rows'] = int((size - data_start) / (bytes_seen / rows_seen))
+        steps_per_breath = None
+        if steps:
+            steps_per_breath = max(set(steps), key=steps.count)
+        report['layout'] = {
+            'sorted_by_id': sorted_by_id,
+            'sorted_by_breath': sorted_by_breath,
+            'sorted_by_time': sorted_by_time,
+            # Listo para las features sin reordenar
+            'presorted': sorted_by_breath and sorted_by_time,
+            'steps_per_breath': steps_per_breath,
+            'uniform_steps': len(set(steps)) <= 1,
+        }
+        report['valid'] = True
+        return report
+
+    finally:
+        if opened:
+            handle.close()
+        else:
+            handle.seek(position)
+
+
+def _is_number(value):
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _is_finite(value):
+    return _is_number(value) and math.isfinite(float(value))
+
+
+def validate_csv(filepath, require_pressure=False):
+    """Valida que el CSV sea válido (sin parsear el archivo completo)"""
+    try:
+        return inspect_csv(filepath, require_pressure=require_pressure)['valid']
+    except OSError:
+        return False